@@ -0,0 +1,152 @@
+import os
+import io
+import random
+import zipfile
+import datetime as dt
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'data')
+
+TEMPLATES = {
+    'docx': 'file_example_DOCX_100kB.docx',
+    'pptx': 'file_example_PPTX_2.pptx',
+    'xlsx': 'file_example_XLSX_50.xlsx',
+    'doc': 'file_example_DOC_100kB.doc',
+    'xls': 'file_example_XLS_100.xls',
+    'ppt': 'file_example_PPT_250kB.ppt',
+    'rtf': 'file_example_RTF_100kB.rtf',
+    'jpg': 'file_example_JPG_100kB.jpg'
+}
+OOXML_TYPES = ('docx', 'pptx', 'xlsx')
+GENERATED_TYPES = ('pdf', 'bin')
+TYPES = tuple(TEMPLATES) + GENERATED_TYPES
+
+DEFAULT_MIX = {'docx': 3, 'xlsx': 2, 'pptx': 1, 'pdf': 3, 'doc': 2, 'xls': 1, 'ppt': 1, 'rtf': 1, 'jpg': 1, 'bin': 1}
+
+AUTHORS = ['Alice Smith', 'Bob Jones', 'Carol White', 'Dave Brown', 'Eve Black', 'Frank Green']
+
+CORE_PART = 'docProps/core.xml'
+CORE_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+    '<dc:creator>{author}</dc:creator><cp:lastModifiedBy>{author_last}</cp:lastModifiedBy>'
+    '<dcterms:created xsi:type="dcterms:W3CDTF">{created}</dcterms:created>'
+    '<dcterms:modified xsi:type="dcterms:W3CDTF">{modified}</dcterms:modified>'
+    '</cp:coreProperties>'
+)
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition('=')
+        name = name.strip().lower()
+        if name not in TYPES:
+            raise ValueError("Unknown file type: {}".format(name))
+        mix[name] = int(weight) if weight else 1
+    return mix
+
+
+def w3cdtf(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def pdf_date(value):
+    return value.strftime("D:%Y%m%d%H%M%S+00'00'")
+
+
+def ooxml_document(template, author, author_last, created, modified):
+    core = CORE_TEMPLATE.format(
+        author=author, author_last=author_last, created=w3cdtf(created), modified=w3cdtf(modified)
+    ).encode('utf-8')
+    output = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(template)) as source, zipfile.ZipFile(output, 'w') as target:
+        for info in source.infolist():
+            data = core if info.filename == CORE_PART else source.read(info)
+            target.writestr(info, data)
+    return output.getvalue()
+
+
+def pdf_document(author, created, modified, pages):
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [] /Count %d >>' % pages,
+        '<< /Author ({}) /CreationDate ({}) /ModDate ({}) >>'.format(
+            author, pdf_date(created), pdf_date(modified)
+        ).encode('latin-1')
+    ]
+    data = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref_offset = len(data)
+    data += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        data += b'%010d 00000 n \n' % offset
+    data += b'trailer\n<< /Size %d /Root 1 0 R /Info 3 0 R >>\n' % (len(objects) + 1)
+    data += b'startxref\n%d\n%%%%EOF\n' % xref_offset
+    return bytes(data)
+
+
+class CorpusGenerator():
+    def __init__(self, seed=0, mix=None, width=8, depth=2):
+        self.random = random.Random(seed)
+        self.mix = dict(DEFAULT_MIX if mix is None else mix)
+        self.width = width
+        self.depth = depth
+        self._templates = {}
+
+    def template(self, file_type):
+        if file_type not in self._templates:
+            with open(os.path.join(DATA_DIR, TEMPLATES[file_type]), 'rb') as f:
+                self._templates[file_type] = f.read()
+        return self._templates[file_type]
+
+    def dates(self):
+        created = dt.datetime(2000, 1, 1) + dt.timedelta(seconds=self.random.randrange(20 * 365 * 86400))
+        modified = created + dt.timedelta(seconds=self.random.randrange(365 * 86400))
+        return created, modified
+
+    def content(self, file_type):
+        if file_type in OOXML_TYPES:
+            created, modified = self.dates()
+            return ooxml_document(
+                self.template(file_type), self.random.choice(AUTHORS), self.random.choice(AUTHORS),
+                created, modified
+            )
+        if file_type == 'pdf':
+            created, modified = self.dates()
+            return pdf_document(self.random.choice(AUTHORS), created, modified, self.random.randint(1, 500))
+        if file_type == 'bin':
+            return bytes(self.random.getrandbits(8) for _ in range(self.random.randint(64, 4096)))
+        return self.template(file_type)
+
+    def directory(self, root, index):
+        parts = []
+        for level in range(self.depth):
+            index, position = divmod(index, self.width)
+            parts.append('dir{}'.format(position))
+        return os.path.join(root, *parts)
+
+    def types(self, files):
+        names = sorted(name for name, weight in self.mix.items() if weight > 0)
+        weights = [self.mix[name] for name in names]
+        return self.random.choices(names, weights, k=files)
+
+    def generate(self, root, files):
+        counts = {}
+        for index, file_type in enumerate(self.types(files)):
+            directory = self.directory(root, index)
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, 'file{}.{}'.format(index, file_type)), 'wb') as f:
+                f.write(self.content(file_type))
+            counts[file_type] = counts.get(file_type, 0) + 1
+        return counts
+
+
+def generate_corpus(root, files, mix=None, seed=0):
+    return CorpusGenerator(seed, mix).generate(root, files)
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import warnings
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from herostratus import herostratus, cli
+from herostratus.discovery import Discovery
+from herostratus.stats import Stats
+from .corpus import generate_corpus, parse_mix, DEFAULT_MIX
+
+WRITER_FORMATS = ['html', 'xml', 'xls', 'xlsx', 'csv', 'jsonl']
+RESULTS_VERSION = 1
+
+warnings.filterwarnings('ignore')
+
+
+def peak_rss():
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == 'darwin' else 1024
+    usage = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    return usage * scale
+
+
+def throughput(count, elapsed):
+    return {
+        'files': count,
+        'time': elapsed,
+        'files_per_second': count / elapsed if elapsed else None
+    }
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best[0]:
+            best = (elapsed, result)
+    return best
+
+
+def bench_discovery(root, repeat):
+    elapsed, entries = best_of(repeat, lambda: list(Discovery().scan(root)))
+    return throughput(len(entries), elapsed)
+
+
+def bench_processing(root, jobs, repeat):
+    def collect():
+        crawler = herostratus.Crawler()
+        crawler.stats = Stats()
+        return crawler.collect_timeline(root, jobs=jobs), crawler.stats
+    elapsed, (timeline, stats) = best_of(repeat, collect)
+    metrics = {'processing': throughput(timeline.total(), elapsed)}
+    for name, stage in stats.stages.items():
+        if name.startswith('processor.') or name == 'detect':
+            metrics[name] = throughput(stage.count, stage.time)
+            metrics[name]['errors'] = stage.errors
+    return timeline, metrics
+
+
+def bench_writers(root, timeline, directory, formats, repeat):
+    metrics = {}
+    crawler = herostratus.Crawler()
+    for output_format in formats:
+        filename = os.path.join(directory, 'timeline.' + output_format)
+        def write():
+            if os.path.isdir(filename):
+                shutil.rmtree(filename)
+            sink = cli.create_sink(output_format, filename)
+            crawler.write_timeline(root, timeline, [sink])
+        elapsed, _ = best_of(repeat, write)
+        metrics['writer.' + output_format] = throughput(timeline.total(), elapsed)
+    return metrics
+
+
+def run(files=1000, mix=None, seed=0, jobs=1, repeat=1, formats=None, corpus=None):
+    formats = WRITER_FORMATS if formats is None else formats
+    with tempfile.TemporaryDirectory(prefix='herostratus-bench-') as directory:
+        root = corpus or os.path.join(directory, 'corpus')
+        started = time.perf_counter()
+        counts = generate_corpus(root, files, mix, seed) if not os.path.isdir(root) else None
+        generated = time.perf_counter() - started
+        metrics = {'discovery': bench_discovery(root, repeat)}
+        timeline, processing = bench_processing(root, jobs, repeat)
+        metrics.update(processing)
+        metrics.update(bench_writers(root, timeline, directory, formats, repeat))
+    return {
+        'version': RESULTS_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {
+            'files': files,
+            'mix': DEFAULT_MIX if mix is None else mix,
+            'seed': seed,
+            'jobs': jobs,
+            'repeat': repeat,
+            'corpus': counts,
+            'generate_time': generated
+        },
+        'platform': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'system': platform.system(),
+            'cpus': os.cpu_count()
+        },
+        'metrics': metrics,
+        'peak_rss': peak_rss()
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    rows = []
+    for name, metric in sorted(current['metrics'].items()):
+        reference = baseline['metrics'].get(name)
+        if reference is None or not reference.get('files_per_second') or metric.get('files_per_second') is None:
+            continue
+        change = metric['files_per_second'] / reference['files_per_second'] - 1
+        rows.append((name, reference['files_per_second'], metric['files_per_second'], change, change < -threshold))
+    if baseline.get('peak_rss') and current.get('peak_rss'):
+        change = current['peak_rss'] / baseline['peak_rss'] - 1
+        rows.append(('peak_rss', baseline['peak_rss'], current['peak_rss'], change, change > threshold))
+    return rows
+
+
+def format_comparison(rows):
+    lines = ["{:<32} {:>14} {:>14} {:>8}".format('metric', 'baseline', 'current', 'change')]
+    for name, reference, value, change, regression in rows:
+        lines.append("{:<32} {:>14.1f} {:>14.1f} {:>+7.1%}{}".format(
+            name, reference, value, change, '  REGRESSION' if regression else ''
+        ))
+    return '\n'.join(lines)
+
+
+def load(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--mix", type=parse_mix, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--format", default=','.join(WRITER_FORMATS))
+    parser.add_argument("--corpus", default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--compare", nargs=2, metavar=('BASELINE', 'CURRENT'), default=None)
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = load(args.compare[0]), load(args.compare[1])
+    else:
+        current = run(
+            args.files, args.mix, args.seed, args.jobs, args.repeat,
+            [output_format.strip() for output_format in args.format.split(',') if output_format.strip()],
+            args.corpus
+        )
+        for name, metric in sorted(current['metrics'].items()):
+            print("{:<32} {:>8} files {:>10.3f}s {:>12.1f} files/s".format(
+                name, metric['files'], metric['time'], metric['files_per_second'] or 0
+            ))
+        print("Peak RSS: {}".format(current['peak_rss']))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+            print("Results: {}".format(args.output))
+        baseline = load(args.baseline) if args.baseline else None
+    if baseline is not None:
+        rows = compare(baseline, current, args.threshold)
+        print(format_comparison(rows))
+        if any(row[4] for row in rows):
+            sys.exit(1)
@@ -0,0 +1,149 @@
+import os
+import stat as st
+import time
+import zlib
+import tarfile
+import zipfile
+import tempfile
+import posixpath
+
+ARCHIVE_SEPARATOR = '!/'
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+MAX_DEPTH = 2
+MAX_BYTES = 1024 * 1024 * 1024
+MAX_MEMBERS = 10000
+SPOOL_SIZE = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+READ_ERRORS = (
+    zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError, OSError, RuntimeError, NotImplementedError
+)
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def member_stat(size, mtime):
+    return os.stat_result((st.S_IFREG | 0o444, 0, 0, 1, 0, 0, size, mtime, mtime, mtime))
+
+
+def member_name(name):
+    return posixpath.normpath(name).lstrip('/')
+
+
+class MemberFile():
+    def __init__(self, file):
+        self._file = file
+        self._file.seek(0)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class ArchiveMember():
+    def __init__(self, path, size, mtime, file):
+        self.path = path
+        self.size = size
+        self.stat = member_stat(size, mtime)
+        self._file = file
+
+    def open(self):
+        return MemberFile(self._file)
+
+    def close(self):
+        self._file.close()
+
+
+class ArchiveBudget():
+    def __init__(self, max_bytes, max_members):
+        self.max_bytes = max_bytes
+        self.max_members = max_members
+        self.bytes = 0
+        self.members = 0
+
+    def add_member(self):
+        self.members += 1
+        if self.max_members is not None and self.members > self.max_members:
+            raise ArchiveError('archive limit exceeded: more than {} members'.format(self.max_members))
+
+    def add_bytes(self, size):
+        self.bytes += size
+        if self.max_bytes is not None and self.bytes > self.max_bytes:
+            raise ArchiveError('archive limit exceeded: more than {} bytes'.format(self.max_bytes))
+
+
+class ArchiveReader():
+    def __init__(self, max_depth=MAX_DEPTH, max_bytes=MAX_BYTES, max_members=MAX_MEMBERS, spool_size=SPOOL_SIZE):
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.max_members = max_members
+        self.spool_size = spool_size
+
+    def matches(self, name):
+        return name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+    def spool(self, source, budget):
+        spooled = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        try:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                budget.add_bytes(len(chunk))
+                spooled.write(chunk)
+        except BaseException:
+            spooled.close()
+            raise
+        return spooled
+
+    def iter_zip(self, file):
+        with zipfile.ZipFile(file) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                yield info.filename, mtime, lambda info=info: archive.open(info)
+
+    def iter_tar(self, file):
+        if isinstance(file, str):
+            archive = tarfile.open(file, 'r:*')
+        else:
+            archive = tarfile.open(fileobj=file, mode='r:*')
+        with archive:
+            for info in archive:
+                if not info.isfile():
+                    continue
+                yield info.name, info.mtime, lambda info=info: archive.extractfile(info)
+
+    def iter_entries(self, path, file):
+        if path.lower().endswith('.zip'):
+            return self.iter_zip(file)
+        return self.iter_tar(file)
+
+    def members(self, path, file=None, depth=1, budget=None):
+        if budget is None:
+            budget = ArchiveBudget(self.max_bytes, self.max_members)
+        try:
+            for name, mtime, open_member in self.iter_entries(path, path if file is None else file):
+                budget.add_member()
+                with open_member() as source:
+                    spooled = self.spool(source, budget)
+                member = ArchiveMember(path + ARCHIVE_SEPARATOR + member_name(name), spooled.tell(), mtime, spooled)
+                try:
+                    yield member
+                    if depth < self.max_depth and self.matches(name):
+                        yield from self.members(member.path, member.open(), depth + 1, budget)
+                finally:
+                    member.close()
+        except READ_ERRORS as error:
+            raise ArchiveError('{}: {}'.format(path, error))
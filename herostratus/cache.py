@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import sqlite3
+
+
+class ScanCache():
+    def __init__(self, filename):
+        self.filename = filename
+        self.hits = 0
+        self.misses = 0
+        self._scan = time.time_ns()
+        self._connection = sqlite3.connect(filename)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, inode INTEGER, scan INTEGER, data TEXT)"
+        )
+
+    def lookup(self, path, stat):
+        row = self._connection.execute(
+            "SELECT data FROM documents WHERE path = ? AND size = ? AND mtime = ? AND inode = ?",
+            (path, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._connection.execute("UPDATE documents SET scan = ? WHERE path = ?", (self._scan, path))
+        return json.loads(row[0])
+
+    def store(self, path, stat, data):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO documents (path, size, mtime, inode, scan, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, stat.st_ino, self._scan, json.dumps(data))
+        )
+
+    def remove(self, path):
+        self._connection.execute("DELETE FROM documents WHERE path = ?", (path,))
+
+    def prune(self, target_path):
+        prefix = os.path.join(target_path, '')
+        stale = self._connection.execute(
+            "SELECT path FROM documents WHERE substr(path, 1, ?) = ? AND scan != ?",
+            (len(prefix), prefix, self._scan)
+        ).fetchall()
+        deleted = [(path,) for path, in stale if not os.path.lexists(path)]
+        self._connection.executemany("DELETE FROM documents WHERE path = ?", deleted)
+        return len(deleted)
+
+    def count(self, target_path):
+        prefix = os.path.join(target_path, '')
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM documents WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchone()[0]
+
+    def commit(self):
+        self._connection.commit()
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,335 @@
+import os
+import sys
+import argparse
+import datetime as dt
+from .herostratus import Crawler, DocumentInfo, Timeline
+from .discovery import SHARD_MODES, parse_shard, discovery_key
+from .stats import Stats
+from .writers import HtmlTimelineWriter, ShardedHtmlTimelineWriter, XmlTimelineWriter
+from .writers import XlsTimelineWriter, XlsxTimelineWriter, CsvTimelineWriter, JsonlTimelineWriter, CachedRows
+
+OUTPUT_FORMATS = ['html', 'xml', 'xls', 'xlsx', 'csv', 'jsonl', 'partial']
+COMPRESSED_FORMATS = ['xml', 'csv', 'jsonl']
+
+
+def create_sink(output_format, filename, html_shards=None):
+    if output_format == 'html':
+        if html_shards:
+            return ShardedHtmlTimelineWriter(filename, html_shards)
+        return HtmlTimelineWriter(filename)
+    if output_format == 'xml':
+        return XmlTimelineWriter(filename, compress=filename.endswith('.gz'))
+    if output_format == 'xls':
+        return XlsTimelineWriter(filename)
+    if output_format == 'xlsx':
+        return XlsxTimelineWriter(filename)
+    if output_format == 'csv':
+        return CsvTimelineWriter(filename, compress=filename.endswith('.gz'))
+    if output_format == 'jsonl':
+        return JsonlTimelineWriter(filename, compress=filename.endswith('.gz'))
+    if output_format == 'partial':
+        from .partial import PartialTimelineWriter
+        return PartialTimelineWriter(filename)
+    raise ValueError("Unsupported output format: {}".format(output_format))
+
+
+def temporary_output(output):
+    directory, name = os.path.split(output)
+    return os.path.join(directory, '.tmp-' + name)
+
+
+def parse_output_formats(parser, text):
+    output_formats = [output_format.strip().lower() for output_format in text.split(',') if output_format.strip()]
+    for output_format in output_formats:
+        if output_format not in OUTPUT_FORMATS:
+            parser.error("invalid format: {} (choose from {})".format(output_format, ', '.join(OUTPUT_FORMATS)))
+    return output_formats
+
+
+def output_paths(filename, output_formats, compress=False, html_shards=None):
+    outputs = []
+    for output_format in output_formats:
+        if output_format == 'html' and html_shards:
+            output = os.path.join(os.getcwd(), filename + '_html')
+        else:
+            output = os.path.join(os.getcwd(), filename + '.' + output_format)
+            if compress and output_format in COMPRESSED_FORMATS:
+                output += '.gz'
+        if os.path.exists(output):
+            print("File: {} already exists.".format(output))
+        outputs.append((output_format, output))
+    return outputs
+
+
+def merge_partials(filenames, run_size=None, columnar=False):
+    from .partial import PartialTimeline, PartialError
+    partials = [PartialTimeline(filename, DocumentInfo) for filename in filenames]
+    paths = sorted(set(partial.path for partial in partials))
+    if len(paths) > 1:
+        raise PartialError("partial results from different paths: {}".format(', '.join(paths)))
+    prefix = os.path.join(paths[0], '')
+    key = lambda doc: (doc.date_create_epoch, discovery_key(doc.path[len(prefix):]))
+    return paths[0], Timeline.merge(partials, key, run_size, columnar)
+
+
+def merge_main(argv):
+    parser = argparse.ArgumentParser(prog='herostratus merge')
+    parser.add_argument("filename")
+    parser.add_argument("partials", nargs='+')
+    parser.add_argument("--run-size", type=int, default=100000)
+    parser.add_argument("--columnar", action='store_true')
+    parser.add_argument("--format", default='html,xml,xls')
+    parser.add_argument("--gzip", action='store_true')
+    parser.add_argument("--html-shards", type=int, default=None)
+    args = parser.parse_args(argv)
+    output_formats = parse_output_formats(parser, args.format)
+    outputs = output_paths(args.filename, output_formats, args.gzip, args.html_shards)
+    from .partial import PartialError
+    try:
+        path, timeline = merge_partials(args.partials, None if args.columnar else args.run_size, args.columnar)
+    except PartialError as error:
+        print("Merge failed: {}".format(error))
+        return 1
+    print("Documents merged: [{}] from [{}] partial results".format(timeline.total(), len(args.partials)))
+    print(
+        "Writing [{}] documents timeline: [{}]\n\tPath: [{}]"
+        .format(timeline.total(), ', '.join(output_formats), path)
+    )
+    write_outputs(Crawler(), path, timeline, outputs, args.html_shards)
+    return 0
+
+
+def write_outputs(crawler, path, timeline, outputs, html_shards=None, sinks=None):
+    replacements = []
+    current = []
+    for output_format, output in outputs:
+        sink = None if sinks is None else sinks.get(output)
+        if output_format == 'html' and html_shards:
+            sink = sink or create_sink(output_format, output, html_shards)
+        else:
+            sink = sink or create_sink(output_format, temporary_output(output))
+            replacements.append((temporary_output(output), output))
+        if sinks is not None and output not in sinks:
+            if isinstance(sink, CachedRows):
+                sink.cache_rows()
+            sinks[output] = sink
+        current.append(sink)
+    crawler.write_timeline(path, timeline, current)
+    for temporary, output in replacements:
+        os.replace(temporary, output)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='herostratus')
+    parser.add_argument("path")
+    parser.add_argument("filename")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--cache", action='store_true')
+    parser.add_argument("--run-size", type=int, default=100000)
+    parser.add_argument("--columnar", action='store_true')
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--memory-limit", type=int, default=None)
+    parser.add_argument("--quarantine", action='store_true')
+    parser.add_argument("--duplicates", action='store_true')
+    parser.add_argument("--archives", action='store_true')
+    parser.add_argument("--archive-depth", type=int, default=2)
+    parser.add_argument("--archive-max-bytes", type=int, default=1024)
+    parser.add_argument("--archive-max-members", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=1)
+    parser.add_argument("--prefetch", type=int, default=0)
+    parser.add_argument("--prefetch-threads", type=int, default=8)
+    parser.add_argument("--journal", action='store_true')
+    parser.add_argument("--resume", action='store_true')
+    parser.add_argument("--checkpoint-interval", type=float, default=60.0)
+    parser.add_argument("--progress", action='store_true')
+    parser.add_argument("--stats", action='store_true')
+    parser.add_argument("--slowest", type=int, default=10)
+    parser.add_argument("--profile", action='store_true')
+    parser.add_argument("--watch", action='store_true')
+    parser.add_argument("--debounce", type=float, default=2.0)
+    parser.add_argument("--include", action='append', default=[])
+    parser.add_argument("--exclude", action='append', default=[])
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--skip-hidden", action='store_true')
+    parser.add_argument("--one-file-system", action='store_true')
+    parser.add_argument("--skip-hardlinks", action='store_true')
+    parser.add_argument("--supported-only", action='store_true')
+    parser.add_argument("--shard", type=parse_shard, default=None)
+    parser.add_argument("--shard-by", choices=SHARD_MODES, default='hash')
+    parser.add_argument("--format", default='html,xml,xls')
+    parser.add_argument("--created-from", type=dt.datetime.fromisoformat, default=None)
+    parser.add_argument("--created-to", type=dt.datetime.fromisoformat, default=None)
+    parser.add_argument("--modified-from", type=dt.datetime.fromisoformat, default=None)
+    parser.add_argument("--modified-to", type=dt.datetime.fromisoformat, default=None)
+    parser.add_argument("--author", default=None)
+    parser.add_argument("--mime", default=None)
+    parser.add_argument("--gzip", action='store_true')
+    parser.add_argument("--html-shards", type=int, default=None)
+    return parser
+
+
+def configure_discovery(crawler, args):
+    crawler.discovery.include = args.include
+    crawler.discovery.exclude = args.exclude
+    crawler.discovery.max_depth = args.max_depth
+    crawler.discovery.hidden = not args.skip_hidden
+    crawler.discovery.same_filesystem = args.one_file_system
+    crawler.discovery.hardlinks = not args.skip_hardlinks
+    crawler.discovery.shard = args.shard
+    crawler.discovery.shard_by = args.shard_by
+    if args.supported_only:
+        crawler.discovery.extensions = set(crawler.supported)
+        if args.archives:
+            from .archives import ARCHIVE_EXTENSIONS
+            crawler.discovery.extensions.update('.' + name.rsplit('.', 1)[1] for name in ARCHIVE_EXTENSIONS)
+
+
+def create_crawler(args):
+    crawler = Crawler()
+    crawler.progress = args.progress
+    crawler.duplicates = args.duplicates
+    crawler.batch_size = args.batch
+    if args.prefetch > 0:
+        from .prefetch import Prefetcher
+        crawler.prefetch = Prefetcher(args.prefetch, args.prefetch_threads)
+    if args.archives:
+        from .archives import ArchiveReader
+        crawler.archives = ArchiveReader(
+            args.archive_depth, args.archive_max_bytes * 1024 * 1024, args.archive_max_members
+        )
+    if args.stats:
+        crawler.stats = Stats(args.slowest)
+    if not args.watch:
+        crawler.run_size = args.run_size
+        crawler.columnar = args.columnar
+    crawler.timeout = args.timeout
+    if args.memory_limit:
+        crawler.memory_limit = args.memory_limit * 1024 * 1024
+    if args.quarantine:
+        from .isolation import Quarantine
+        crawler.quarantine = Quarantine(os.path.join(os.getcwd(), args.filename + '.quarantine'))
+        print('Quarantine: {}'.format(crawler.quarantine.filename))
+    configure_discovery(crawler, args)
+    return crawler
+
+
+def open_journal(crawler, args, parser):
+    from .journal import Journal, JournalError
+    crawler.journal = Journal(
+        os.path.join(os.getcwd(), args.filename + '.journal'), DocumentInfo, args.checkpoint_interval
+    )
+    print('Journal: {}'.format(crawler.journal.filename))
+    try:
+        crawler.journal.open(args.path, args.resume)
+    except (JournalError, OSError) as error:
+        parser.error('cannot resume: {}'.format(error))
+    if crawler.journal.checkpoint is not None:
+        print('Resuming after: {}'.format(crawler.journal.checkpoint))
+
+
+def watch(crawler, args, timeline, write_timeline_outputs, outputs, cache):
+    from .watch import Watcher
+
+    def changed(changes):
+        print("Changes: [{}]".format(len(changes)))
+        write_timeline_outputs(timeline)
+    watcher = Watcher(crawler, args.path, timeline, changed, args.debounce, args.jobs, cache)
+    for output_format, output in outputs:
+        watcher.ignore.update([output, temporary_output(output)])
+    for extension in ('.cache', '.quarantine', '.journal', '.stats.json', '.prof'):
+        watcher.ignore.add(os.path.join(os.getcwd(), args.filename + extension))
+    print("Watching: {} (Ctrl+C to stop)".format(args.path))
+    with watcher:
+        watcher.run()
+
+
+def close_crawler(crawler, filename):
+    if crawler.quarantine is not None:
+        print("Quarantine: [{}] skipped".format(crawler.quarantine.skipped))
+        crawler.quarantine.close()
+    if crawler.prefetch is not None:
+        print("Prefetch: [{}] files read ahead, [{}] reads on demand, [{:.3f}]s waiting".format(
+            crawler.prefetch.files, crawler.prefetch.fallback_reads, crawler.prefetch.wait
+        ))
+    if crawler.stats is not None:
+        filename_stats = os.path.join(os.getcwd(), filename + '.stats.json')
+        crawler.stats.write(filename_stats)
+        print("Stats: {}\n{}".format(filename_stats, crawler.stats.summary()))
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ['merge']:
+        return merge_main(argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # get the arguments value
+    if args.path == None or not os.path.isdir(args.path):
+        print("Invalid target path: {}".format(args.path))
+
+    if args.filename == None:
+        print("Invalid filename: {}".format(args.filename))
+
+    output_formats = parse_output_formats(parser, args.format)
+    filename = args.filename
+    outputs = output_paths(filename, output_formats, args.gzip, args.html_shards)
+
+    print('Target path: {}'.format(args.path))
+    for output_format, output in outputs:
+        print('{}: {}'.format(output_format.upper(), output))
+    profile = None
+    if args.profile:
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+    cache = None
+    if args.cache:
+        from .cache import ScanCache
+        cache = ScanCache(os.path.join(os.getcwd(), filename + '.cache'))
+        print('Cache: {}'.format(cache.filename))
+    crawler = create_crawler(args)
+    if cache is not None:
+        crawler.progress_total = cache.count(args.path) or None
+    if args.journal or args.resume:
+        open_journal(crawler, args, parser)
+    timeline = crawler.collect_timeline(args.path, jobs=args.jobs, cache=cache)
+    if crawler.journal is not None:
+        print("Journal: [{}] documents resumed, [{}] recorded".format(
+            crawler.journal.replayed, crawler.journal.recorded
+        ))
+    created = (args.created_from, args.created_to)
+    modified = (args.modified_from, args.modified_to)
+    selected = created != (None, None) or modified != (None, None) or args.author is not None or args.mime is not None
+    sinks = {} if args.watch else None
+
+    def write_timeline_outputs(timeline):
+        if selected:
+            timeline = timeline.select(created, modified, args.author, args.mime)
+            print("Documents selected: [{}]".format(timeline.total()))
+        print(
+            "Writing [{}] documents timeline: [{}]\n\tPath: [{}]"
+            .format(timeline.total(), ', '.join(output_formats), args.path)
+        )
+        write_outputs(crawler, args.path, timeline, outputs, args.html_shards, sinks)
+
+    write_timeline_outputs(timeline)
+    if crawler.journal is not None:
+        crawler.journal.remove()
+        crawler.journal = None
+    if args.watch:
+        watch(crawler, args, timeline, write_timeline_outputs, outputs, cache)
+    if cache is not None:
+        cache.close()
+    close_crawler(crawler, filename)
+    if profile is not None:
+        profile.disable()
+        filename_profile = os.path.join(os.getcwd(), filename + '.prof')
+        profile.dump_stats(filename_profile)
+        print("Profile: {}".format(filename_profile))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import array
+
+NULL = -(1 << 63)
+
+STRING_COLUMNS = ('directory', 'author', 'author_last', 'mime', 'reason', 'content_hash')
+INTEGER_COLUMNS = ('date_create_epoch', 'date_modified_epoch', 'size', 'pages')
+
+
+class StringTable():
+    def __init__(self):
+        self._ids = {None: 0}
+        self._values = [None]
+
+    def add(self, value):
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self._values)
+            self._ids[value] = index
+            self._values.append(value)
+        return index
+
+    def get(self, index):
+        return self._values[index]
+
+    def __len__(self):
+        return len(self._values) - 1
+
+
+class ColumnStore():
+    def __init__(self, document_class, strings=None):
+        self.document_class = document_class
+        self.strings = StringTable() if strings is None else strings
+        self.names = []
+        self.processed = bytearray()
+        self.columns = {}
+        for column in STRING_COLUMNS:
+            self.columns[column] = array.array('L')
+        for column in INTEGER_COLUMNS:
+            self.columns[column] = array.array('q')
+        self.others = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, document):
+        row = len(self.names)
+        self.names.append(document.name)
+        self.processed.append(1 if document.processed else 0)
+        for column in STRING_COLUMNS:
+            value = getattr(document, column)
+            if value is not None and not isinstance(value, str):
+                self.others[(row, column)] = value
+                value = None
+            self.columns[column].append(self.strings.add(value))
+        for column in INTEGER_COLUMNS:
+            value = getattr(document, column)
+            if value is None:
+                value = NULL
+            elif not isinstance(value, int) or isinstance(value, bool) or value == NULL:
+                self.others[(row, column)] = value
+                value = NULL
+            self.columns[column].append(value)
+
+    def value(self, row, column):
+        if column == 'name':
+            return self.names[row]
+        if column == 'processed':
+            return bool(self.processed[row])
+        value = self.columns[column][row]
+        if column in STRING_COLUMNS:
+            value = self.strings.get(value)
+        elif value == NULL:
+            value = None
+        if value is None:
+            return self.others.get((row, column))
+        return value
+
+    def column_values(self, column):
+        if column == 'name':
+            return list(self.names)
+        if column in STRING_COLUMNS:
+            get = self.strings.get
+            values = [get(index) for index in self.columns[column]]
+        else:
+            values = [None if value == NULL else value for value in self.columns[column]]
+        for (row, other), value in self.others.items():
+            if other == column:
+                values[row] = value
+        return values
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self.names)
+        document = self.document_class(self.strings.get(self.columns['directory'][row]) + self.names[row], size=0)
+        for column in STRING_COLUMNS[1:] + INTEGER_COLUMNS:
+            setattr(document, column, self.value(row, column))
+        document.processed = bool(self.processed[row])
+        return document
+
+    def __iter__(self):
+        for row in range(len(self.names)):
+            yield self[row]
+
+    def sort_keys(self, column):
+        values = self.columns[column]
+        if column in STRING_COLUMNS:
+            strings = self.strings
+            return [strings.get(index) or '' for index in values]
+        return values
+
+    def take(self, rows):
+        store = ColumnStore(self.document_class, self.strings)
+        store.names = [self.names[row] for row in rows]
+        store.processed = bytearray(self.processed[row] for row in rows)
+        for column, values in self.columns.items():
+            store.columns[column] = array.array(values.typecode, [values[row] for row in rows])
+        positions = {row: position for position, row in enumerate(rows)} if self.others else {}
+        for (row, column), value in self.others.items():
+            if row in positions:
+                store.others[(positions[row], column)] = value
+        return store
+
+    def replace(self, store):
+        self.names = store.names
+        self.processed = store.processed
+        self.columns = store.columns
+        self.others = store.others
+
+    def sort(self, key):
+        if callable(key):
+            keys = [key(document) for document in self]
+        else:
+            keys = self.sort_keys(key)
+        self.replace(self.take(sorted(range(len(self.names)), key=keys.__getitem__)))
+
+    def filter(self, column, predicate):
+        return self.take([
+            row for row in range(len(self.names)) if predicate(self.value(row, column))
+        ])
@@ -0,0 +1,61 @@
+import time
+import itertools
+import datetime as dt
+from .sorting import ExternalSorter
+
+
+class DuplicateCopies():
+    def spool(self, items, key):
+        if self.run_size is None:
+            return sorted(items, key=key)
+        spooled = ExternalSorter(key, self.run_size)
+        for item in items:
+            spooled.append(item)
+        return spooled
+
+    def find_duplicates(self, entries):
+        started = time.perf_counter()
+        from .duplicates import DuplicateFinder, entry_size
+        document_class = self.document_class
+        finder = DuplicateFinder()
+        by_size = self.spool(enumerate(entries), lambda item: (
+            (0, item[0]) if isinstance(item[1], document_class) else (entry_size(item[1]), item[0])
+        ))
+        discovered = (entry for _, entry in by_size if not isinstance(entry, document_class))
+        copies = {}
+        groups = 0
+        for size, bucket in itertools.groupby(discovered, key=entry_size):
+            bucket = list(bucket)
+            if size == 0 or len(bucket) < 2:
+                continue
+            stats = {entry.path: entry.stat for entry in bucket}
+            for group in finder.find_size(size, list(stats)):
+                groups += 1
+                copies[group.paths[0]] = (
+                    group.content_hash, stats[group.paths[0]], [(path, stats[path]) for path in group.paths[1:]]
+                )
+        self.measure('duplicates', started, finder.bytes_read)
+        skipped = set(path for _, _, paths in copies.values() for path, _ in paths)
+        print("Duplicates: [{}] groups, [{}] copies".format(groups, len(skipped)))
+        by_size.sort(key=lambda item: item[0])
+        return (entry for _, entry in by_size if entry.path not in skipped), copies
+
+    def copy_document_info(self, document, path, stat, source_stat):
+        copy = document.copy(path, stat)
+        if source_stat is not None:
+            if copy.date_create == dt.datetime.fromtimestamp(source_stat.st_ctime):
+                copy.set_date_create_from_file()
+            if copy.date_modified == dt.datetime.fromtimestamp(source_stat.st_mtime):
+                copy.set_date_modified_from_file()
+        return copy
+
+    def iter_copies(self, documents, copies):
+        from .archives import ARCHIVE_SEPARATOR
+        for document in documents:
+            source, separator, member = document.path.partition(ARCHIVE_SEPARATOR)
+            content_hash, source_stat, paths = copies.get(source, (None, None, ()))
+            if not separator and source in copies:
+                document.content_hash = content_hash
+            yield document
+            for path, stat in paths:
+                yield self.copy_document_info(document, path + separator + member, stat, source_stat)
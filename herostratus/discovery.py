@@ -0,0 +1,177 @@
+import os
+import stat as st
+import zlib
+import fnmatch
+import collections
+
+DiscoveredFile = collections.namedtuple('DiscoveredFile', ['path', 'stat'])
+
+SHARD_MODES = ('hash', 'subtree')
+
+
+def parse_shard(text):
+    index, _, count = text.partition('/')
+    index, count = int(index), int(count)
+    if count < 1 or not 0 <= index < count:
+        raise ValueError("Invalid shard: {}".format(text))
+    return index, count
+
+
+def discovery_key(relative):
+    parts = relative.split(os.sep)
+    return tuple((1, part) for part in parts[:-1]) + ((0, parts[-1]),)
+
+
+def directory_key(relative):
+    return tuple((1, part) for part in relative.split(os.sep))
+
+
+def scanned_before(key, start):
+    if start is None:
+        return False
+    if key[-1][0] == 0:
+        return key <= start
+    return key < start and start[:len(key)] != key
+
+
+def shard_of(relative, count, by='hash'):
+    relative = relative.replace(os.sep, '/')
+    if by == 'subtree':
+        relative = relative.split('/', 1)[0]
+    return zlib.crc32(relative.encode('utf-8', 'surrogateescape')) % count
+
+
+class Discovery():
+    def __init__(self):
+        self.include = []
+        self.exclude = []
+        self.max_depth = None
+        self.hidden = True
+        self.same_filesystem = False
+        self.hardlinks = True
+        self.extensions = None
+        self.shard = None
+        self.shard_by = 'hash'
+
+    def is_hidden(self, name):
+        return name.startswith('.')
+
+    def matches(self, patterns, name, relative):
+        for pattern in patterns:
+            if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative, pattern):
+                return True
+        return False
+
+    def in_shard(self, relative):
+        if self.shard is None:
+            return True
+        index, count = self.shard
+        return shard_of(relative, count, self.shard_by) == index
+
+    def accepts_directory(self, entry, relative, depth, device):
+        if not self.hidden and self.is_hidden(entry.name):
+            return False
+        if depth == 1 and self.shard_by == 'subtree' and not self.in_shard(relative):
+            return False
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        if self.matches(self.exclude, entry.name, relative):
+            return False
+        if self.same_filesystem and entry.stat(follow_symlinks=False).st_dev != device:
+            return False
+        return True
+
+    def accepts_file(self, entry, relative):
+        return self.accepts_name(entry.name, relative) and self.in_shard(relative)
+
+    def accepts_name(self, name, relative):
+        if not self.hidden and self.is_hidden(name):
+            return False
+        if self.extensions is not None:
+            if os.path.splitext(name)[1].lower() not in self.extensions:
+                return False
+        if self.include and not self.matches(self.include, name, relative):
+            return False
+        if self.matches(self.exclude, name, relative):
+            return False
+        return True
+
+    def accepts_directory_path(self, target_path, path):
+        relative = os.path.relpath(path, target_path)
+        if relative == os.curdir:
+            return True
+        parts = relative.split(os.sep)
+        if parts[0] == os.pardir:
+            return False
+        if self.max_depth is not None and len(parts) > self.max_depth:
+            return False
+        for depth, name in enumerate(parts, 1):
+            if not self.hidden and self.is_hidden(name):
+                return False
+            if self.matches(self.exclude, name, os.path.join(*parts[:depth])):
+                return False
+        return True
+
+    def accepts_path(self, target_path, path):
+        if not self.accepts_directory_path(target_path, os.path.dirname(path)):
+            return False
+        relative = os.path.relpath(path, target_path)
+        return self.accepts_name(os.path.basename(path), relative) and self.in_shard(relative)
+
+    def directories(self, target_path):
+        device = os.stat(target_path).st_dev
+        directories = [(target_path, '', 0)]
+        while directories:
+            directory, relative_directory, depth = directories.pop()
+            yield directory
+            try:
+                with os.scandir(directory) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirectories = []
+            for entry in entries:
+                relative = os.path.join(relative_directory, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False) and self.accepts_directory(entry, relative, depth + 1, device):
+                        subdirectories.append((entry.path, relative, depth + 1))
+                except OSError:
+                    continue
+            directories.extend(reversed(subdirectories))
+
+    def scan(self, target_path, after=None):
+        start = None if after is None else discovery_key(after)
+        device = os.stat(target_path).st_dev
+        seen_inodes = set()
+        directories = [(target_path, '', 0)]
+        while directories:
+            directory, relative_directory, depth = directories.pop()
+            try:
+                with os.scandir(directory) as iterator:
+                    entries = sorted(iterator, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirectories = []
+            for entry in entries:
+                relative = os.path.join(relative_directory, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if scanned_before(directory_key(relative), start):
+                            continue
+                        if self.accepts_directory(entry, relative, depth + 1, device):
+                            subdirectories.append((entry.path, relative, depth + 1))
+                        continue
+                    if scanned_before(discovery_key(relative), start):
+                        continue
+                    if not entry.is_file() or not self.accepts_file(entry, relative):
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if not self.hardlinks and stat.st_nlink > 1:
+                    inode = (stat.st_dev, stat.st_ino)
+                    if inode in seen_inodes:
+                        continue
+                    seen_inodes.add(inode)
+                yield DiscoveredFile(entry.path, stat)
+            directories.extend(reversed(subdirectories))
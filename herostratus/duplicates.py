@@ -0,0 +1,81 @@
+import hashlib
+import itertools
+import collections
+
+BLOCK_SIZE = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+DIGEST_SIZE = 16
+
+DuplicateGroup = collections.namedtuple('DuplicateGroup', ['content_hash', 'size', 'paths'])
+
+
+def entry_size(entry):
+    return entry.stat.st_size
+
+
+class DuplicateFinder():
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.bytes_read = 0
+        self.partial_hashes = 0
+        self.full_hashes = 0
+
+    def partial_hash(self, path, size):
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        with open(path, 'rb') as file:
+            head = file.read(self.block_size)
+            digest.update(head)
+            self.bytes_read += len(head)
+            if size > 2 * self.block_size:
+                file.seek(size - self.block_size)
+                tail = file.read(self.block_size)
+            else:
+                tail = file.read()
+            digest.update(tail)
+            self.bytes_read += len(tail)
+        self.partial_hashes += 1
+        return digest.hexdigest()
+
+    def full_hash(self, path):
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        with open(path, 'rb') as file:
+            while True:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                self.bytes_read += len(chunk)
+        self.full_hashes += 1
+        return digest.hexdigest()
+
+    def split(self, paths, hash_function):
+        buckets = collections.defaultdict(list)
+        for path in paths:
+            try:
+                buckets[hash_function(path)].append(path)
+            except OSError:
+                continue
+        return buckets
+
+    def find_size(self, size, paths):
+        groups = []
+        partial = self.split(paths, lambda path: self.partial_hash(path, size))
+        for partial_hash, candidates in sorted(partial.items()):
+            if len(candidates) < 2:
+                continue
+            if size <= 2 * self.block_size:
+                groups.append(DuplicateGroup(partial_hash, size, sorted(candidates)))
+                continue
+            full = self.split(candidates, self.full_hash)
+            for full_hash, duplicates in sorted(full.items()):
+                if len(duplicates) > 1:
+                    groups.append(DuplicateGroup(full_hash, size, sorted(duplicates)))
+        return groups
+
+    def find(self, entries):
+        groups = []
+        for size, bucket in itertools.groupby(sorted(entries, key=entry_size), key=entry_size):
+            paths = [entry.path for entry in bucket]
+            if size > 0 and len(paths) > 1:
+                groups.extend(self.find_size(size, paths))
+        return groups
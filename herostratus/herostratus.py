@@ -1,19 +1,52 @@
 #!/usr/bin/python3
 import os
+import sys
 from os import path
-import pathlib
-import magic
 import re
-from docx import Document
-from pptx import Presentation
-from PyPDF2 import PdfFileReader, utils
-import argparse
 import warnings
+import contextlib
+import time
+import heapq
+import importlib
 import datetime as dt
-from tqdm import tqdm
-import dominate
 import xml.etree.ElementTree as xee
-import xlwt
+from .sorting import ExternalSorter
+from .discovery import Discovery
+from .columns import ColumnStore, StringTable
+from .index import TimelineIndex, stream_query
+from .isolation import describe_error
+from .stats import Stats
+from .lazy import lazy_import, load_object, iter_entry_points
+from . import ooxml
+from . import ole2
+from . import pdfmeta
+from .pipeline import Pipeline
+from .copies import DuplicateCopies
+from .outputs import TimelineOutput
+
+magic = lazy_import('magic')
+docx = lazy_import('docx')
+pptx = lazy_import('pptx')
+PyPDF2 = lazy_import('PyPDF2')
+tqdm = lazy_import('tqdm')
+
+LAZY_NAMES = {
+    'ScanCache': 'cache',
+    'IsolatedPool': 'isolation', 'Quarantine': 'isolation',
+    'Watcher': 'watch',
+    'DuplicateFinder': 'duplicates',
+    'ArchiveReader': 'archives', 'ArchiveError': 'archives',
+    'ARCHIVE_SEPARATOR': 'archives', 'ARCHIVE_EXTENSIONS': 'archives',
+    'Prefetcher': 'prefetch', 'PrefetchedEntry': 'prefetch',
+    'PartialTimelineWriter': 'partial', 'PartialTimeline': 'partial', 'PartialError': 'partial',
+    'Journal': 'journal', 'JournalError': 'journal'
+}
+
+def __getattr__(name):
+    module = LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    return getattr(importlib.import_module('.' + module, __package__), name)
 
 warnings.filterwarnings('ignore')
 
@@ -32,25 +65,167 @@ def fetch_or_fail(keyword, haystack):
     else:
         return needle.group(0)[len(keyword)]
 
+MAGIC_BUFFER_SIZE = 1024 * 1024
+
+class FileType():
+    def __init__(self, mime, header, detector, stat=None, source=None):
+        self.mime = mime
+        self.stat = stat
+        self.source = source
+        self._header = header
+        self._detector = detector
+        self._description = None
+        self.header_size = len(header)
+        self.bytes_read = 0
+
+    @property
+    def description(self):
+        if self._description is None:
+            self._description = self._detector.describe(self._header)
+            self._header = None
+        return self._description
+
+class MagicDetector():
+    def __init__(self):
+        self._mime = magic.Magic(mime=True)
+        self._description = magic.Magic()
+
+    def describe(self, header):
+        return self._description.from_buffer(header)
+
+    def detect(self, filename, stat=None, source=None):
+        with open(filename, 'rb') if source is None else source.open() as file:
+            header = file.read(MAGIC_BUFFER_SIZE)
+        return FileType(self._mime.from_buffer(header), header, self, stat, source)
+
+_magic_detector = None
+
+def get_magic_detector():
+    global _magic_detector
+    if _magic_detector is None or _magic_detector[0] != os.getpid():
+        _magic_detector = (os.getpid(), MagicDetector())
+    return _magic_detector[1]
+
+EPOCH = dt.datetime(1970, 1, 1)
+MICROSECOND = dt.timedelta(microseconds=1)
+
+def datetime_to_epoch(value):
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // MICROSECOND
+
+def epoch_to_datetime(value):
+    if value is None:
+        return None
+    return EPOCH + dt.timedelta(microseconds=value)
+
+def intern_or_none(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+def split_path(path):
+    index = path.rfind(os.sep) + 1
+    return sys.intern(path[:index]), path[index:]
+
 class DocumentInfo():
-    def __init__(self, path=''):
-        self.path = path
-        self.name = os.path.basename(path)
-        self.author = None
-        self.author_last = None
-        self.date_create = None
-        self.date_modified = None
-        self.size = os.path.getsize(path)
+    __slots__ = (
+        'directory', 'name', '_author', '_author_last', 'date_create_epoch', 'date_modified_epoch',
+        'size', '_mime', 'pages', 'processed', 'reason', 'content_hash', '_stat'
+    )
+    STATE = __slots__[:-1]
+
+    def __init__(self, path='', size=None, stat=None):
+        self.directory, self.name = split_path(path)
+        self._author = None
+        self._author_last = None
+        self.date_create_epoch = None
+        self.date_modified_epoch = None
+        if size is None:
+            size = os.path.getsize(path) if stat is None else stat.st_size
+        self.size = size
+        self._mime = None
         self.pages = None
         self.processed = False
+        self.reason = None
+        self.content_hash = None
+        self._stat = stat
+
+    @property
+    def path(self):
+        return self.directory + self.name
+
+    @path.setter
+    def path(self, value):
+        self.directory, self.name = split_path(value)
+
+    @property
+    def author(self):
+        return self._author
+
+    @author.setter
+    def author(self, value):
+        self._author = intern_or_none(value)
+
+    @property
+    def author_last(self):
+        return self._author_last
+
+    @author_last.setter
+    def author_last(self, value):
+        self._author_last = intern_or_none(value)
+
+    @property
+    def mime(self):
+        return self._mime
+
+    @mime.setter
+    def mime(self, value):
+        self._mime = intern_or_none(value)
+
+    @property
+    def date_create(self):
+        return epoch_to_datetime(self.date_create_epoch)
+
+    @date_create.setter
+    def date_create(self, value):
+        self.date_create_epoch = datetime_to_epoch(value)
+
+    @property
+    def date_modified(self):
+        return epoch_to_datetime(self.date_modified_epoch)
+
+    @date_modified.setter
+    def date_modified(self, value):
+        self.date_modified_epoch = datetime_to_epoch(value)
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.STATE)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.STATE, state):
+            setattr(self, name, value)
+        self._stat = None
+
+    def copy(self, path, stat=None):
+        document = DocumentInfo.__new__(DocumentInfo)
+        document.__setstate__(self.__getstate__())
+        document.path = path
+        document._stat = stat
+        return document
+
+    def file_stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
 
     def set_date_create_from_file(self):
-        fname = pathlib.Path(self.path)
-        self.date_create = dt.datetime.fromtimestamp(fname.stat().st_ctime)
+        self.date_create = dt.datetime.fromtimestamp(self.file_stat().st_ctime)
 
     def set_date_modified_from_file(self):
-        fname = pathlib.Path(self.path)
-        self.date_modified = dt.datetime.fromtimestamp(fname.stat().st_mtime)
+        self.date_modified = dt.datetime.fromtimestamp(self.file_stat().st_mtime)
 
     def to_xml_document(self):
         root = xee.Element("document")
@@ -80,6 +255,9 @@ class DocumentInfo():
         e_path.text = self.path
         e_size = xee.SubElement(root, "size")
         e_size.text = str(self.size)
+        if self.reason is not None:
+            e_reason = xee.SubElement(root, "reason")
+            e_reason.text = self.reason
         return root
 
     def to_xml(self):
@@ -88,22 +266,95 @@ class DocumentInfo():
         else:
             return self.to_xml_file()
 
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'author': None if self.author is None else str(self.author),
+            'author_last': None if self.author_last is None else str(self.author_last),
+            'date_create': None if self.date_create is None else self.date_create.isoformat(),
+            'date_modified': None if self.date_modified is None else self.date_modified.isoformat(),
+            'size': self.size,
+            'pages': self.pages,
+            'processed': self.processed,
+            'mime': self.mime,
+            'reason': self.reason,
+            'content_hash': self.content_hash
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        doc_info = cls(data['path'], size=data['size'])
+        doc_info.author = data['author']
+        doc_info.author_last = data['author_last']
+        if data['date_create'] is not None:
+            doc_info.date_create = dt.datetime.fromisoformat(data['date_create'])
+        if data['date_modified'] is not None:
+            doc_info.date_modified = dt.datetime.fromisoformat(data['date_modified'])
+        doc_info.pages = data['pages']
+        doc_info.processed = data['processed']
+        doc_info.mime = data.get('mime')
+        doc_info.reason = data.get('reason')
+        doc_info.content_hash = data.get('content_hash')
+        return doc_info
+
     def __str__(self):
         return "\nName: {}, Author: {}\nDate_c: {} Date_m: {}\nPages: {} Size: {}\nPath{}".format(
             self.name, self.author, self.date_create, self.date_modified, self.pages, self.size, self.path
         )
 
 def document_info_sort_date_create(e):
-    return e.date_create
+    return e.date_create_epoch
 
 def document_info_sort_date_modified(e):
-    return e.date_create
+    return e.date_modified_epoch
+
+SORT_COLUMNS = {
+    document_info_sort_date_create: 'date_create_epoch',
+    document_info_sort_date_modified: 'date_modified_epoch'
+}
+
+def bisect_documents(documents, value, key, right=False):
+    low, high = 0, len(documents)
+    while low < high:
+        middle = (low + high) // 2
+        current = key(documents[middle])
+        if current < value or (right and current == value):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+def epoch_range(bounds):
+    if bounds is None:
+        return (None, None)
+    low, high = bounds
+    return (datetime_to_epoch(low), datetime_to_epoch(high))
+
 class Timeline():
-    def __init__(self):
-        self.processed = []
-        self.unprocessed = []
+    def __init__(self, run_size=None, columnar=False):
+        if columnar:
+            strings = StringTable()
+            self.processed = ColumnStore(DocumentInfo, strings)
+            self.unprocessed = ColumnStore(DocumentInfo, strings)
+        elif run_size is None:
+            self.processed = []
+            self.unprocessed = []
+        else:
+            self.processed = ExternalSorter(document_info_sort_date_create, run_size)
+            self.unprocessed = ExternalSorter(document_info_sort_date_create, run_size)
+        self._indexes = {}
+
+    @classmethod
+    def merge(cls, timelines, key=document_info_sort_date_create, run_size=None, columnar=False):
+        timeline = cls(run_size, columnar)
+        for section in ('processed', 'unprocessed'):
+            documents = getattr(timeline, section)
+            for doc in heapq.merge(*[getattr(part, section) for part in timelines], key=key):
+                documents.append(doc)
+        return timeline
 
     def add(self, doc):
+        self._indexes = {}
         if doc.processed:
             self.processed.append(doc)
         else:
@@ -112,17 +363,132 @@ class Timeline():
     def total(self):
         return len(self.processed) + len(self.unprocessed)
 
+    def section(self, doc):
+        return self.processed if doc.processed else self.unprocessed
+
+    def insert(self, doc, key=document_info_sort_date_create):
+        self._indexes = {}
+        documents = self.section(doc)
+        documents.insert(bisect_documents(documents, key(doc), key, right=True), doc)
+
+    def remove(self, doc, key=document_info_sort_date_create):
+        self._indexes = {}
+        documents = self.section(doc)
+        position = bisect_documents(documents, key(doc), key)
+        while position < len(documents) and key(documents[position]) == key(doc):
+            if documents[position].path == doc.path:
+                del documents[position]
+                return True
+            position += 1
+        return False
+
     def sort(self, key=document_info_sort_date_create):
-        self.processed.sort(key=key)
-        self.unprocessed.sort(key=key)
+        self._indexes = {}
+        if isinstance(self.processed, ColumnStore):
+            key = SORT_COLUMNS.get(key, key)
+            self.processed.sort(key)
+            self.unprocessed.sort(key)
+        else:
+            self.processed.sort(key=key)
+            self.unprocessed.sort(key=key)
+
+    def index(self, section='processed'):
+        if section not in self._indexes:
+            self._indexes[section] = TimelineIndex(getattr(self, section))
+        return self._indexes[section]
+
+    def query(self, created=None, modified=None, author=None, mime=None, section='processed'):
+        ranges = {
+            'date_create_epoch': epoch_range(created),
+            'date_modified_epoch': epoch_range(modified)
+        }
+        values = {}
+        if author is not None:
+            values['author'] = author
+        if mime is not None:
+            values['mime'] = mime
+        documents = getattr(self, section)
+        if isinstance(documents, ExternalSorter):
+            return iter(stream_query(documents, ranges, values))
+        return self.index(section).query(ranges, values)
+
+    def select(self, created=None, modified=None, author=None, mime=None):
+        timeline = Timeline()
+        for section in ('processed', 'unprocessed'):
+            setattr(timeline, section, list(self.query(created, modified, author, mime, section)))
+        return timeline
+
+    def filter(self, column, predicate):
+        timeline = Timeline()
+        if isinstance(self.processed, ColumnStore):
+            timeline.processed = self.processed.filter(column, predicate)
+            timeline.unprocessed = self.unprocessed.filter(column, predicate)
+        else:
+            timeline.processed = [doc for doc in self.processed if predicate(getattr(doc, column))]
+            timeline.unprocessed = [doc for doc in self.unprocessed if predicate(getattr(doc, column))]
+        return timeline
+
+def new_document_info(filename, file_type=None):
+    return DocumentInfo(filename, stat=None if file_type is None else file_type.stat)
+
+def document_source(filename, file_type=None):
+    if file_type is None or file_type.source is None:
+        return contextlib.nullcontext(filename)
+    return file_type.source.open()
+
+def open_document(filename, file_type=None):
+    if file_type is None:
+        return open(filename, 'rb')
+    if file_type.source is None:
+        return CountingFile(open(filename, 'rb'), file_type)
+    return CountingFile(file_type.source.open(), file_type)
+
+class CountingFile():
+    def __init__(self, file, file_type):
+        self._file = file
+        self._file_type = file_type
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._file_type.bytes_read += len(data)
+        return data
+
+    def read1(self, size=-1):
+        data = self._file.read1(size)
+        self._file_type.bytes_read += len(data)
+        return data
+
+    def readline(self, size=-1):
+        data = self._file.readline(size)
+        self._file_type.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer):
+        size = self._file.readinto(buffer)
+        self._file_type.bytes_read += size or 0
+        return size
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
 class MagicProcessor():
     def __init__(self):
         self._data = None
 
-    def process(self, filename):
-        doc_info = DocumentInfo(filename)
-        file_magic = magic.from_file(filename)
+    def process(self, filename, file_type=None):
+        doc_info = new_document_info(filename, file_type)
+        if file_type is None:
+            file_type = get_magic_detector().detect(filename)
+        file_magic = file_type.description
         
         doc_info.author = fetch_or_fail('Author:', file_magic)
         doc_info.author_last = fetch_or_fail('Last Saved By:', file_magic)
@@ -142,22 +508,46 @@ class MagicProcessor():
         doc_info.processed = True
         return doc_info
 
+class Ole2Processor():
+    def __init__(self):
+        self._data = None
+        self.reader = ole2.Ole2Reader()
+
+    def process(self, filename, file_type=None):
+        try:
+            with open_document(filename, file_type) as file:
+                properties = self.reader.read_summary(file)
+        except ole2.Ole2Error:
+            return processor_factory.instance(MagicProcessor).process(filename, file_type)
+        doc_info = new_document_info(filename, file_type)
+        doc_info.author = properties.author or ''
+        doc_info.author_last = properties.last_saved_by or ''
+        doc_info.date_create = properties.created
+        doc_info.date_modified = properties.last_saved
+        if doc_info.date_create == None:
+            doc_info.set_date_create_from_file()
+        if doc_info.date_modified == None:
+            doc_info.set_date_modified_from_file()
+        doc_info.pages = properties.pages if properties.pages is not None else properties.slides
+        doc_info.processed = True
+        return doc_info
+
 class XlsProcessor():
     def __init__(self):
         self._data = None
 
-    def process(self, filename):
-        doc_info = DocumentInfo(filename)
+    def process(self, filename, file_type=None):
+        doc_info = new_document_info(filename, file_type)
         return doc_info
 
 class DocxProcessor():
     def __init__(self):
         self._data = None
 
-    def process(self, filename):
-        doc_info = DocumentInfo(filename)
-        file = open(filename, 'rb')
-        document = Document(file)
+    def process(self, filename, file_type=None):
+        doc_info = new_document_info(filename, file_type)
+        file = open_document(filename, file_type)
+        document = docx.Document(file)
         core_props = document.core_properties;
         doc_info.author = core_props.author
         doc_info.author_last = core_props.last_modified_by
@@ -175,10 +565,10 @@ class PptxProcessor():
     def __init__(self):
         self._data = None
 
-    def process(self, filename):
-        doc_info = DocumentInfo(filename)
-        file = open(filename, 'rb')
-        document = Presentation(file)
+    def process(self, filename, file_type=None):
+        doc_info = new_document_info(filename, file_type)
+        file = open_document(filename, file_type)
+        document = pptx.Presentation(file)
         core_props = document.core_properties;
         doc_info.author = core_props.author
         doc_info.author_last = core_props.last_modified_by
@@ -195,13 +585,34 @@ class PptxProcessor():
 class PdfProcessor():
     def __init__(self):
         self._data = None
+        self.reader = pdfmeta.MetadataReader()
 
-    def process(self, filename):
+    def process(self, filename, file_type=None):
+        try:
+            with document_source(filename, file_type) as source:
+                metadata = self.reader.read_metadata(source)
+        except pdfmeta.PdfMetaError:
+            return self.process_pypdf(filename, file_type)
+        if file_type is not None:
+            file_type.bytes_read += metadata.bytes_read
+        doc_info = new_document_info(filename, file_type)
+        doc_info.author = metadata.author
+        doc_info.date_create = metadata.created
+        doc_info.date_modified = metadata.modified
+        doc_info.pages = metadata.pages
+        if doc_info.date_create == None:
+            doc_info.set_date_create_from_file()
+        if doc_info.date_modified == None:
+            doc_info.set_date_modified_from_file()
+        doc_info.processed = True
+        return doc_info
+
+    def process_pypdf(self, filename, file_type=None):
         # print("PDF: {}".format(filename))
-        doc_info = DocumentInfo(filename)
-        file = open(filename, 'rb')
+        doc_info = new_document_info(filename, file_type)
+        file = open_document(filename, file_type)
         try:
-            pdf = PdfFileReader(file, strict=False)
+            pdf = PyPDF2.PdfFileReader(file, strict=False)
             info = pdf.documentInfo
             xmp = pdf.xmpMetadata
             doc_info.pages = pdf.getNumPages()
@@ -215,7 +626,7 @@ class PdfProcessor():
             if doc_info.date_modified == None:
                 doc_info.set_date_modified_from_file()
             doc_info.processed = True
-        except utils.PdfReadError:
+        except PyPDF2.utils.PdfReadError:
             print('PDF: [{}] processing error'.format(filename))
             doc_info.set_date_create_from_file()
             doc_info.set_date_modified_from_file()
@@ -225,249 +636,338 @@ class PdfProcessor():
 class DefaultProcessor():
     def __init__(self):
         self._data = None
-    def process(self, filename):
-        doc_info = DocumentInfo(filename)
+    def process(self, filename, file_type=None):
+        doc_info = new_document_info(filename, file_type)
         doc_info.author = None
         doc_info.author_last = None
         doc_info.set_date_create_from_file()
         doc_info.set_date_modified_from_file()
         doc_info.processed = False;
         return doc_info
-class DocumentProcessorFactory():
+MIME_DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+MIME_PPTX = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+class OoxmlProcessor():
+    fallbacks = {
+        MIME_DOCX: DocxProcessor,
+        MIME_XLSX: MagicProcessor,
+        MIME_PPTX: PptxProcessor
+    }
+
     def __init__(self):
+        self._data = None
+        self.reader = ooxml.OoxmlReader()
+
+    def fallback(self, filename, file_type=None):
+        if file_type is None:
+            file_type = get_magic_detector().detect(filename)
+        processor = self.fallbacks.get(file_type.mime, DefaultProcessor)
+        return processor_factory.instance(processor).process(filename, file_type)
+
+    def process(self, filename, file_type=None):
+        try:
+            with open_document(filename, file_type) as file:
+                properties = self.reader.read_properties(file)
+        except ooxml.OoxmlError:
+            return self.fallback(filename, file_type)
+        doc_info = new_document_info(filename, file_type)
+        doc_info.author = properties.author
+        doc_info.author_last = properties.last_modified_by
+        doc_info.date_create = properties.created
+        doc_info.date_modified = properties.modified
+        doc_info.pages = properties.pages if properties.pages is not None else properties.slides
+        if doc_info.date_create == None:
+            doc_info.set_date_create_from_file()
+        if doc_info.date_modified == None:
+            doc_info.set_date_modified_from_file()
+        doc_info.processed = True
+        return doc_info
+
+PROCESSOR_ENTRY_POINTS = 'herostratus.processors'
+
+class DocumentProcessorFactory():
+    def __init__(self, entry_points=PROCESSOR_ENTRY_POINTS):
         self._processors = {}
+        self._instances = {}
+        self.entry_points = entry_points
 
     def register_mime(self, mime, processor):
         self._processors[mime] = processor
 
-    def get_processor(self, mime):
+    def load_entry_points(self):
+        if self.entry_points is None:
+            return
+        for mime, reference in iter_entry_points(self.entry_points):
+            self.register_mime(mime, reference)
+        self.entry_points = None
+
+    def resolve(self, mime):
+        self.load_entry_points()
         processor = self._processors.get(mime)
+        if isinstance(processor, str):
+            try:
+                processor = load_object(processor)
+            except ImportError as error:
+                print("Processor: [{}] for [{}] cannot be loaded: {}".format(self._processors[mime], mime, error))
+                processor = None
+            self._processors[mime] = processor
+        return processor
+
+    def instance(self, processor):
+        instance = self._instances.get(processor)
+        if instance is None:
+            instance = self._instances[processor] = processor()
+        return instance
+
+    def get_processor(self, mime):
+        processor = self.resolve(mime)
         if not processor:
             processor = DefaultProcessor
-        return processor()
+        return self.instance(processor)
 
 processor_factory = DocumentProcessorFactory()
-processor_factory.register_mime('application/msword', MagicProcessor)
-processor_factory.register_mime('application/vnd.ms-excel', MagicProcessor)
-processor_factory.register_mime('application/vnd.ms-powerpoint', MagicProcessor)
+processor_factory.register_mime('application/msword', Ole2Processor)
+processor_factory.register_mime('application/vnd.ms-excel', Ole2Processor)
+processor_factory.register_mime('application/vnd.ms-powerpoint', Ole2Processor)
 processor_factory.register_mime('text/rtf', MagicProcessor)
 
-processor_factory.register_mime('application/vnd.openxmlformats-officedocument.wordprocessingml.document', DocxProcessor)
-processor_factory.register_mime('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', MagicProcessor)
-processor_factory.register_mime('application/vnd.openxmlformats-officedocument.presentationml.presentation', PptxProcessor)
+processor_factory.register_mime(MIME_DOCX, OoxmlProcessor)
+processor_factory.register_mime(MIME_XLSX, OoxmlProcessor)
+processor_factory.register_mime(MIME_PPTX, OoxmlProcessor)
 
 processor_factory.register_mime('application/pdf', PdfProcessor)
 
-class Crawler():
+_worker_crawler = None
+
+def get_worker_crawler(archives=None, measure=False):
+    global _worker_crawler
+    if _worker_crawler is None or _worker_crawler[0] != os.getpid():
+        _worker_crawler = (os.getpid(), Crawler())
+    crawler = _worker_crawler[1]
+    crawler.archives = archives
+    crawler.stats = Stats() if measure else None
+    return crawler
+
+class Crawler(Pipeline, DuplicateCopies, TimelineOutput):
+    document_class = DocumentInfo
+    processors = processor_factory
 
     def __init__(self):
-        self.supported = ['application/msword', 'docx', 'xls', 'xlx', 'ppt', 'pptx', 'pdf']
+        self.supported = ['.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.pdf', '.rtf']
+        self.run_size = None
+        self.columnar = False
+        self.timeout = None
+        self.memory_limit = None
+        self.quarantine = None
+        self.stats = None
+        self.progress = False
+        self.progress_total = None
+        self.duplicates = False
+        self.archives = None
+        self.prefetch = None
+        self.journal = None
+        self.batch_size = 1
+        self.discovery = Discovery()
+
+    def iter_entries(self, target_path="/tmp", after=None):
+        return self.discovery.scan(target_path, after)
+
+    def iter_files(self, target_path="/tmp"):
+        for entry in self.iter_entries(target_path):
+            yield entry.path
 
     def discover(self, target_path="/tmp"):
-        filelist = []
-        for dirName, subdirList, fileList in os.walk(target_path):
-            for fname in fileList:
-                filename = os.path.join(dirName, fname)
-                filelist.append(filename)
-        return filelist
-
-    def create_document_info_from_file(self, filename):
-        file_magic = magic.from_file(filename, mime=True)
-        document_info = None
+        return list(self.iter_files(target_path))
+
+    def measure(self, stage, started, size=0, error=False, path=None):
+        if self.stats is not None:
+            self.stats.record(stage, time.perf_counter() - started, size, error, path)
+
+    def iter_measured(self, stage, iterator):
+        iterator = iter(iterator)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.measure(stage, started)
+            yield item
+
+    def detect_file_type(self, filename, stat=None, source=None):
+        started = time.perf_counter()
+        try:
+            file_type = get_magic_detector().detect(filename, stat, source)
+        except Exception as error:
+            print("File: [{}] detection failed: {}".format(filename, describe_error(error)))
+            self.measure('detect', started, 0, True)
+            return None, self.failed_document_info(filename, stat, describe_error(error))
+        self.measure('detect', started, file_type.header_size)
+        return file_type, None
+
+    def create_document_info_from_file(self, filename, stat=None, source=None):
+        started = time.perf_counter()
+        file_type, document_info = self.detect_file_type(filename, stat, source)
+        if file_type is None:
+            self.measure('file', started, 0, True, filename)
+            return document_info
         try:
-            processor = processor_factory.get_processor(file_magic)
+            processor = processor_factory.get_processor(file_type.mime)
         except ValueError:
             print("File: [{}] is not supported.".format(filename))            
         else:
-            document_info = processor.process(filename)
+            document_info = self.process_document_info(processor, filename, stat, file_type)
+        self.measure('file', started, 0, document_info is None or document_info.reason is not None, filename)
         return document_info
 
-    def collect_timeline(self, target_path="/tmp")-> Timeline:
-        timeline = Timeline()
-        files = self.discover(target_path)
-        for file in files:
-            file_docu_info = self.create_document_info_from_file(file)
+    def process_document_info(self, processor, filename, stat, file_type):
+        processing = time.perf_counter()
+        try:
+            document_info = processor.process(filename, file_type)
+        except Exception as error:
+            print("File: [{}] processing failed: {}".format(filename, describe_error(error)))
+            document_info = self.failed_document_info(filename, stat, describe_error(error))
+        document_info.mime = file_type.mime
+        self.measure(
+            'processor.' + type(processor).__name__, processing,
+            file_type.bytes_read, document_info.reason is not None
+        )
+        return document_info
+
+    def is_archive(self, filename):
+        return self.archives is not None and self.archives.matches(filename)
+
+    def create_document_infos_from_archive(self, filename, stat=None):
+        from .archives import ArchiveError
+        documents = [self.create_document_info_from_file(filename, stat)]
+        started = time.perf_counter()
+        members = self.archives.members(filename)
+        try:
+            for member in members:
+                document = self.create_document_info_from_file(member.path, member.stat, member)
+                if document is not None:
+                    documents.append(document)
+        except ArchiveError as error:
+            print("Archive: [{}] {}".format(filename, error))
+            if documents[0] is not None:
+                documents[0].reason = str(error)
+        finally:
+            members.close()
+        self.measure('archive', started, 0, documents[0] is None or documents[0].reason is not None, filename)
+        return [document for document in documents if document is not None]
+
+    def create_document_infos(self, filename, stat=None, source=None):
+        if self.is_archive(filename):
+            return self.create_document_infos_from_archive(filename, stat)
+        document = self.create_document_info_from_file(filename, stat, source)
+        return [] if document is None else [document]
+
+    def prefetchable(self, entry):
+        return not isinstance(entry, DocumentInfo) and not self.is_archive(entry.path)
+
+    def failed_document_info(self, filename, stat, reason):
+        document_info = DocumentInfo(filename, size=0 if stat is None else stat.st_size, stat=stat)
+        try:
+            document_info.set_date_create_from_file()
+            document_info.set_date_modified_from_file()
+        except OSError:
+            document_info.date_create = EPOCH
+            document_info.date_modified = EPOCH
+        document_info.reason = reason
+        return document_info
+
+    def isolation_failed(self, args, reason, elapsed=0.0, isolated=True):
+        filename, stat = args[:2]
+        if self.stats is not None:
+            self.stats.record('file', elapsed, 0, True, filename)
+        print("File: [{}] processing failed: {}".format(filename, reason))
+        if isolated and self.quarantine is not None and stat is not None:
+            self.quarantine.add(filename, stat, reason)
+        return self.failed_document_info(filename, stat, reason)
+
+    def isolated(self):
+        return self.timeout is not None or self.memory_limit is not None
+
+    def iter_cached(self, entries, cache, misses):
+        for entry in entries:
+            if isinstance(entry, DocumentInfo) or self.is_archive(entry.path):
+                yield entry
+                continue
+            started = time.perf_counter()
+            data = cache.lookup(entry.path, entry.stat)
+            self.measure('cache', started, 0, False)
+            if data is None:
+                misses[entry.path] = entry.stat
+                yield entry
+            else:
+                yield DocumentInfo.from_dict(data)
+
+    def iter_quarantined(self, entries):
+        for entry in entries:
+            if isinstance(entry, DocumentInfo):
+                yield entry
+                continue
+            reason = self.quarantine.lookup(entry.path, entry.stat)
+            if reason is None:
+                yield entry
+            else:
+                yield self.failed_document_info(entry.path, entry.stat, 'quarantined: {}'.format(reason))
+
+    def iter_document_infos(self, target_path="/tmp", jobs=1, cache=None):
+        entries = self.iter_entries(target_path, None if self.journal is None else self.journal.after)
+        if self.stats is not None:
+            entries = self.iter_measured('discovery', entries)
+        if self.journal is not None:
+            replayed = None
+            if cache is not None:
+                replayed = lambda entry, documents: self.store_replayed(cache, entry, documents)
+            entries = self.journal.iter_entries(entries, replayed)
+        if self.duplicates:
+            entries, copies = self.find_duplicates(entries)
+            documents = self.iter_copies(self.iter_processed(target_path, entries, jobs, cache), copies)
+        else:
+            documents = self.iter_processed(target_path, entries, jobs, cache)
+        if self.journal is not None:
+            documents = self.journal.iter_recorded(documents)
+        yield from documents
+
+    def store_replayed(self, cache, entry, documents):
+        if self.is_archive(entry.path) or len(documents) != 1 or documents[0].reason is not None:
+            return
+        data = documents[0].to_dict()
+        data['content_hash'] = None
+        cache.store(entry.path, entry.stat, data)
+
+    def iter_processed(self, target_path, entries, jobs=1, cache=None):
+        if self.quarantine is not None:
+            entries = self.iter_quarantined(entries)
+        if cache is None:
+            yield from self.collect_document_infos(entries, jobs)
+            return
+        misses = {}
+        for file_docu_info in self.collect_document_infos(self.iter_cached(entries, cache, misses), jobs):
+            stat = misses.pop(file_docu_info.path, None)
+            if stat is not None and file_docu_info.reason is None:
+                cache.store(file_docu_info.path, stat, file_docu_info.to_dict())
+            yield file_docu_info
+        cache.prune(target_path)
+        cache.commit()
+        print("Cache: [{}] hits, [{}] misses".format(cache.hits, cache.misses))
+
+    def collect_timeline(self, target_path="/tmp", jobs=1, cache=None)-> Timeline:
+        timeline = Timeline(self.run_size, self.columnar)
+        documents = self.iter_document_infos(target_path, jobs, cache)
+        if self.progress:
+            documents = tqdm.tqdm(documents, total=self.progress_total, unit='file', dynamic_ncols=True)
+        for file_docu_info in documents:
             timeline.add(file_docu_info)
         print("Documents discovered: [{}]".format(timeline.total()))
+        started = time.perf_counter()
         timeline.sort(key=document_info_sort_date_create)
+        self.measure('sort', started)
         return timeline
 
-    def write_html_processed_document(self, document):
-        div = dominate.tags.div(_class='document')
-        dominate.tags.div(
-            dominate.tags.a(document.name, href='%s' % document.path),
-            _class='header'
-        )
-        with dominate.tags.div(_class='content'):
-            with dominate.tags.ul():
-                dominate.tags.li('Author: %s' % document.author)
-                dominate.tags.li('Create date: %s' % document.date_create)
-                dominate.tags.li('Last editor: %s' % document.author_last)
-                dominate.tags.li('Modified date: %s' % document.date_modified)
-                dominate.tags.li('Pages: %s' % document.pages)
-                dominate.tags.li('Size: %d' % document.size)
-        return div;
-
-    def write_html_processed(self, documents):
-        div = dominate.tags.div(_class='processed')
-        for doc in documents:
-            self.write_html_processed_document(doc)
-        return div 
-
-    def write_html_unprocessed_file(self, file):
-        li = dominate.tags.li(
-            dominate.tags.a(file.name, href='%s' % file.path)
-        )
-        return li;
-
-    def write_html_unprocessed(self, documents):
-        div = dominate.tags.div(_class='unprocessed')
-        with dominate.tags.ul():
-            for doc in documents:
-                self.write_html_unprocessed_file(doc)
-        return div 
-
-    def write_timeline_html(self, path, filename, timeline):
-        print(
-            "Writing [{}] documents HTML timeline.\n\tFilename: [{}]\n\tPath: [{}]"
-            .format(timeline.total(), filename, path)
-        )
-        html_document = dominate.document(path)
-        with html_document.head:
-            dominate.tags.link(rel='stylesheet', href='style.css')
-            dominate.tags.script(type='text/javascript', src='script.js')
-            dominate.tags.h1(path)
-            self.write_html_processed(timeline.processed)
-            self.write_html_unprocessed(timeline.unprocessed)
-        with open(filename, 'w') as f:
-            f.write(html_document.render())
-
-    def write_timeline_xml(self, path, filename, timeline):
-        print(
-            "Writing [{}] documents XML timeline.\n\tFilename: [{}]\n\tPath: [{}]"
-            .format(timeline.total(), filename, path)
-        )
-        root = xee.Element("path")
-        e_path = xee.SubElement(root, "path")
-        e_path.text = path
-
-        processed = xee.Element("processed")
-        root.append(processed)
-        for doc in timeline.processed:
-            doc_xml = doc.to_xml()
-            processed.append(doc_xml)
-
-        unprocessed = xee.Element("unprocessed")
-        root.append(unprocessed)
-        for file in timeline.unprocessed:
-            file_xml = file.to_xml()
-            unprocessed.append(file_xml)
-
-        tree = xee.ElementTree(root)
-        with open(filename, 'wb') as f:
-            tree.write(f)
-
-    def write_xls_headers(self, sheet, headers):
-        style_header = xlwt.easyxf('font: bold 1') 
-        for column, header in enumerate(headers):
-            sheet.write(1, column, header, style_header)
-
-    def write_xls_processed_header(self, sheet, path):
-        style_path = xlwt.easyxf('font: bold 1, color blue;') 
-        sheet.write(0, 0, path, style_path)
-        headers = ['#', 'name', 'path', 'date_create', 'author', 'date_modified', 'author_last', 'pages', 'size']
-        self.write_xls_headers(sheet, headers)
-
-    def write_xls_unprocessed_header(self, sheet, path):
-        style_path = xlwt.easyxf('font: bold 1, color red;') 
-        sheet.write(0, 0, path, style_path)
-        headers = ['#', 'name', 'path', 'date_create', 'size']
-        self.write_xls_headers(sheet, headers)
-
-    def write_xls_document(self, sheet, cursor, document):
-        sheet.write(cursor, 0, cursor - 1)
-        sheet.write(cursor, 1, document.name)
-        sheet.write(cursor, 2, 'file:/{}'.format(document.path))
-        sheet.write(cursor, 3, document.date_create.strftime("%m/%d/%Y, %H:%M:%S"))
-        sheet.write(cursor, 4, document.author)
-        sheet.write(cursor, 5, document.date_modified.strftime("%m/%d/%Y, %H:%M:%S"))
-        sheet.write(cursor, 6, document.author_last)
-        sheet.write(cursor, 7, document.pages)
-        sheet.write(cursor, 8, document.size)
-
-    def write_xls_processed_documents(self, sheet, documents):
-        row_start = 2
-        for row, document in enumerate(documents):
-            self.write_xls_document(sheet, row_start + row, document)
-
-    def write_xls_file(self, sheet, cursor, file):
-        sheet.write(cursor, 0, cursor - 1)
-        sheet.write(cursor, 1, file.name)
-        sheet.write(cursor, 2, 'file:/{})'.format(file.path))
-        sheet.write(cursor, 3, file.date_create.strftime("%m/%d/%Y, %H:%M:%S"))
-        sheet.write(cursor, 4, file.size)
-
-    def write_xls_unprocessed_files(self, sheet, files):
-        for row, file in enumerate(files):
-            self.write_xls_file(sheet, row + 2, file)
-
-    def write_timeline_xls(self, path, filename, timeline):
-        print(
-            "Writing [{}] documents XLS timeline.\n\tFilename: [{}]\n\tPath: [{}]"
-            .format(timeline.total(), filename, path)
-        )
-        headers_processed = [
-            '#', 'name', 'path', 
-            'date_create', 'author', 
-            'date_modified', 'author_last', 
-            'pages', 'size'
-        ]
-        headers_unprocessed = [
-            '#', 'name', 'path', 
-            'date_create', 'size'
-        ]
-        workbook = xlwt.Workbook()
-        sheet = workbook.add_sheet('processed')
-        self.write_xls_processed_header(sheet, path)
-        self.write_xls_processed_documents(sheet, timeline.processed)
-        sheet = workbook.add_sheet('unprocessed')
-        self.write_xls_unprocessed_header(sheet, path)
-        self.write_xls_unprocessed_files(sheet, timeline.unprocessed)
-        workbook.save(filename)
-
 if __name__ == "__main__":
-    filename_xml = ''
-    filename_html = ''
-
-    parser = argparse.ArgumentParser()
-    parser.add_argument("path")
-    parser.add_argument("filename")
-    args = parser.parse_args()
- 
-    # get the arguments value
-    if args.path == None or not os.path.isdir(args.path):
-        print("Invalid target path: {}".format(args.path))
-    
-    if args.filename == None:
-        print("Invalid filename: {}".format(args.filename))
-    
-    filename = args.filename
-    filename_xml = os.path.join(os.getcwd(), filename + '.xml')
-    filename_html = os.path.join(os.getcwd(), filename + '.html')
-    filename_xls = os.path.join(os.getcwd(), filename + '.xls')
-    if os.path.isfile(filename_xls) or os.path.exists(filename_xml) or os.path.exists(filename_xls):
-        print(
-            "Files: {} or {} or {} already exist."
-            .format(filename_xml, filename_html, filename_xls)
-        )
-
-    print('Target path: {}'.format(args.path))
-    print(
-        'HTML: {}\nXML: {}\nXLS: {}'
-        .format(filename_html, filename_xml, filename_xls)
-    )
-    crawler = Crawler()    
-    timeline = crawler.collect_timeline(args.path)
-    crawler.write_timeline_html(args.path, filename_html, timeline)
-    crawler.write_timeline_xml(args.path, filename_xml, timeline)
-    crawler.write_timeline_xls(args.path, filename_xls, timeline)    
+    from .cli import main
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import bisect
+
+DATE_COLUMNS = ('date_create_epoch', 'date_modified_epoch')
+VALUE_COLUMNS = ('author', 'mime')
+
+
+def column_values(documents, column):
+    if hasattr(documents, 'column_values'):
+        return documents.column_values(column)
+    return [getattr(document, column) for document in documents]
+
+
+def active_ranges(ranges):
+    return {column: bounds for column, bounds in (ranges or {}).items() if bounds != (None, None)}
+
+
+def value_matches(values, ranges, expected):
+    for column, (low, high) in ranges.items():
+        value = values(column)
+        if value is None:
+            return False
+        if low is not None and value < low:
+            return False
+        if high is not None and value > high:
+            return False
+    for column, value in expected.items():
+        if values(column) != value:
+            return False
+    return True
+
+
+def stream_query(documents, ranges=None, values=None):
+    ranges = active_ranges(ranges)
+    values = values or {}
+    selected = [
+        document for document in documents
+        if value_matches(lambda column: getattr(document, column), ranges, values)
+    ]
+    for column in DATE_COLUMNS:
+        if column in ranges:
+            selected.sort(key=lambda document: getattr(document, column))
+            break
+    return selected
+
+
+class SortedIndex():
+    def __init__(self, keys, rows):
+        self.keys = keys
+        self.rows = rows
+
+    @classmethod
+    def build(cls, values, rows=None):
+        if rows is None:
+            rows = range(len(values))
+        pairs = sorted((values[row], row) for row in rows if values[row] is not None)
+        return cls([key for key, _ in pairs], [row for _, row in pairs])
+
+    def range(self, low=None, high=None):
+        start = 0 if low is None else bisect.bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect.bisect_right(self.keys, high)
+        return self.rows[start:end]
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class TimelineIndex():
+    def __init__(self, documents):
+        self.documents = documents
+        self.values = {}
+        self.dates = {}
+        for column in DATE_COLUMNS:
+            self.values[column] = column_values(documents, column)
+            self.dates[column] = SortedIndex.build(self.values[column])
+        self.buckets = {}
+        for column in VALUE_COLUMNS:
+            self.values[column] = column_values(documents, column)
+            rows = {}
+            for row, value in enumerate(self.values[column]):
+                rows.setdefault(value, []).append(row)
+            self.buckets[column] = rows
+        self.bucket_dates = {}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def bucket(self, column, value, date):
+        key = (column, value, date)
+        index = self.bucket_dates.get(key)
+        if index is None:
+            index = SortedIndex.build(self.values[date], self.buckets[column].get(value, []))
+            self.bucket_dates[key] = index
+        return index
+
+    def candidates(self, ranges, values):
+        date = None
+        for column in DATE_COLUMNS:
+            if column in ranges:
+                date = column
+                break
+        best = None
+        for column, value in values.items():
+            if date is None:
+                rows = self.buckets[column].get(value, [])
+            else:
+                rows = self.bucket(column, value, date).range(*ranges[date])
+            if best is None or len(rows) < len(best):
+                best = rows
+        if best is None:
+            if date is None:
+                return range(len(self.documents))
+            best = self.dates[date].range(*ranges[date])
+        return best
+
+    def matches(self, row, ranges, values):
+        return value_matches(lambda column: self.values[column][row], ranges, values)
+
+    def rows(self, ranges=None, values=None):
+        ranges = active_ranges(ranges)
+        values = values or {}
+        return [row for row in self.candidates(ranges, values) if self.matches(row, ranges, values)]
+
+    def query(self, ranges=None, values=None):
+        for row in self.rows(ranges, values):
+            yield self.documents[row]
@@ -0,0 +1,226 @@
+import os
+import time
+import collections
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def address_space_size():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def limit_memory(memory_limit):
+    if resource is None or not memory_limit:
+        return
+    limit = address_space_size() + memory_limit
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def describe_error(error):
+    return '{}: {}'.format(type(error).__name__, error)
+
+
+def worker_main(connection, function, memory_limit):
+    limit_memory(memory_limit)
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        try:
+            result = (True, function(*task), False)
+        except MemoryError:
+            result = (False, 'memory limit exceeded', True)
+        except Exception as error:
+            result = (False, describe_error(error), False)
+        try:
+            connection.send(result)
+        except MemoryError:
+            connection.send((False, 'memory limit exceeded', True))
+
+
+class IsolatedFuture():
+    def __init__(self, pool, args):
+        self.args = args
+        self.done = False
+        self.value = None
+        self.reason = None
+        self.deadline = None
+        self.started = None
+        self._pool = pool
+
+    def set_result(self, value):
+        self.value = value
+        self.done = True
+
+    def set_failure(self, reason, isolated=True):
+        self.reason = reason
+        elapsed = 0.0 if self.started is None else time.monotonic() - self.started
+        self.value = self._pool.failed(self.args, reason, elapsed, isolated)
+        self.done = True
+
+    def result(self):
+        while not self.done:
+            self._pool.poll()
+        return self.value
+
+
+class IsolatedWorker():
+    def __init__(self, function, memory_limit):
+        import multiprocessing
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=worker_main, args=(child, function, memory_limit), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.future = None
+
+    def submit(self, future, timeout):
+        future.started = time.monotonic()
+        future.deadline = None if timeout is None else future.started + timeout
+        self.future = future
+        self.connection.send(future.args)
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def close(self):
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class IsolatedPool():
+    def __init__(self, function, failed, jobs=1, timeout=None, memory_limit=None):
+        self.function = function
+        self.failed = failed
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self._workers = [self.start_worker() for _ in range(max(jobs, 1))]
+        self._queue = collections.deque()
+
+    def start_worker(self):
+        return IsolatedWorker(self.function, self.memory_limit)
+
+    def submit(self, *args):
+        future = IsolatedFuture(self, args)
+        self._queue.append(future)
+        self.dispatch()
+        return future
+
+    def dispatch(self):
+        for worker in self._workers:
+            if not self._queue:
+                return
+            if worker.future is None:
+                worker.submit(self._queue.popleft(), self.timeout)
+
+    def replace(self, worker, reason):
+        future = worker.future
+        worker.kill()
+        self._workers[self._workers.index(worker)] = self.start_worker()
+        future.set_failure(reason)
+
+    def poll(self):
+        self.dispatch()
+        busy = {worker.connection: worker for worker in self._workers if worker.future is not None}
+        if not busy:
+            return
+        wait = None
+        deadlines = [worker.future.deadline for worker in busy.values() if worker.future.deadline is not None]
+        if deadlines:
+            wait = max(min(deadlines) - time.monotonic(), 0)
+        import multiprocessing.connection
+        for connection in multiprocessing.connection.wait(list(busy), wait):
+            worker = busy.pop(connection)
+            try:
+                success, value, isolated = connection.recv()
+            except (EOFError, OSError):
+                worker.process.join()
+                self.replace(worker, 'worker crashed (exit code {})'.format(worker.process.exitcode))
+                continue
+            future = worker.future
+            worker.future = None
+            if success:
+                future.set_result(value)
+            else:
+                future.set_failure(value, isolated)
+        now = time.monotonic()
+        for worker in busy.values():
+            if worker.future.deadline is not None and worker.future.deadline <= now:
+                self.replace(worker, 'timed out after {}s'.format(self.timeout))
+        self.dispatch()
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Quarantine():
+    def __init__(self, filename):
+        self.filename = filename
+        self.skipped = 0
+        import sqlite3
+        self._connection = sqlite3.connect(filename)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS quarantine ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, reason TEXT, added INTEGER)"
+        )
+
+    def lookup(self, path, stat):
+        row = self._connection.execute(
+            "SELECT reason FROM quarantine WHERE path = ? AND size = ? AND mtime = ?",
+            (path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row is None:
+            return None
+        self.skipped += 1
+        return row[0]
+
+    def add(self, path, stat, reason):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO quarantine (path, size, mtime, reason, added) VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, reason, time.time_ns())
+        )
+        self._connection.commit()
+
+    def remove(self, path):
+        self._connection.execute("DELETE FROM quarantine WHERE path = ?", (path,))
+        self._connection.commit()
+
+    def paths(self):
+        return [row[0] for row in self._connection.execute("SELECT path FROM quarantine ORDER BY path")]
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
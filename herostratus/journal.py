@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import collections
+
+from .archives import ARCHIVE_SEPARATOR
+from .discovery import DiscoveredFile, discovery_key
+
+JOURNAL_FORMAT = 'herostratus-journal'
+JOURNAL_VERSION = 1
+CHECKPOINT_INTERVAL = 60.0
+CHECKPOINT_SOURCES = 1000
+
+JournaledStat = collections.namedtuple('JournaledStat', ['st_size', 'st_mtime_ns', 'st_ino'])
+
+
+class JournalError(Exception):
+    pass
+
+
+class Journal():
+    def __init__(self, filename, document_class, interval=CHECKPOINT_INTERVAL, sources=CHECKPOINT_SOURCES):
+        self.filename = filename
+        self.document_class = document_class
+        self.path = None
+        self.interval = interval
+        self.max_pending = sources
+        self.checkpoint = None
+        self.after = None
+        self.replayed = 0
+        self.recorded = 0
+        self._sources = {}
+        self._stats = {}
+        self._discovered = collections.OrderedDict()
+        self._replayed = set()
+        self._source = None
+        self._documents = []
+        self._pending = []
+        self._file = None
+        self._flushed = time.monotonic()
+
+    def load(self, path):
+        with open(self.filename, 'rb') as file:
+            data = file.read()
+        end = data.rfind(b'\n') + 1
+        lines = data[:end].decode('utf-8').splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else None
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get('format') != JOURNAL_FORMAT:
+            raise JournalError('{}: not a journal'.format(self.filename))
+        if header.get('version') != JOURNAL_VERSION:
+            raise JournalError('{}: unsupported version {}'.format(self.filename, header.get('version')))
+        if header.get('path') != path:
+            raise JournalError('{}: journal of another path: {}'.format(self.filename, header.get('path')))
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'source' in record:
+                self._sources[record['source']] = (
+                    record['size'], record['mtime'], record['documents'], record.get('inode', 0)
+                )
+            elif 'checkpoint' in record:
+                self.checkpoint = record['checkpoint']
+        if self.checkpoint is not None:
+            self.after = os.path.relpath(self.checkpoint, path)
+        return end
+
+    def open(self, path, resume=False):
+        self.path = path
+        if resume and os.path.exists(self.filename):
+            end = self.load(path)
+            self._file = open(self.filename, 'r+b')
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(self.filename, 'wb')
+            self.write_line({'format': JOURNAL_FORMAT, 'version': JOURNAL_VERSION, 'path': path})
+            self.sync()
+
+    def write_line(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        self._file.write(b'\n')
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._flushed = time.monotonic()
+
+    def replay(self, entry, source, replayed=None):
+        self._replayed.add(entry.path)
+        self.replayed += len(source[2])
+        documents = [self.document_class.from_dict(data) for data in source[2]]
+        if replayed is not None:
+            replayed(entry, documents)
+        return documents
+
+    def iter_checkpointed(self, replayed=None):
+        if self.after is None:
+            return
+        start = discovery_key(self.after)
+        checkpointed = [path for path in self._sources if discovery_key(os.path.relpath(path, self.path)) <= start]
+        for path in checkpointed:
+            source = self._sources.pop(path)
+            entry = DiscoveredFile(path, JournaledStat(source[0], source[1], source[3]))
+            yield from self.replay(entry, source, replayed)
+
+    def iter_entries(self, entries, replayed=None):
+        yield from self.iter_checkpointed(replayed)
+        for entry in entries:
+            self._discovered[entry.path] = False
+            source = self._sources.pop(entry.path, None)
+            if source is not None and source[:2] == (entry.stat.st_size, entry.stat.st_mtime_ns):
+                yield from self.replay(entry, source, replayed)
+                continue
+            self._stats[entry.path] = entry.stat
+            yield entry
+
+    def record(self, document):
+        source = document.path.partition(ARCHIVE_SEPARATOR)[0]
+        if source != self._source:
+            self.end_source()
+            self._source = source
+        if source not in self._replayed:
+            self._documents.append(document.to_dict())
+
+    def end_source(self):
+        if self._source is None:
+            return
+        stat = self._stats.pop(self._source, None)
+        if self._source in self._discovered:
+            self._discovered[self._source] = True
+        if self._source in self._replayed:
+            self._replayed.discard(self._source)
+        elif stat is not None and self._documents:
+            self._pending.append({
+                'source': self._source,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'inode': stat.st_ino,
+                'documents': self._documents
+            })
+            self.recorded += len(self._documents)
+        self._source = None
+        self._documents = []
+        if len(self._pending) >= self.max_pending or time.monotonic() - self._flushed >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if not self._pending or self._file is None:
+            return
+        for record in self._pending:
+            self.write_line(record)
+        while self._discovered and next(iter(self._discovered.values())):
+            self.checkpoint = self._discovered.popitem(last=False)[0]
+        if self.checkpoint is not None:
+            self.write_line({'checkpoint': self.checkpoint, 'documents': self.recorded})
+        self._pending = []
+        self.sync()
+
+    def iter_recorded(self, documents):
+        try:
+            for document in documents:
+                self.record(document)
+                yield document
+            self.end_source()
+        finally:
+            self.flush()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
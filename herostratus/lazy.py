@@ -0,0 +1,43 @@
+import sys
+import importlib
+import importlib.util
+
+
+class LazyImportError(ImportError):
+    pass
+
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise LazyImportError('No module named {!r}'.format(name), name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def load_object(reference):
+    module_name, _, attribute = reference.partition(':')
+    value = importlib.import_module(module_name)
+    for name in filter(None, attribute.split('.')):
+        try:
+            value = getattr(value, name)
+        except AttributeError:
+            raise LazyImportError('{}: no attribute {!r}'.format(reference, name), name=module_name)
+    return value
+
+
+def iter_entry_points(group):
+    import importlib.metadata
+    try:
+        entry_points = importlib.metadata.entry_points(group=group)
+    except TypeError:
+        entry_points = importlib.metadata.entry_points().get(group, [])
+    for entry_point in entry_points:
+        yield entry_point.name, entry_point.value
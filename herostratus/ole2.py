@@ -0,0 +1,307 @@
+import struct
+import datetime as dt
+
+SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+HEADER_SIZE = 512
+SECTOR_SIZES = (512, 4096)
+DIRECTORY_ENTRY_SIZE = 128
+DIFAT_HEADER_ENTRIES = 109
+MAX_REGULAR_SECTOR = 0xFFFFFFFA
+
+SUMMARY_INFORMATION = '\x05SummaryInformation'
+DOCUMENT_SUMMARY_INFORMATION = '\x05DocumentSummaryInformation'
+
+VT_I2 = 2
+VT_I4 = 3
+VT_BOOL = 11
+VT_UI4 = 19
+VT_LPSTR = 30
+VT_LPWSTR = 31
+VT_FILETIME = 64
+
+PID_CODEPAGE = 1
+PIDSI_TITLE = 2
+PIDSI_AUTHOR = 4
+PIDSI_LASTAUTHOR = 8
+PIDSI_CREATE_DTM = 12
+PIDSI_LASTSAVE_DTM = 13
+PIDSI_PAGECOUNT = 14
+PIDSI_WORDCOUNT = 15
+PIDSI_APPNAME = 18
+PIDDSI_SLIDECOUNT = 7
+PIDDSI_COMPANY = 15
+
+FILETIME_EPOCH = dt.datetime(1601, 1, 1)
+
+
+class Ole2Error(Exception):
+    pass
+
+
+class SummaryProperties():
+    def __init__(self):
+        self.title = None
+        self.author = None
+        self.last_saved_by = None
+        self.created = None
+        self.last_saved = None
+        self.pages = None
+        self.words = None
+        self.slides = None
+        self.application = None
+        self.company = None
+
+
+def filetime_to_datetime(value):
+    if not value or not isinstance(value, int):
+        return None
+    try:
+        return FILETIME_EPOCH + dt.timedelta(microseconds=value // 10)
+    except OverflowError:
+        return None
+
+
+def codepage_to_encoding(codepage):
+    if codepage is None:
+        return 'cp1252'
+    codepage = codepage & 0xFFFF
+    if codepage == 65001:
+        return 'utf-8'
+    if codepage == 1200:
+        return 'utf-16-le'
+    return 'cp{}'.format(codepage)
+
+
+class CompoundFile():
+    def __init__(self, file, reader=None):
+        self._file = file
+        self.reader = Ole2Reader() if reader is None else reader
+        header = self.reader.header
+        if self.read_into(0, header) < HEADER_SIZE or header[:8] != SIGNATURE:
+            raise Ole2Error('not an OLE2 compound file')
+        self.sector_size = 1 << struct.unpack_from('<H', header, 0x1E)[0]
+        self.mini_sector_size = 1 << struct.unpack_from('<H', header, 0x20)[0]
+        if self.sector_size not in SECTOR_SIZES or self.mini_sector_size != 64:
+            raise Ole2Error('unsupported sector size')
+        self.first_directory_sector = struct.unpack_from('<I', header, 0x30)[0]
+        (
+            self.mini_stream_cutoff, self.first_mini_fat_sector, self.mini_fat_sectors,
+            self.first_difat_sector, self.difat_sectors
+        ) = struct.unpack_from('<5I', header, 0x38)
+        self._difat = [
+            sector for sector in struct.unpack_from('<{}I'.format(DIFAT_HEADER_ENTRIES), header, 0x4C)
+            if sector <= MAX_REGULAR_SECTOR
+        ]
+        self._difat_loaded = self.difat_sectors == 0
+        self._fat_sectors = {}
+        self._mini_fat = None
+        self._mini_stream = None
+        self.entries_per_sector = self.sector_size // 4
+
+    def read_at(self, offset, size):
+        self._file.seek(offset)
+        return self._file.read(size)
+
+    def read_into(self, offset, buffer):
+        self._file.seek(offset)
+        return self._file.readinto(buffer) or 0
+
+    def read_sector(self, sector):
+        if sector > MAX_REGULAR_SECTOR:
+            raise Ole2Error('invalid sector {}'.format(sector))
+        data = self.read_at((sector + 1) * self.sector_size, self.sector_size)
+        if len(data) < self.sector_size:
+            raise Ole2Error('truncated sector {}'.format(sector))
+        return data
+
+    def read_sector_entries(self, sector):
+        if sector > MAX_REGULAR_SECTOR:
+            raise Ole2Error('invalid sector {}'.format(sector))
+        buffer = self.reader.sector_buffer(self.sector_size)
+        if self.read_into((sector + 1) * self.sector_size, buffer) < self.sector_size:
+            raise Ole2Error('truncated sector {}'.format(sector))
+        return self.reader.sector_format(self.sector_size).unpack_from(buffer)
+
+    def load_difat(self):
+        sector = self.first_difat_sector
+        for _ in range(self.difat_sectors):
+            if sector > MAX_REGULAR_SECTOR:
+                break
+            entries = self.read_sector_entries(sector)
+            self._difat.extend(entry for entry in entries[:-1] if entry <= MAX_REGULAR_SECTOR)
+            sector = entries[-1]
+        self._difat_loaded = True
+
+    def fat_entry(self, sector):
+        index, position = divmod(sector, self.entries_per_sector)
+        entries = self._fat_sectors.get(index)
+        if entries is None:
+            if index >= len(self._difat) and not self._difat_loaded:
+                self.load_difat()
+            if index >= len(self._difat):
+                raise Ole2Error('sector {} outside of FAT'.format(sector))
+            entries = self.read_sector_entries(self._difat[index])
+            self._fat_sectors[index] = entries
+        return entries[position]
+
+    def chain(self, sector):
+        visited = set()
+        while sector <= MAX_REGULAR_SECTOR:
+            if sector in visited:
+                raise Ole2Error('cyclic sector chain')
+            visited.add(sector)
+            yield sector
+            sector = self.fat_entry(sector)
+
+    def read_chain(self, sector, size=None):
+        data = bytearray()
+        for current in self.chain(sector):
+            data += self.read_sector(current)
+            if size is not None and len(data) >= size:
+                break
+        return bytes(data if size is None else data[:size])
+
+    def directory_entries(self):
+        for sector in self.chain(self.first_directory_sector):
+            data = self.read_sector(sector)
+            for offset in range(0, self.sector_size, DIRECTORY_ENTRY_SIZE):
+                entry = data[offset:offset + DIRECTORY_ENTRY_SIZE]
+                name_length = struct.unpack_from('<H', entry, 0x40)[0]
+                entry_type = entry[0x42]
+                if entry_type == 0:
+                    continue
+                name = entry[:max(name_length - 2, 0)].decode('utf-16-le', 'replace')
+                start, size = struct.unpack_from('<II', entry, 0x74)
+                yield name, entry_type, start, size
+
+    def find_streams(self, names):
+        found = {}
+        root = None
+        for name, entry_type, start, size in self.directory_entries():
+            if entry_type == 5:
+                root = (start, size)
+            elif entry_type == 2 and name in names:
+                found[name] = (start, size)
+            if root is not None and len(found) == len(names):
+                break
+        return root, found
+
+    def read_mini_stream(self, root, start, size):
+        if self._mini_fat is None:
+            data = self.read_chain(self.first_mini_fat_sector) if self.mini_fat_sectors else b''
+            self._mini_fat = struct.unpack('<{}I'.format(len(data) // 4), data)
+        if self._mini_stream is None:
+            self._mini_stream = list(self.chain(root[0]))
+        data = bytearray()
+        sector = start
+        visited = set()
+        per_sector = self.sector_size // self.mini_sector_size
+        while sector <= MAX_REGULAR_SECTOR and len(data) < size:
+            if sector in visited or sector >= len(self._mini_fat):
+                raise Ole2Error('invalid mini sector chain')
+            visited.add(sector)
+            index, position = divmod(sector, per_sector)
+            if index >= len(self._mini_stream):
+                raise Ole2Error('mini sector {} outside of mini stream'.format(sector))
+            offset = (self._mini_stream[index] + 1) * self.sector_size + position * self.mini_sector_size
+            data += self.read_at(offset, self.mini_sector_size)
+            sector = self._mini_fat[sector]
+        return bytes(data[:size])
+
+    def read_streams(self, names):
+        root, found = self.find_streams(names)
+        streams = {}
+        for name, (start, size) in found.items():
+            if size < self.mini_stream_cutoff:
+                if root is None:
+                    raise Ole2Error('missing root entry')
+                streams[name] = self.read_mini_stream(root, start, size)
+            else:
+                streams[name] = self.read_chain(start, size)
+        return streams
+
+
+def read_property_value(data, offset, encoding):
+    value_type = struct.unpack_from('<H', data, offset)[0]
+    offset += 4
+    if value_type == VT_I2:
+        return struct.unpack_from('<h', data, offset)[0]
+    if value_type in (VT_I4, VT_BOOL):
+        return struct.unpack_from('<i', data, offset)[0]
+    if value_type == VT_UI4:
+        return struct.unpack_from('<I', data, offset)[0]
+    if value_type == VT_LPSTR:
+        length = struct.unpack_from('<I', data, offset)[0]
+        raw = data[offset + 4:offset + 4 + length]
+        return raw.decode(encoding, 'replace').rstrip('\x00')
+    if value_type == VT_LPWSTR:
+        length = struct.unpack_from('<I', data, offset)[0]
+        raw = data[offset + 4:offset + 4 + length * 2]
+        return raw.decode('utf-16-le', 'replace').rstrip('\x00')
+    if value_type == VT_FILETIME:
+        return struct.unpack_from('<Q', data, offset)[0]
+    return None
+
+
+def read_property_set(data):
+    if len(data) < 48 or struct.unpack_from('<H', data, 0)[0] != 0xFFFE:
+        raise Ole2Error('invalid property set stream')
+    section = struct.unpack_from('<I', data, 44)[0]
+    count = struct.unpack_from('<I', data, section + 4)[0]
+    offsets = {}
+    for index in range(count):
+        property_id, offset = struct.unpack_from('<II', data, section + 8 + index * 8)
+        offsets[property_id] = section + offset
+    encoding = 'cp1252'
+    if PID_CODEPAGE in offsets:
+        encoding = codepage_to_encoding(read_property_value(data, offsets[PID_CODEPAGE], encoding))
+    values = {}
+    for property_id, offset in offsets.items():
+        try:
+            values[property_id] = read_property_value(data, offset, encoding)
+        except (struct.error, LookupError):
+            values[property_id] = None
+    return values
+
+
+class Ole2Reader():
+    def __init__(self):
+        self.header = bytearray(HEADER_SIZE)
+        self._sector = bytearray(max(SECTOR_SIZES))
+        self._sector_buffers = {size: memoryview(self._sector)[:size] for size in SECTOR_SIZES}
+        self._sector_formats = {size: struct.Struct('<{}I'.format(size // 4)) for size in SECTOR_SIZES}
+
+    def sector_buffer(self, sector_size):
+        return self._sector_buffers[sector_size]
+
+    def sector_format(self, sector_size):
+        return self._sector_formats[sector_size]
+
+    def read_summary(self, file):
+        try:
+            streams = CompoundFile(file, self).read_streams(
+                (SUMMARY_INFORMATION, DOCUMENT_SUMMARY_INFORMATION)
+            )
+            if SUMMARY_INFORMATION not in streams:
+                raise Ole2Error('missing SummaryInformation stream')
+            properties = SummaryProperties()
+            values = read_property_set(streams[SUMMARY_INFORMATION])
+            properties.title = values.get(PIDSI_TITLE)
+            properties.author = values.get(PIDSI_AUTHOR)
+            properties.last_saved_by = values.get(PIDSI_LASTAUTHOR)
+            properties.created = filetime_to_datetime(values.get(PIDSI_CREATE_DTM))
+            properties.last_saved = filetime_to_datetime(values.get(PIDSI_LASTSAVE_DTM))
+            properties.pages = values.get(PIDSI_PAGECOUNT)
+            properties.words = values.get(PIDSI_WORDCOUNT)
+            properties.application = values.get(PIDSI_APPNAME)
+            if DOCUMENT_SUMMARY_INFORMATION in streams:
+                values = read_property_set(streams[DOCUMENT_SUMMARY_INFORMATION])
+                properties.slides = values.get(PIDDSI_SLIDECOUNT)
+                properties.company = values.get(PIDDSI_COMPANY)
+        except (struct.error, IndexError, TypeError, ValueError, OSError) as error:
+            raise Ole2Error(str(error))
+        return properties
+
+
+def read_summary(file):
+    return Ole2Reader().read_summary(file)
@@ -0,0 +1,201 @@
+import re
+import zlib
+import struct
+import datetime as dt
+import xml.etree.ElementTree as xee
+
+CORE_PART = 'docProps/core.xml'
+APP_PART = 'docProps/app.xml'
+
+ZIP_END = struct.Struct('<4s4H2LH')
+ZIP_CENTRAL = struct.Struct('<4s4x2H4x3L3H8xL')
+ZIP_LOCAL = struct.Struct('<4s22x2H')
+ZIP_END_SIGNATURE = b'PK\x05\x06'
+ZIP_CENTRAL_SIGNATURE = b'PK\x01\x02'
+ZIP_LOCAL_SIGNATURE = b'PK\x03\x04'
+ZIP_MAX_COMMENT = 0xFFFF
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+READ_BUFFER_SIZE = ZIP_END.size + ZIP_MAX_COMMENT
+
+NS_CP = '{http://schemas.openxmlformats.org/package/2006/metadata/core-properties}'
+NS_DC = '{http://purl.org/dc/elements/1.1/}'
+NS_DCTERMS = '{http://purl.org/dc/terms/}'
+NS_APP = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}'
+
+W3CDTF_FORMATS = ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M', '%Y-%m-%d', '%Y-%m', '%Y')
+W3CDTF_OFFSET = re.compile(r'([+-])(\d\d):(\d\d)$')
+
+
+class OoxmlError(Exception):
+    pass
+
+
+class OoxmlProperties():
+    def __init__(self):
+        self.author = ''
+        self.last_modified_by = ''
+        self.created = None
+        self.modified = None
+        self.pages = None
+        self.slides = None
+        self.words = None
+
+
+def parse_w3cdtf(text):
+    text = text.strip()
+    offset = dt.timedelta(0)
+    if text.endswith('Z'):
+        text = text[:-1]
+    else:
+        match = W3CDTF_OFFSET.search(text)
+        if match:
+            sign = -1 if match.group(1) == '-' else 1
+            offset = sign * dt.timedelta(hours=int(match.group(2)), minutes=int(match.group(3)))
+            text = text[:match.start()]
+    text = text.split('.')[0]
+    for date_time_format in W3CDTF_FORMATS:
+        try:
+            return dt.datetime.strptime(text, date_time_format) - offset
+        except ValueError:
+            continue
+    return None
+
+
+def element_text(root, tag):
+    element = root.find(tag)
+    if element is None or element.text is None:
+        return None
+    return element.text
+
+
+def element_int(root, tag):
+    text = element_text(root, tag)
+    try:
+        return None if text is None else int(text)
+    except ValueError:
+        return None
+
+
+def read_core(properties, data):
+    root = xee.fromstring(data)
+    properties.author = element_text(root, NS_DC + 'creator') or ''
+    properties.last_modified_by = element_text(root, NS_CP + 'lastModifiedBy') or ''
+    created = element_text(root, NS_DCTERMS + 'created')
+    if created is not None:
+        properties.created = parse_w3cdtf(created)
+    modified = element_text(root, NS_DCTERMS + 'modified')
+    if modified is not None:
+        properties.modified = parse_w3cdtf(modified)
+
+
+def read_app(properties, data):
+    root = xee.fromstring(data)
+    properties.pages = element_int(root, NS_APP + 'Pages')
+    properties.slides = element_int(root, NS_APP + 'Slides')
+    properties.words = element_int(root, NS_APP + 'Words')
+
+
+class OoxmlReader():
+    def __init__(self):
+        self._buffer = bytearray(READ_BUFFER_SIZE)
+        self._parts = {CORE_PART.encode('ascii'): CORE_PART, APP_PART.encode('ascii'): APP_PART}
+
+    def read_at(self, file, offset, size):
+        if size > len(self._buffer):
+            view = memoryview(bytearray(size))
+        else:
+            view = memoryview(self._buffer)[:size]
+        file.seek(offset)
+        if (file.readinto(view) or 0) < size:
+            raise OoxmlError('truncated package')
+        return view
+
+    def find_end(self, file):
+        size = file.seek(0, 2)
+        if size < ZIP_END.size:
+            return None
+        data = self.read_at(file, size - ZIP_END.size, ZIP_END.size)
+        if data[:4] == ZIP_END_SIGNATURE:
+            return ZIP_END.unpack_from(data), size - ZIP_END.size
+        start = max(0, size - ZIP_END.size - ZIP_MAX_COMMENT)
+        self.read_at(file, start, size - start)
+        position = self._buffer.rfind(ZIP_END_SIGNATURE, 0, size - start)
+        if position < 0 or position + ZIP_END.size > size - start:
+            return None
+        return ZIP_END.unpack_from(self._buffer, position), start + position
+
+    def find_parts(self, file):
+        end = self.find_end(file)
+        if end is None:
+            return None
+        (_, disk, directory_disk, disk_entries, entries, directory_size, directory_offset, _), end_offset = end
+        if disk or directory_disk or disk_entries != entries or directory_offset + directory_size != end_offset:
+            return None
+        data = self.read_at(file, directory_offset, directory_size)
+        parts = {}
+        position = 0
+        for _ in range(entries):
+            (
+                signature, flags, method, crc, compressed_size, size, name_size, extra_size, comment_size, offset
+            ) = ZIP_CENTRAL.unpack_from(data, position)
+            if signature != ZIP_CENTRAL_SIGNATURE:
+                return None
+            name = self._parts.get(bytes(data[position + ZIP_CENTRAL.size:position + ZIP_CENTRAL.size + name_size]))
+            if name is not None:
+                if flags & 0x1 or method not in (ZIP_STORED, ZIP_DEFLATED) or 0xFFFFFFFF in (compressed_size, size, offset):
+                    return None
+                parts[name] = (method, crc, compressed_size, offset)
+            position += ZIP_CENTRAL.size + name_size + extra_size + comment_size
+        return parts
+
+    def read_part(self, file, part):
+        method, crc, compressed_size, offset = part
+        signature, name_size, extra_size = ZIP_LOCAL.unpack_from(self.read_at(file, offset, ZIP_LOCAL.size))
+        if signature != ZIP_LOCAL_SIGNATURE:
+            raise OoxmlError('bad magic number for file header')
+        data = self.read_at(file, offset + ZIP_LOCAL.size + name_size + extra_size, compressed_size)
+        if method == ZIP_DEFLATED:
+            data = zlib.decompress(data, -15)
+        if zlib.crc32(data) != crc:
+            raise OoxmlError('bad CRC-32 for part')
+        return data
+
+    def read_properties(self, file):
+        if not hasattr(file, 'read'):
+            with open(file, 'rb') as file:
+                return self.read_properties(file)
+        try:
+            parts = self.find_parts(file)
+            if parts is None:
+                return read_package(file)
+            if CORE_PART not in parts:
+                raise OoxmlError('there is no item named {!r} in the archive'.format(CORE_PART))
+            properties = OoxmlProperties()
+            read_core(properties, self.read_part(file, parts[CORE_PART]))
+            if APP_PART in parts:
+                read_app(properties, self.read_part(file, parts[APP_PART]))
+        except (struct.error, zlib.error, xee.ParseError, OSError) as error:
+            raise OoxmlError(str(error))
+        return properties
+
+
+def read_properties(file):
+    return OoxmlReader().read_properties(file)
+
+
+def read_package(file):
+    import zipfile
+    try:
+        with zipfile.ZipFile(file) as package:
+            properties = OoxmlProperties()
+            read_core(properties, package.read(CORE_PART))
+            try:
+                app = package.read(APP_PART)
+            except KeyError:
+                app = None
+            if app is not None:
+                read_app(properties, app)
+    except (zipfile.BadZipFile, KeyError, xee.ParseError, OSError) as error:
+        raise OoxmlError(str(error))
+    return properties
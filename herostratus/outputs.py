@@ -0,0 +1,70 @@
+from .writers import TimelineRecord, MeasuredSink, HtmlTimelineWriter, ShardedHtmlTimelineWriter, XmlTimelineWriter
+from .writers import XlsTimelineWriter, XlsxTimelineWriter, CsvTimelineWriter, JsonlTimelineWriter
+
+
+class TimelineOutput():
+    def write_timeline(self, path, timeline, sinks):
+        if self.stats is not None:
+            sinks = [MeasuredSink(sink, self.stats) for sink in sinks]
+        for sink in sinks:
+            sink.open(path)
+        try:
+            for section, documents in (('processed', timeline.processed), ('unprocessed', timeline.unprocessed)):
+                for sink in sinks:
+                    sink.section(section)
+                for document in documents:
+                    record = TimelineRecord(document)
+                    for sink in sinks:
+                        sink.write(record)
+        finally:
+            for sink in sinks:
+                sink.close()
+
+    def write_timeline_html(self, path, filename, timeline):
+        print(
+            "Writing [{}] documents HTML timeline.\n\tFilename: [{}]\n\tPath: [{}]"
+            .format(timeline.total(), filename, path)
+        )
+        self.write_timeline(path, timeline, [HtmlTimelineWriter(filename)])
+
+    def write_timeline_html_sharded(self, path, directory, timeline, shard_size=1000):
+        print(
+            "Writing [{}] documents sharded HTML timeline.\n\tDirectory: [{}]\n\tPath: [{}]"
+            .format(timeline.total(), directory, path)
+        )
+        self.write_timeline(path, timeline, [ShardedHtmlTimelineWriter(directory, shard_size)])
+
+    def write_timeline_xml(self, path, filename, timeline):
+        print(
+            "Writing [{}] documents XML timeline.\n\tFilename: [{}]\n\tPath: [{}]"
+            .format(timeline.total(), filename, path)
+        )
+        self.write_timeline(path, timeline, [XmlTimelineWriter(filename, compress=filename.endswith('.gz'))])
+
+    def write_timeline_xls(self, path, filename, timeline):
+        print(
+            "Writing [{}] documents XLS timeline.\n\tFilename: [{}]\n\tPath: [{}]"
+            .format(timeline.total(), filename, path)
+        )
+        self.write_timeline(path, timeline, [XlsTimelineWriter(filename)])
+
+    def write_timeline_xlsx(self, path, filename, timeline):
+        print(
+            "Writing [{}] documents XLSX timeline.\n\tFilename: [{}]\n\tPath: [{}]"
+            .format(timeline.total(), filename, path)
+        )
+        self.write_timeline(path, timeline, [XlsxTimelineWriter(filename)])
+
+    def write_timeline_csv(self, path, filename, timeline):
+        print(
+            "Writing [{}] documents CSV timeline.\n\tFilename: [{}]\n\tPath: [{}]"
+            .format(timeline.total(), filename, path)
+        )
+        self.write_timeline(path, timeline, [CsvTimelineWriter(filename, compress=filename.endswith('.gz'))])
+
+    def write_timeline_jsonl(self, path, filename, timeline):
+        print(
+            "Writing [{}] documents JSONL timeline.\n\tFilename: [{}]\n\tPath: [{}]"
+            .format(timeline.total(), filename, path)
+        )
+        self.write_timeline(path, timeline, [JsonlTimelineWriter(filename, compress=filename.endswith('.gz'))])
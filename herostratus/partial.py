@@ -0,0 +1,77 @@
+import gzip
+import json
+
+from .writers import TimelineSink, open_output
+
+PARTIAL_FORMAT = 'herostratus-partial'
+PARTIAL_VERSION = 1
+
+
+class PartialError(Exception):
+    pass
+
+
+class PartialTimelineWriter(TimelineSink):
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = None
+
+    def open(self, path):
+        self._file = open_output(self.filename, True, 'wt')
+        self.write_line({'format': PARTIAL_FORMAT, 'version': PARTIAL_VERSION, 'path': path})
+
+    def write_line(self, data):
+        self._file.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+        self._file.write('\n')
+
+    def write(self, document):
+        self.write_line(document.to_dict())
+
+    def close(self):
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            self.close()
+
+
+class PartialTimeline():
+    def __init__(self, filename, document_class):
+        self.filename = filename
+        self.document_class = document_class
+        with gzip.open(filename, 'rt', encoding='utf-8') as file:
+            self.header = self.read_header(file)
+        self.path = self.header['path']
+
+    def read_header(self, file):
+        try:
+            header = json.loads(file.readline())
+        except (OSError, EOFError, ValueError) as error:
+            raise PartialError('{}: {}'.format(self.filename, error))
+        if not isinstance(header, dict) or header.get('format') != PARTIAL_FORMAT:
+            raise PartialError('{}: not a partial timeline'.format(self.filename))
+        if header.get('version') != PARTIAL_VERSION:
+            raise PartialError('{}: unsupported version {}'.format(self.filename, header.get('version')))
+        return header
+
+    def documents(self, processed):
+        with gzip.open(self.filename, 'rt', encoding='utf-8') as file:
+            self.read_header(file)
+            for line in file:
+                data = json.loads(line)
+                if data['processed'] == processed:
+                    yield self.document_class.from_dict(data)
+                elif processed:
+                    return
+
+    @property
+    def processed(self):
+        return self.documents(True)
+
+    @property
+    def unprocessed(self):
+        return self.documents(False)
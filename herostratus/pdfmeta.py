@@ -0,0 +1,598 @@
+import re
+import mmap
+import zlib
+import collections
+import datetime as dt
+
+from .ooxml import parse_w3cdtf
+
+TAIL_SIZE = 2048
+PAGE_SIZE = 4096
+PAGE_COUNT = 64
+MATCH_WINDOW = 256
+MAX_PREV_SECTIONS = 64
+WHITESPACE = b'\x00\t\n\x0c\r '
+DELIMITERS = b'()<>[]{}/%'
+
+NUMBER = re.compile(rb'^[+-]?(\d+\.?\d*|\.\d+)$')
+REFERENCE = re.compile(rb'\s+(\d+)\s+R(?=[\s\x00()<>\[\]{}/%]|$)')
+NAME_ESCAPE = re.compile(rb'#([0-9A-Fa-f]{2})')
+XREF_ENTRY = re.compile(rb'(\d{10}) (\d{5}) ([nf])')
+PDF_DATE = re.compile(
+    rb"(?:D:)?(\d{4})(\d{2})?(\d{2})?(\d{2})?(\d{2})?(\d{2})?(?:([Zz+\-])(\d{2})?'?(\d{2})?'?)?"
+)
+XMP_CREATE_DATE = re.compile(rb'xmp:CreateDate(?:>|\s*=\s*")([^<"]+)')
+XMP_MODIFY_DATE = re.compile(rb'xmp:ModifyDate(?:>|\s*=\s*")([^<"]+)')
+
+Reference = collections.namedtuple('Reference', ['number', 'generation'])
+
+
+class PdfMetaError(Exception):
+    pass
+
+
+class Name(str):
+    pass
+
+
+class Keyword(str):
+    pass
+
+
+class PdfStream():
+    def __init__(self, dictionary, data):
+        self.dictionary = dictionary
+        self.data = data
+
+
+class PagedFile():
+    def __init__(self, file, pages):
+        self.file = file
+        self.size = file.seek(0, 2)
+        self.bytes_read = 0
+        self._pages = pages
+        self._slots = {}
+        self._order = collections.deque()
+
+    def __len__(self):
+        return self.size
+
+    def page(self, index):
+        page = self._slots.get(index)
+        if page is not None:
+            return page
+        if len(self._order) < len(self._pages):
+            buffer = self._pages[len(self._order)]
+        else:
+            buffer = self._slots.pop(self._order.popleft())[0]
+        self.file.seek(index * PAGE_SIZE)
+        length = 0
+        with memoryview(buffer) as view:
+            while length < PAGE_SIZE:
+                count = self.file.readinto(view[length:])
+                if not count:
+                    break
+                length += count
+        self.bytes_read += length
+        page = self._slots[index] = (buffer, length)
+        self._order.append(index)
+        return page
+
+    def read(self, start, stop):
+        chunks = []
+        while start < stop:
+            buffer, length = self.page(start // PAGE_SIZE)
+            offset = start % PAGE_SIZE
+            end = min(length, offset + stop - start)
+            if end <= offset:
+                break
+            chunks.append(bytes(buffer[offset:end]))
+            start += end - offset
+        return b''.join(chunks)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(self.size)
+            return self.read(start, stop)
+        if not 0 <= key < self.size:
+            raise IndexError('position {} outside of file'.format(key))
+        buffer, _ = self.page(key // PAGE_SIZE)
+        return buffer[key % PAGE_SIZE]
+
+    def find(self, sub, start, end):
+        while start < end:
+            index = self.read(start, min(end, start + PAGE_SIZE + len(sub) - 1)).find(sub)
+            if index >= 0:
+                return start + index
+            start += PAGE_SIZE
+        return -1
+
+    def rfind(self, sub, start, end):
+        while end > start:
+            window = max(start, end - PAGE_SIZE - len(sub) + 1)
+            index = self.read(window, end).rfind(sub)
+            if index >= 0:
+                return window + index
+            if window == start:
+                break
+            end = window + len(sub) - 1
+        return -1
+
+
+class PdfMetadata():
+    def __init__(self):
+        self.author = None
+        self.created = None
+        self.modified = None
+        self.pages = None
+        self.bytes_read = 0
+
+
+def decode_text(value):
+    if not isinstance(value, bytes):
+        return None
+    if value.startswith(b'\xfe\xff'):
+        return value[2:].decode('utf-16-be', 'replace')
+    if value.startswith(b'\xef\xbb\xbf'):
+        return value[3:].decode('utf-8', 'replace')
+    return value.decode('latin-1')
+
+
+def parse_pdf_date(value):
+    if not isinstance(value, bytes):
+        return None
+    match = PDF_DATE.match(value.strip())
+    if match is None:
+        return None
+    parts = match.groups()
+    try:
+        date = dt.datetime(
+            int(parts[0]), int(parts[1] or 1), int(parts[2] or 1),
+            int(parts[3] or 0), int(parts[4] or 0), int(parts[5] or 0)
+        )
+    except ValueError:
+        return None
+    if parts[6] in (b'+', b'-'):
+        offset = dt.timedelta(hours=int(parts[7] or 0), minutes=int(parts[8] or 0))
+        date = date - offset if parts[6] == b'+' else date + offset
+    return date
+
+
+class PdfParser():
+    def __init__(self, data, size=None):
+        self.data = data
+        self.size = len(data) if size is None else size
+
+    def skip(self, pos):
+        data = self.data
+        while pos < self.size:
+            char = data[pos]
+            if char in WHITESPACE:
+                pos += 1
+            elif char == 0x25:
+                while pos < self.size and data[pos] not in b'\r\n':
+                    pos += 1
+            else:
+                break
+        return pos
+
+    def token_end(self, pos):
+        while pos < self.size and self.data[pos] not in WHITESPACE and self.data[pos] not in DELIMITERS:
+            pos += 1
+        return pos
+
+    def parse(self, pos):
+        pos = self.skip(pos)
+        if pos >= self.size:
+            raise PdfMetaError('unexpected end of file')
+        char = self.data[pos:pos + 1]
+        if char == b'<':
+            if self.data[pos + 1:pos + 2] == b'<':
+                return self.parse_dictionary(pos + 2)
+            return self.parse_hex_string(pos + 1)
+        if char == b'(':
+            return self.parse_literal_string(pos + 1)
+        if char == b'/':
+            end = self.token_end(pos + 1)
+            name = NAME_ESCAPE.sub(
+                lambda match: bytes([int(match.group(1), 16)]), bytes(self.data[pos + 1:end])
+            )
+            return Name(name.decode('latin-1')), end
+        if char == b'[':
+            return self.parse_array(pos + 1)
+        end = self.token_end(pos)
+        if end == pos:
+            raise PdfMetaError('unexpected delimiter at {}'.format(pos))
+        token = bytes(self.data[pos:end])
+        if NUMBER.match(token):
+            if token.isdigit():
+                reference = self.parse_reference(int(token), end)
+                if reference is not None:
+                    return reference
+                return int(token), end
+            return float(token), end
+        if token == b'true':
+            return True, end
+        if token == b'false':
+            return False, end
+        if token == b'null':
+            return None, end
+        return Keyword(token.decode('latin-1')), end
+
+    def match(self, pattern, pos):
+        if isinstance(self.data, PagedFile):
+            return pattern.match(self.data[pos:pos + MATCH_WINDOW]), pos
+        return pattern.match(self.data, pos, self.size), 0
+
+    def parse_reference(self, number, pos):
+        match, base = self.match(REFERENCE, pos)
+        if match is None:
+            return None
+        return Reference(number, int(match.group(1))), base + match.end()
+
+    def parse_dictionary(self, pos):
+        dictionary = {}
+        while True:
+            pos = self.skip(pos)
+            if self.data[pos:pos + 2] == b'>>':
+                return dictionary, pos + 2
+            key, pos = self.parse(pos)
+            if not isinstance(key, Name):
+                raise PdfMetaError('invalid dictionary key at {}'.format(pos))
+            value, pos = self.parse(pos)
+            dictionary[key] = value
+
+    def parse_array(self, pos):
+        array = []
+        while True:
+            pos = self.skip(pos)
+            if self.data[pos:pos + 1] == b']':
+                return array, pos + 1
+            value, pos = self.parse(pos)
+            array.append(value)
+
+    def parse_hex_string(self, pos):
+        end = self.data.find(b'>', pos, self.size)
+        if end < 0:
+            raise PdfMetaError('unterminated hex string')
+        digits = re.sub(rb'\s', b'', bytes(self.data[pos:end]))
+        if len(digits) % 2:
+            digits += b'0'
+        try:
+            return bytes.fromhex(digits.decode('ascii')), end + 1
+        except ValueError:
+            raise PdfMetaError('invalid hex string at {}'.format(pos))
+
+    def parse_literal_string(self, pos):
+        escapes = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+        result = bytearray()
+        depth = 1
+        while pos < self.size:
+            char = self.data[pos:pos + 1]
+            if char == b'\\':
+                following = bytes(self.data[pos + 1:pos + 2])
+                if following in escapes:
+                    result += escapes[following]
+                    pos += 2
+                elif following.isdigit():
+                    octal = re.match(rb'[0-7]{1,3}', self.data[pos + 1:pos + 4]).group(0)
+                    result.append(int(octal, 8) & 0xFF)
+                    pos += 1 + len(octal)
+                elif following == b'\r':
+                    pos += 3 if self.data[pos + 2:pos + 3] == b'\n' else 2
+                elif following == b'\n':
+                    pos += 2
+                else:
+                    result += following
+                    pos += 2
+                continue
+            if char == b'(':
+                depth += 1
+            elif char == b')':
+                depth -= 1
+                if depth == 0:
+                    return bytes(result), pos + 1
+            result += char
+            pos += 1
+        raise PdfMetaError('unterminated literal string')
+
+
+class PdfDocument():
+    def __init__(self, data, size=None):
+        self.parser = PdfParser(data, size)
+        self.data = data
+        self.size = self.parser.size
+        self.sections = []
+        self.trailer = None
+        self.bytes_read = 0
+        self._object_streams = {}
+        self.load_xref()
+
+    def load_xref(self):
+        tail_start = max(0, self.size - TAIL_SIZE)
+        self.bytes_read += self.size - tail_start
+        position = self.data.rfind(b'startxref', tail_start, self.size)
+        if position < 0:
+            raise PdfMetaError('startxref not found')
+        offset, _ = self.parser.parse(position + len(b'startxref'))
+        visited = set()
+        while isinstance(offset, int) and offset not in visited and len(visited) < MAX_PREV_SECTIONS:
+            visited.add(offset)
+            trailer = self.load_xref_section(offset)
+            if self.trailer is None:
+                self.trailer = trailer
+            offset = trailer.get('Prev')
+        if self.trailer is None:
+            raise PdfMetaError('trailer not found')
+        if 'Encrypt' in self.trailer:
+            raise PdfMetaError('encrypted document')
+
+    def load_xref_section(self, offset):
+        position = self.parser.skip(offset)
+        if self.data[position:position + 4] == b'xref':
+            return self.load_xref_table(position + 4)
+        return self.load_xref_stream(position)
+
+    def load_xref_table(self, position):
+        subsections = []
+        while True:
+            position = self.parser.skip(position)
+            if self.data[position:position + 7] == b'trailer':
+                trailer, end = self.parser.parse(position + 7)
+                self.bytes_read += end - position
+                break
+            start_position = position
+            start, position = self.parser.parse(position)
+            count, position = self.parser.parse(position)
+            if not isinstance(start, int) or not isinstance(count, int):
+                raise PdfMetaError('invalid xref subsection')
+            position = self.parser.skip(position)
+            self.bytes_read += position - start_position
+            subsections.append((start, count, position))
+            position += count * 20
+        self.sections.append(('table', subsections))
+        if not isinstance(trailer, dict):
+            raise PdfMetaError('invalid trailer')
+        return trailer
+
+    def load_xref_stream(self, position):
+        stream = self.read_object_at(position)
+        if not isinstance(stream, PdfStream) or stream.dictionary.get('Type') != 'XRef':
+            raise PdfMetaError('invalid xref stream')
+        widths = stream.dictionary.get('W')
+        size = stream.dictionary.get('Size', 0)
+        index = stream.dictionary.get('Index', [0, size])
+        if not isinstance(widths, list) or len(widths) != 3:
+            raise PdfMetaError('invalid xref stream widths')
+        data = self.decode_stream(stream)
+        subsections = []
+        row = 0
+        for start, count in zip(index[0::2], index[1::2]):
+            subsections.append((start, count, row))
+            row += count
+        self.sections.append(('stream', (subsections, widths, data)))
+        return stream.dictionary
+
+    def table_entry(self, subsections, number):
+        for start, count, position in subsections:
+            if start <= number < start + count:
+                match, _ = self.parser.match(XREF_ENTRY, position + (number - start) * 20)
+                self.bytes_read += 20
+                if match is None:
+                    raise PdfMetaError('malformed xref entry for object {}'.format(number))
+                if match.group(3) == b'f':
+                    return ('free',)
+                return ('offset', int(match.group(1)))
+        return None
+
+    def stream_entry(self, section, number):
+        subsections, widths, data = section
+        row_size = sum(widths)
+        for start, count, row in subsections:
+            if start <= number < start + count:
+                position = (row + number - start) * row_size
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(data[position:position + width], 'big'))
+                    position += width
+                entry_type = fields[0] if widths[0] else 1
+                if entry_type == 1:
+                    return ('offset', fields[1])
+                if entry_type == 2:
+                    return ('compressed', fields[1], fields[2])
+                return ('free',)
+        return None
+
+    def lookup(self, number):
+        for kind, section in self.sections:
+            if kind == 'table':
+                entry = self.table_entry(section, number)
+            else:
+                entry = self.stream_entry(section, number)
+            if entry is not None:
+                return entry
+        return ('free',)
+
+    def get_object(self, reference):
+        entry = self.lookup(reference.number)
+        if entry[0] == 'offset':
+            return self.read_object_at(entry[1])
+        if entry[0] == 'compressed':
+            return self.read_compressed_object(entry[1], entry[2])
+        return None
+
+    def resolve(self, value, depth=0):
+        while isinstance(value, Reference):
+            depth += 1
+            if depth > 32:
+                raise PdfMetaError('reference loop')
+            value = self.get_object(value)
+        return value
+
+    def read_object_at(self, offset):
+        number, position = self.parser.parse(offset)
+        generation, position = self.parser.parse(position)
+        keyword, position = self.parser.parse(position)
+        if keyword != 'obj':
+            raise PdfMetaError('object expected at {}'.format(offset))
+        value, position = self.parser.parse(position)
+        self.bytes_read += position - offset
+        if isinstance(value, dict):
+            position = self.parser.skip(position)
+            if self.data[position:position + 6] == b'stream':
+                return self.read_stream(value, position + 6)
+        return value
+
+    def read_stream(self, dictionary, position):
+        if self.data[position:position + 2] == b'\r\n':
+            position += 2
+        elif self.data[position:position + 1] in (b'\n', b'\r'):
+            position += 1
+        length = self.resolve(dictionary.get('Length'))
+        if isinstance(length, int) and self.data[position + length:min(position + length + 20, self.size)].lstrip().startswith(b'endstream'):
+            end = position + length
+        else:
+            end = self.data.find(b'endstream', position, self.size)
+            if end < 0:
+                raise PdfMetaError('unterminated stream')
+        self.bytes_read += end - position
+        return PdfStream(dictionary, bytes(self.data[position:end]))
+
+    def decode_stream(self, stream):
+        filters = stream.dictionary.get('Filter')
+        if filters is None:
+            return stream.data
+        if isinstance(filters, list):
+            if len(filters) != 1:
+                raise PdfMetaError('unsupported filter chain')
+            filters = filters[0]
+        if filters != 'FlateDecode':
+            raise PdfMetaError('unsupported filter {}'.format(filters))
+        try:
+            data = zlib.decompress(stream.data)
+        except zlib.error as error:
+            raise PdfMetaError(str(error))
+        parameters = self.resolve(stream.dictionary.get('DecodeParms')) or {}
+        if isinstance(parameters, list):
+            parameters = parameters[0] or {}
+        predictor = parameters.get('Predictor', 1)
+        if predictor >= 10:
+            data = self.png_unpredict(data, parameters.get('Columns', 1))
+        elif predictor != 1:
+            raise PdfMetaError('unsupported predictor {}'.format(predictor))
+        return data
+
+    def png_unpredict(self, data, columns):
+        rows = []
+        previous = bytearray(columns)
+        for position in range(0, len(data), columns + 1):
+            filter_type = data[position]
+            row = bytearray(data[position + 1:position + 1 + columns])
+            if filter_type == 2:
+                for index in range(len(row)):
+                    row[index] = (row[index] + previous[index]) & 0xFF
+            elif filter_type != 0:
+                raise PdfMetaError('unsupported PNG predictor {}'.format(filter_type))
+            rows.append(bytes(row))
+            previous = row
+        return b''.join(rows)
+
+    def read_compressed_object(self, stream_number, index):
+        if stream_number not in self._object_streams:
+            stream = self.get_object(Reference(stream_number, 0))
+            if not isinstance(stream, PdfStream):
+                raise PdfMetaError('invalid object stream {}'.format(stream_number))
+            self._object_streams[stream_number] = (stream.dictionary, self.decode_stream(stream))
+        dictionary, data = self._object_streams[stream_number]
+        parser = PdfParser(data)
+        position = 0
+        offsets = []
+        for _ in range(dictionary.get('N', 0)):
+            _, position = parser.parse(position)
+            offset, position = parser.parse(position)
+            offsets.append(offset)
+        if index >= len(offsets):
+            raise PdfMetaError('object index outside of object stream')
+        value, _ = parser.parse(dictionary.get('First', 0) + offsets[index])
+        return value
+
+    def info(self):
+        info = self.resolve(self.trailer.get('Info'))
+        return info if isinstance(info, dict) else {}
+
+    def root(self):
+        root = self.resolve(self.trailer.get('Root'))
+        if not isinstance(root, dict):
+            raise PdfMetaError('document catalog not found')
+        return root
+
+    def page_count(self):
+        pages = self.resolve(self.root().get('Pages'))
+        if not isinstance(pages, dict):
+            raise PdfMetaError('page tree not found')
+        count = self.resolve(pages.get('Count'))
+        if not isinstance(count, int):
+            raise PdfMetaError('invalid page count')
+        return count
+
+    def xmp(self):
+        metadata = self.resolve(self.root().get('Metadata'))
+        if not isinstance(metadata, PdfStream):
+            return None
+        return self.decode_stream(metadata)
+
+
+def read_xmp_date(pattern, xmp):
+    match = pattern.search(xmp)
+    if match is None:
+        return None
+    return parse_w3cdtf(match.group(1).decode('utf-8', 'replace'))
+
+
+def parse_metadata(data, size=None):
+    try:
+        document = PdfDocument(data, size)
+        metadata = PdfMetadata()
+        info = document.info()
+        metadata.author = decode_text(document.resolve(info.get('Author')))
+        metadata.created = parse_pdf_date(document.resolve(info.get('CreationDate')))
+        metadata.modified = parse_pdf_date(document.resolve(info.get('ModDate')))
+        metadata.pages = document.page_count()
+        if metadata.created is None or metadata.modified is None:
+            xmp = document.xmp()
+            if xmp:
+                metadata.created = metadata.created or read_xmp_date(XMP_CREATE_DATE, xmp)
+                metadata.modified = metadata.modified or read_xmp_date(XMP_MODIFY_DATE, xmp)
+        metadata.bytes_read = document.bytes_read
+    except (IndexError, ValueError, TypeError, AttributeError, RecursionError) as error:
+        raise PdfMetaError(str(error))
+    return metadata
+
+
+class MetadataReader():
+    def __init__(self):
+        self._pages = [bytearray(PAGE_SIZE) for _ in range(PAGE_COUNT)]
+
+    def read_file(self, file):
+        data = PagedFile(file, self._pages)
+        metadata = parse_metadata(data)
+        metadata.bytes_read = data.bytes_read
+        return metadata
+
+    def read_metadata(self, filename):
+        if hasattr(filename, 'read'):
+            try:
+                return self.read_file(filename)
+            except OSError as error:
+                raise PdfMetaError(str(error))
+        with open(filename, 'rb') as file:
+            try:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:
+                raise PdfMetaError(str(error))
+            with data:
+                return parse_metadata(data)
+
+
+def read_metadata(filename):
+    return MetadataReader().read_metadata(filename)
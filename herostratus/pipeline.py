@@ -0,0 +1,203 @@
+import time
+import collections
+from .isolation import describe_error
+
+PIPELINE_DEPTH = 4
+
+
+def collect_document_info(filename, stat=None, measure=False, archives=None):
+    from .herostratus import get_worker_crawler
+    crawler = get_worker_crawler(archives, measure)
+    if not measure:
+        return crawler.create_document_infos(filename, stat)
+    return crawler.create_document_infos(filename, stat), crawler.stats
+
+
+def collect_document_info_batch(items, measure=False, archives=None):
+    from .herostratus import get_worker_crawler
+    crawler = get_worker_crawler(archives, measure)
+    if not measure:
+        return crawler.create_document_infos_many(items)
+    return crawler.create_document_infos_many(items), crawler.stats
+
+
+class Pipeline():
+    def process_document_infos(self, processor, batch):
+        process_many = getattr(processor, 'process_many', None)
+        if process_many is not None and len(batch) > 1:
+            results = []
+            started = time.perf_counter()
+            try:
+                for document in process_many(
+                    [filename for filename, _, _ in batch], [file_type for _, _, file_type in batch]
+                ):
+                    finished = time.perf_counter()
+                    results.append((document, finished - started))
+                    started = finished
+                if len(results) != len(batch):
+                    raise ValueError('{} documents for {} files'.format(len(results), len(batch)))
+            except Exception as error:
+                print("Processor: [{}] batch of [{}] files failed: {}".format(
+                    type(processor).__name__, len(batch), describe_error(error)
+                ))
+                for _, _, file_type in batch:
+                    file_type.bytes_read = 0
+            else:
+                for (document, elapsed), (_, _, file_type) in zip(results, batch):
+                    document.mime = file_type.mime
+                    if self.stats is not None:
+                        self.stats.record(
+                            'processor.' + type(processor).__name__, elapsed,
+                            file_type.bytes_read, document.reason is not None
+                        )
+                return results
+        results = []
+        for filename, stat, file_type in batch:
+            started = time.perf_counter()
+            document = self.process_document_info(processor, filename, stat, file_type)
+            results.append((document, time.perf_counter() - started))
+        return results
+
+    def create_document_infos_many(self, items):
+        results = [None] * len(items)
+        batches = {}
+        for index, (filename, stat, source) in enumerate(items):
+            if self.is_archive(filename):
+                results[index] = self.create_document_infos_from_archive(filename, stat)
+                continue
+            started = time.perf_counter()
+            file_type, document = self.detect_file_type(filename, stat, source)
+            if file_type is None:
+                self.measure('file', started, 0, True, filename)
+                results[index] = [document]
+                continue
+            detected = time.perf_counter() - started
+            batches.setdefault(file_type.mime, []).append((index, filename, stat, file_type, detected))
+        for mime, batch in batches.items():
+            processor = self.processors.get_processor(mime)
+            processed = self.process_document_infos(
+                processor, [(filename, stat, file_type) for _, filename, stat, file_type, _ in batch]
+            )
+            for (index, filename, _, _, detected), (document, elapsed) in zip(batch, processed):
+                if self.stats is not None:
+                    self.stats.record('file', detected + elapsed, 0, document.reason is not None, filename)
+                results[index] = [document]
+        return results
+
+    def collect_document_infos(self, entries, jobs=1):
+        if self.batch_size > 1 and not self.isolated():
+            yield from self.collect_document_infos_batched(entries, jobs)
+            return
+        if jobs <= 1 and not self.isolated():
+            if self.prefetch is not None:
+                entries = self.prefetch.iter_prefetched(entries, self.prefetchable)
+            for entry in entries:
+                if isinstance(entry, self.document_class):
+                    yield entry
+                    continue
+                try:
+                    documents = self.create_document_infos(entry.path, entry.stat, getattr(entry, 'source', None))
+                finally:
+                    if self.prefetch is not None:
+                        self.prefetch.release(entry)
+                yield from documents
+            return
+        if self.isolated():
+            from .isolation import IsolatedPool
+            executor = IsolatedPool(
+                collect_document_info, self.isolation_failed, jobs, self.timeout, self.memory_limit
+            )
+            submit = lambda path, stat: executor.submit(path, stat, self.stats is not None, self.archives)
+        else:
+            import concurrent.futures
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+            submit = lambda path, stat: executor.submit(
+                collect_document_info, path, stat, self.stats is not None, self.archives
+            )
+        pending = collections.deque()
+        with executor:
+            for entry in entries:
+                if not isinstance(entry, self.document_class):
+                    entry = submit(entry.path, entry.stat)
+                pending.append(entry)
+                if len(pending) >= max(jobs, 1) * PIPELINE_DEPTH:
+                    yield from self.resolve_document_infos(pending.popleft())
+            while pending:
+                yield from self.resolve_document_infos(pending.popleft())
+
+    def iter_batches(self, entries):
+        batch = []
+        size = 0
+        for entry in entries:
+            batch.append(entry)
+            if not isinstance(entry, self.document_class):
+                size += 1
+                if size >= self.batch_size:
+                    yield batch
+                    batch, size = [], 0
+        if batch:
+            yield batch
+
+    def batch_items(self, batch):
+        return [
+            (entry.path, entry.stat, getattr(entry, 'source', None))
+            for entry in batch if not isinstance(entry, self.document_class)
+        ]
+
+    def merge_batch(self, batch, results):
+        results = iter(results)
+        documents = []
+        for entry in batch:
+            if isinstance(entry, self.document_class):
+                documents.append(entry)
+            else:
+                documents.extend(next(results))
+        return documents
+
+    def collect_document_infos_batched(self, entries, jobs=1):
+        if jobs <= 1:
+            if self.prefetch is not None:
+                entries = self.prefetch.iter_prefetched(entries, self.prefetchable)
+            for batch in self.iter_batches(entries):
+                try:
+                    results = self.create_document_infos_many(self.batch_items(batch))
+                finally:
+                    if self.prefetch is not None:
+                        for entry in batch:
+                            if not isinstance(entry, self.document_class):
+                                self.prefetch.release(entry)
+                yield from self.merge_batch(batch, results)
+            return
+        import concurrent.futures
+        pending = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            for batch in self.iter_batches(entries):
+                items = self.batch_items(batch)
+                future = None
+                if items:
+                    future = executor.submit(collect_document_info_batch, items, self.stats is not None, self.archives)
+                pending.append((batch, future))
+                if len(pending) >= jobs * PIPELINE_DEPTH:
+                    yield from self.resolve_batch(*pending.popleft())
+            while pending:
+                yield from self.resolve_batch(*pending.popleft())
+
+    def resolve_batch(self, batch, future):
+        results = []
+        if future is not None:
+            results = future.result()
+            if isinstance(results, tuple):
+                results, stats = results
+                self.stats.merge(stats)
+        return self.merge_batch(batch, results)
+
+    def resolve_document_infos(self, item):
+        if isinstance(item, self.document_class):
+            return [item]
+        result = item.result()
+        if isinstance(result, tuple):
+            result, stats = result
+            self.stats.merge(stats)
+        if isinstance(result, self.document_class):
+            return [result]
+        return result
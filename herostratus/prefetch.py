@@ -0,0 +1,169 @@
+import io
+import os
+import time
+import threading
+import collections
+import concurrent.futures
+
+HEAD_SIZE = 1024 * 1024
+TAIL_SIZE = 64 * 1024
+BUFFER_SIZE = 64 * 1024
+WINDOW = 16
+THREADS = 8
+
+PrefetchedEntry = collections.namedtuple('PrefetchedEntry', ['path', 'stat', 'source'])
+
+
+class PrefetchedFile(io.RawIOBase):
+    def __init__(self, source):
+        self.source = source
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.source.size
+        if offset < 0:
+            raise ValueError('negative seek position {}'.format(offset))
+        self.position = offset
+        return self.position
+
+    def readinto(self, buffer):
+        data = self.source.read_at(self.position, len(buffer))
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def readall(self):
+        chunks = []
+        while True:
+            data = self.source.read_at(self.position, self.source.size - self.position)
+            if not data:
+                return b''.join(chunks)
+            chunks.append(data)
+            self.position += len(data)
+
+
+class PrefetchedSource():
+    def __init__(self, path, size, head, tail, opener=open):
+        self.path = path
+        self.size = size
+        self.head = head
+        self.tail = tail
+        self.opener = opener
+        self.fallback_reads = 0
+        self._file = None
+
+    def read_at(self, offset, size):
+        size = min(size, self.size - offset)
+        if size <= 0:
+            return b''
+        if offset < len(self.head):
+            return self.head[offset:offset + size]
+        tail_start = self.size - len(self.tail)
+        if offset >= tail_start:
+            return self.tail[offset - tail_start:offset - tail_start + size]
+        if self._file is None:
+            self._file = self.opener(self.path, 'rb')
+            self.fallback_reads += 1
+        self._file.seek(offset)
+        self.fallback_reads += 1
+        return self._file.read(min(size, tail_start - offset))
+
+    def open(self):
+        return io.BufferedReader(PrefetchedFile(self), BUFFER_SIZE)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Prefetcher():
+    def __init__(self, window=WINDOW, threads=THREADS, head_size=HEAD_SIZE, tail_size=TAIL_SIZE,
+                 opener=open, stat=os.stat):
+        self.window = window
+        self.threads = threads
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.opener = opener
+        self.stat = stat
+        self.files = 0
+        self.bytes = 0
+        self.errors = 0
+        self.fallback_reads = 0
+        self.wait = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, path, stat=None):
+        if stat is None:
+            stat = self.stat(path)
+        size = stat.st_size
+        with self.opener(path, 'rb') as file:
+            if size <= self.head_size + self.tail_size:
+                head = file.read()
+                tail = b''
+                size = len(head)
+            else:
+                head = file.read(self.head_size)
+                file.seek(size - self.tail_size)
+                tail = file.read(self.tail_size)
+        with self._lock:
+            self.files += 1
+            self.bytes += len(head) + len(tail)
+        return PrefetchedEntry(path, stat, PrefetchedSource(path, size, head, tail, self.opener))
+
+    def resolve(self, entry, future):
+        if future is None:
+            return entry
+        started = time.perf_counter()
+        try:
+            return future.result()
+        except OSError:
+            self.errors += 1
+            return entry
+        finally:
+            self.wait += time.perf_counter() - started
+
+    def release(self, entry):
+        source = getattr(entry, 'source', None)
+        if source is not None:
+            self.fallback_reads += source.fallback_reads
+            source.close()
+
+    def iter_prefetched(self, entries, wanted=None):
+        if self.window <= 0:
+            for entry in entries:
+                if wanted is None or wanted(entry):
+                    try:
+                        entry = self.load(entry.path, entry.stat)
+                    except OSError:
+                        self.errors += 1
+                yield entry
+            return
+        pending = collections.deque()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.threads) as executor:
+            try:
+                for entry in entries:
+                    future = None
+                    if wanted is None or wanted(entry):
+                        future = executor.submit(self.load, entry.path, entry.stat)
+                    pending.append((entry, future))
+                    if len(pending) > self.window:
+                        yield self.resolve(*pending.popleft())
+                while pending:
+                    yield self.resolve(*pending.popleft())
+            finally:
+                for entry, future in pending:
+                    if future is not None and not future.cancel() and future.exception() is None:
+                        self.release(future.result())
@@ -0,0 +1,60 @@
+import os
+import heapq
+import pickle
+
+
+class ExternalSorter():
+    def __init__(self, key, run_size=100000):
+        self.key = key
+        self.run_size = run_size
+        self._buffer = []
+        self._runs = []
+        self._length = 0
+        self._directory = None
+
+    def append(self, item):
+        self._buffer.append(item)
+        self._length += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        if self._directory is None:
+            import tempfile
+            self._directory = tempfile.TemporaryDirectory(prefix='herostratus-')
+        self._buffer.sort(key=self.key)
+        run = os.path.join(self._directory.name, 'run-{}'.format(len(self._runs)))
+        with open(run, 'wb') as file:
+            for item in self._buffer:
+                pickle.dump(item, file, pickle.HIGHEST_PROTOCOL)
+        self._runs.append(run)
+        self._buffer = []
+
+    def _read_run(self, run):
+        with open(run, 'rb') as file:
+            while True:
+                try:
+                    yield pickle.load(file)
+                except EOFError:
+                    return
+
+    def sort(self, key=None):
+        if key is None or key is self.key:
+            return
+        resorted = ExternalSorter(key, self.run_size)
+        for item in self:
+            resorted.append(item)
+        self.key = key
+        self._buffer = resorted._buffer
+        self._runs = resorted._runs
+        self._directory = resorted._directory
+
+    def __iter__(self):
+        self._buffer.sort(key=self.key)
+        if not self._runs:
+            return iter(list(self._buffer))
+        runs = [self._read_run(run) for run in self._runs]
+        return heapq.merge(*runs, list(self._buffer), key=self.key)
+
+    def __len__(self):
+        return self._length
@@ -0,0 +1,117 @@
+import json
+import time
+import heapq
+import random
+
+SAMPLE_SIZE = 10000
+PERCENTILES = (50, 90, 99)
+
+
+class StageStats():
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.bytes = 0
+        self.errors = 0
+        self.max = 0.0
+        self.samples = []
+
+    def sample(self, elapsed, seen, generator):
+        if len(self.samples) < SAMPLE_SIZE:
+            self.samples.append(elapsed)
+        else:
+            index = generator.randrange(seen)
+            if index < SAMPLE_SIZE:
+                self.samples[index] = elapsed
+
+    def add(self, elapsed, size, errors, generator):
+        self.count += 1
+        self.time += elapsed
+        self.bytes += size
+        self.errors += errors
+        self.max = max(self.max, elapsed)
+        self.sample(elapsed, self.count, generator)
+
+    def merge(self, other, generator):
+        for seen, elapsed in enumerate(other.samples, self.count + 1):
+            self.sample(elapsed, seen, generator)
+        self.count += other.count
+        self.time += other.time
+        self.bytes += other.bytes
+        self.errors += other.errors
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        if not self.samples:
+            return None
+        samples = sorted(self.samples)
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+    def to_dict(self):
+        result = {
+            'count': self.count,
+            'time': self.time,
+            'bytes': self.bytes,
+            'errors': self.errors,
+            'per_second': self.count / self.time if self.time else None,
+            'max': self.max
+        }
+        for percent in PERCENTILES:
+            result['p{}'.format(percent)] = self.percentile(percent)
+        return result
+
+
+class Stats():
+    def __init__(self, slowest=10):
+        self.slowest_size = slowest
+        self.stages = {}
+        self.slowest = []
+        self.started = time.perf_counter()
+        self._random = random.Random(0)
+
+    def stage(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = StageStats()
+        return stage
+
+    def record(self, name, elapsed, size=0, error=False, path=None):
+        self.stage(name).add(elapsed, size, 1 if error else 0, self._random)
+        if path is not None and self.slowest_size:
+            item = (elapsed, path, name)
+            if len(self.slowest) < self.slowest_size:
+                heapq.heappush(self.slowest, item)
+            elif item > self.slowest[0]:
+                heapq.heapreplace(self.slowest, item)
+
+    def merge(self, other):
+        for name, stage in other.stages.items():
+            self.stage(name).merge(stage, self._random)
+        for item in other.slowest:
+            if len(self.slowest) < self.slowest_size:
+                heapq.heappush(self.slowest, item)
+            elif item > self.slowest[0]:
+                heapq.heapreplace(self.slowest, item)
+
+    def to_dict(self):
+        return {
+            'elapsed': time.perf_counter() - self.started,
+            'stages': {name: self.stages[name].to_dict() for name in sorted(self.stages)},
+            'slowest': [
+                {'path': path, 'stage': name, 'time': elapsed}
+                for elapsed, path, name in sorted(self.slowest, reverse=True)
+            ]
+        }
+
+    def write(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self):
+        lines = []
+        for name in sorted(self.stages):
+            stage = self.stages[name]
+            lines.append(
+                "{:<32} {:>8} calls {:>10.3f}s {:>8} errors".format(name, stage.count, stage.time, stage.errors)
+            )
+        return '\n'.join(lines)
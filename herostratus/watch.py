@@ -0,0 +1,263 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+from .discovery import DiscoveredFile
+from .archives import ARCHIVE_SEPARATOR
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+    IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW
+)
+EVENT_HEADER = struct.Struct('iIII')
+READ_SIZE = 64 * 1024
+
+
+class WatchError(Exception):
+    pass
+
+
+class Inotify():
+    def __init__(self):
+        library = ctypes.util.find_library('c')
+        try:
+            self._libc = ctypes.CDLL(library or 'libc.so.6', use_errno=True)
+            self._libc.inotify_init1
+        except (OSError, AttributeError) as error:
+            raise WatchError('inotify is not available: {}'.format(error))
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise WatchError(os.strerror(ctypes.get_errno()))
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), path)
+        return wd
+
+    def rm_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout=None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except OSError as error:
+            if error.errno == errno.EAGAIN:
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, cookie, name))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class Watcher():
+    def __init__(self, crawler, target_path, timeline, on_change=None, debounce=2.0, jobs=1, cache=None):
+        self.crawler = crawler
+        self.target_path = target_path
+        self.timeline = timeline
+        self.on_change = on_change
+        self.debounce = debounce
+        self.jobs = jobs
+        self.cache = cache
+        self.documents = {}
+        self.pending = {}
+        self.last_event = None
+        self.ignore = set()
+        self._watches = {}
+        self._paths = {}
+        for section in (timeline.processed, timeline.unprocessed):
+            for document in section:
+                self.documents[document.path] = document
+        self.inotify = Inotify()
+        self.watch_tree(target_path)
+
+    def watch_tree(self, directory):
+        added = []
+        for path in self.crawler.discovery.directories(directory):
+            if not self.crawler.discovery.accepts_directory_path(self.target_path, path):
+                continue
+            try:
+                wd = self.inotify.add_watch(path)
+            except OSError:
+                continue
+            self._watches[wd] = path
+            self._paths[path] = wd
+            added.append(path)
+        return added
+
+    def unwatch_tree(self, directory):
+        prefix = os.path.join(directory, '')
+        for path in [path for path in self._paths if path == directory or path.startswith(prefix)]:
+            wd = self._paths.pop(path)
+            self._watches.pop(wd, None)
+            self.inotify.rm_watch(wd)
+
+    def ignored(self, path):
+        path = os.path.abspath(path)
+        for ignored in self.ignore:
+            if path == ignored or path.startswith(os.path.join(ignored, '')):
+                return True
+        return False
+
+    def schedule(self, path, deleted=False):
+        if self.ignored(path):
+            return
+        self.pending[path] = deleted
+        self.last_event = time.monotonic()
+
+    def schedule_tree(self, directory, deleted=False):
+        prefix = os.path.join(directory, '')
+        for path in [path for path in self.documents if path.startswith(prefix)]:
+            self.schedule(path, True)
+        if not deleted:
+            for entry in self.crawler.discovery.scan(directory):
+                self.schedule(entry.path)
+
+    def handle(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            self.schedule_tree(self.target_path)
+            return
+        directory = self._watches.get(wd)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            if self._paths.get(directory) == wd:
+                del self._paths[directory]
+            return
+        if not name:
+            return
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                if self.watch_tree(path):
+                    self.schedule_tree(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self.unwatch_tree(path)
+                self.schedule_tree(path, deleted=True)
+            return
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            self.schedule(path, True)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_ATTRIB | IN_CREATE):
+            self.schedule(path)
+
+    def poll(self, timeout=None):
+        events = self.inotify.read(timeout)
+        for wd, mask, cookie, name in events:
+            self.handle(wd, mask, name)
+        return len(events)
+
+    def due(self):
+        return bool(self.pending) and time.monotonic() - self.last_event >= self.debounce
+
+    def members(self, path):
+        if not self.crawler.is_archive(path):
+            return []
+        prefix = path + ARCHIVE_SEPARATOR
+        return [member for member in self.documents if member.startswith(prefix)]
+
+    def entries(self, paths):
+        for path in paths:
+            if not self.crawler.discovery.accepts_path(self.target_path, path):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isfile(path):
+                yield DiscoveredFile(path, stat)
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return {}
+        changes = {}
+        for path in pending:
+            for removed in [path] + self.members(path):
+                document = self.documents.pop(removed, None)
+                if document is not None:
+                    self.timeline.remove(document)
+                    changes[removed] = 'deleted'
+        updated = [path for path, deleted in pending.items() if not deleted]
+        stats = {}
+        for entry in self.entries(updated):
+            stats[entry.path] = entry.stat
+        entries = [DiscoveredFile(path, stat) for path, stat in stats.items()]
+        if self.crawler.quarantine is not None:
+            entries = self.crawler.iter_quarantined(entries)
+        for document in self.crawler.collect_document_infos(entries, self.jobs):
+            self.timeline.insert(document)
+            self.documents[document.path] = document
+            changes[document.path] = 'modified' if changes.get(document.path) else 'created'
+            stat = stats.get(document.path)
+            if self.cache is not None and stat is not None and document.reason is None:
+                if not self.crawler.is_archive(document.path):
+                    self.cache.store(document.path, stat, document.to_dict())
+        if self.cache is not None:
+            for path, change in changes.items():
+                if change == 'deleted':
+                    self.cache.remove(path)
+            self.cache.commit()
+        if changes and self.on_change is not None:
+            self.on_change(changes)
+        return changes
+
+    def run(self, stop=None, interval=1.0):
+        try:
+            while stop is None or not stop():
+                wait = interval
+                if self.pending:
+                    wait = max(min(interval, self.debounce - (time.monotonic() - self.last_event)), 0)
+                self.poll(wait)
+                if self.due():
+                    self.flush()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.flush()
+
+    def close(self):
+        self.inotify.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
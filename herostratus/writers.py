@@ -0,0 +1,903 @@
+import os
+import io
+import csv
+import html
+import gzip
+import json
+import time
+import xml.etree.ElementTree as xee
+
+from .lazy import lazy_import
+
+dominate = lazy_import('dominate')
+xlwt = lazy_import('xlwt')
+xlsxwriter = lazy_import('xlsxwriter')
+
+DATE_FORMAT = "%m/%d/%Y, %H:%M:%S"
+
+XLS_COLUMNS = {
+    'processed': ['#', 'name', 'path', 'date_create', 'author', 'date_modified', 'author_last', 'pages', 'size'],
+    'unprocessed': ['#', 'name', 'path', 'date_create', 'size']
+}
+XLS_PATH_COLORS = {'processed': 'blue', 'unprocessed': 'red'}
+XLS_DUPLICATE_COLUMNS = ['#', 'hash', 'size', 'path']
+
+XLS_MAX_ROWS = 65536
+XLSX_MAX_ROWS = 1048576
+XLSX_DATE_FORMAT = 'mm/dd/yyyy hh:mm:ss'
+
+RECORD_COLUMNS = [
+    'section', 'name', 'path', 'mime', 'author', 'author_last',
+    'date_create', 'date_modified', 'pages', 'size', 'reason', 'content_hash'
+]
+
+HTML_SHARD_SIZE = 1000
+HTML_COLUMNS = ['name', 'path', 'author', 'date_create', 'author_last', 'date_modified', 'pages', 'size']
+
+HTML_INDEX_TEMPLATE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 0 1em; }}
+.tabs button.active {{ font-weight: bold; }}
+.row {{ display: flex; height: 24px; line-height: 24px; font-size: 13px; border-bottom: 1px solid #eee; }}
+.row span {{ flex: 1; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; padding-right: 4px; }}
+.row span.name, .row span.path {{ flex: 2; }}
+.columns {{ font-weight: bold; }}
+.viewport {{ height: 80vh; overflow-y: auto; border: 1px solid #ccc; }}
+.spacer {{ position: relative; }}
+.spacer .row {{ position: absolute; left: 0; right: 0; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<div id="tabs" class="tabs"></div>
+<div id="columns" class="row columns"></div>
+<div id="viewport" class="viewport"><div id="spacer" class="spacer"></div></div>
+<script type="text/javascript">
+var MANIFEST = {manifest};
+var ROW_HEIGHT = 24;
+var shards = {{}};
+var loading = {{}};
+var current = 'processed';
+var pending = false;
+
+function escapeHtml(value) {{
+    if (value === null || value === undefined) {{ return ''; }}
+    return String(value).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+}}
+
+function herostratusShard(section, name, rows) {{
+    shards[name] = rows;
+    delete loading[name];
+    scheduleRender();
+}}
+
+function loadShard(name) {{
+    if (shards[name] || loading[name]) {{ return; }}
+    loading[name] = true;
+    var script = document.createElement('script');
+    script.src = name;
+    document.body.appendChild(script);
+}}
+
+function shardIndex(section, row) {{
+    var low = 0;
+    var high = section.offsets.length - 1;
+    while (low < high) {{
+        var middle = Math.ceil((low + high) / 2);
+        if (section.offsets[middle] <= row) {{ low = middle; }} else {{ high = middle - 1; }}
+    }}
+    return low;
+}}
+
+function renderRow(row, top) {{
+    var cells = [];
+    for (var i = 0; i < MANIFEST.columns.length; i++) {{
+        var value = escapeHtml(row[i]);
+        if (MANIFEST.columns[i] === 'name') {{
+            value = '<a href="' + escapeHtml(row[1]) + '">' + value + '</a>';
+        }}
+        cells.push('<span class="' + MANIFEST.columns[i] + '" title="' + escapeHtml(row[i]) + '">' + value + '</span>');
+    }}
+    return '<div class="row" style="top:' + top + 'px">' + cells.join('') + '</div>';
+}}
+
+function render() {{
+    pending = false;
+    var viewport = document.getElementById('viewport');
+    var spacer = document.getElementById('spacer');
+    var section = MANIFEST.sections[current];
+    spacer.style.height = (section.count * ROW_HEIGHT) + 'px';
+    var first = Math.floor(viewport.scrollTop / ROW_HEIGHT);
+    var last = Math.min(section.count, first + Math.ceil(viewport.clientHeight / ROW_HEIGHT) + 1);
+    var rows = [];
+    for (var i = first; i < last; i++) {{
+        var index = shardIndex(section, i);
+        var shard = shards[section.shards[index]];
+        if (!shard) {{
+            loadShard(section.shards[index]);
+            continue;
+        }}
+        rows.push(renderRow(shard[i - section.offsets[index]], i * ROW_HEIGHT));
+    }}
+    spacer.innerHTML = rows.join('');
+}}
+
+function scheduleRender() {{
+    if (!pending) {{
+        pending = true;
+        window.requestAnimationFrame(render);
+    }}
+}}
+
+function selectSection(name) {{
+    current = name;
+    document.getElementById('viewport').scrollTop = 0;
+    var buttons = document.getElementById('tabs').getElementsByTagName('button');
+    for (var i = 0; i < buttons.length; i++) {{
+        buttons[i].className = buttons[i].getAttribute('data-section') === name ? 'active' : '';
+    }}
+    scheduleRender();
+}}
+
+(function () {{
+    var tabs = [];
+    for (var name in MANIFEST.sections) {{
+        var offset = 0;
+        MANIFEST.sections[name].offsets = [];
+        for (var k = 0; k < MANIFEST.sections[name].counts.length; k++) {{
+            MANIFEST.sections[name].offsets.push(offset);
+            offset += MANIFEST.sections[name].counts[k];
+        }}
+        tabs.push('<button data-section="' + name + '">' + name + ' (' + MANIFEST.sections[name].count + ')</button>');
+    }}
+    document.getElementById('tabs').innerHTML = tabs.join(' ');
+    var buttons = document.getElementById('tabs').getElementsByTagName('button');
+    for (var j = 0; j < buttons.length; j++) {{
+        buttons[j].onclick = function () {{ selectSection(this.getAttribute('data-section')); }};
+    }}
+    var columns = [];
+    for (var i = 0; i < MANIFEST.columns.length; i++) {{
+        columns.push('<span class="' + MANIFEST.columns[i] + '">' + MANIFEST.columns[i] + '</span>');
+    }}
+    document.getElementById('columns').innerHTML = columns.join('');
+    document.getElementById('viewport').onscroll = scheduleRender;
+    window.onresize = scheduleRender;
+    selectSection(current);
+}})();
+</script>
+</body>
+</html>
+'''
+
+
+class TimelineRecord():
+    def __init__(self, document):
+        self.document = document
+        self._dates = {}
+
+    def __getattr__(self, name):
+        return getattr(self.document, name)
+
+    def date(self, name, style):
+        key = (name, style)
+        if key not in self._dates:
+            value = getattr(self.document, name)
+            if style == 'text':
+                self._dates[key] = '' if value is None else value.strftime(DATE_FORMAT)
+            elif style == 'iso':
+                self._dates[key] = None if value is None else value.isoformat()
+            else:
+                self._dates[key] = str(value)
+        return self._dates[key]
+
+    def date_text(self, name):
+        return self.date(name, 'text')
+
+    def date_iso(self, name):
+        return self.date(name, 'iso')
+
+    def date_str(self, name):
+        return self.date(name, 'str')
+
+
+def as_record(document):
+    if isinstance(document, TimelineRecord):
+        return document
+    return TimelineRecord(document)
+
+
+def text_or_none(value):
+    return None if value is None else str(value)
+
+
+def record_to_xml(record):
+    if not record.processed:
+        root = xee.Element("file")
+        xee.SubElement(root, "name").text = record.name
+        xee.SubElement(root, "path").text = record.path
+        xee.SubElement(root, "size").text = str(record.size)
+        if record.reason is not None:
+            xee.SubElement(root, "reason").text = record.reason
+        return root
+    root = xee.Element("document")
+    xee.SubElement(root, "name").text = record.name
+    xee.SubElement(root, "path").text = record.path
+    xee.SubElement(root, "author").text = record.author
+    xee.SubElement(root, "author_last").text = record.author_last
+    xee.SubElement(root, "date_create").text = record.date_text('date_create')
+    xee.SubElement(root, "date_modified").text = record.date_text('date_modified')
+    xee.SubElement(root, "pages").text = str(record.pages)
+    xee.SubElement(root, "size").text = str(record.size)
+    return root
+
+
+def open_output(filename, compress=False, mode='wb'):
+    if compress:
+        if mode == 'wb':
+            return gzip.open(filename, mode)
+        return gzip.open(filename, mode, encoding='utf-8', newline='')
+    if mode == 'wb':
+        return open(filename, mode)
+    return open(filename, mode.replace('t', ''), encoding='utf-8', newline='')
+
+
+def write_if_changed(filename, content):
+    try:
+        with open(filename, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+
+class DuplicateGroups():
+    def __init__(self):
+        self._groups = {}
+
+    def add(self, record):
+        if record.content_hash is not None:
+            self._groups.setdefault((record.content_hash, record.size), []).append(record.path)
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __iter__(self):
+        for (content_hash, size), paths in sorted(self._groups.items()):
+            yield content_hash, size, sorted(paths)
+
+
+def duplicates_to_xml(groups):
+    root = xee.Element("duplicates")
+    for content_hash, size, paths in groups:
+        e_group = xee.SubElement(root, "group", hash=content_hash, size=str(size))
+        for path in paths:
+            xee.SubElement(e_group, "path").text = path
+    return root
+
+
+class TimelineSink():
+    def open(self, path):
+        pass
+
+    def section(self, name):
+        pass
+
+    def write(self, record):
+        pass
+
+    def close(self):
+        pass
+
+
+class CachedRows():
+    rows = None
+
+    def cache_rows(self):
+        self.rows = {}
+        self._next_rows = {}
+
+    def start_rows(self):
+        if self.rows is not None:
+            self._next_rows = {}
+
+    def end_rows(self):
+        if self.rows is not None:
+            self.rows = self._next_rows
+            self._next_rows = {}
+
+    def row(self, record, render):
+        if self.rows is None:
+            return render(record)
+        key = id(record.document)
+        cached = self.rows.get(key)
+        if cached is None or cached[0] is not record.document or cached[1] != self._section:
+            cached = (record.document, self._section, render(record))
+        self._next_rows[key] = cached
+        return cached[2]
+
+
+class MeasuredSink(TimelineSink):
+    def __init__(self, sink, stats):
+        self.sink = sink
+        self.stats = stats
+        self.stage = 'writer.' + type(sink).__name__
+
+    def measure(self, method, *args):
+        started = time.perf_counter()
+        try:
+            method(*args)
+        except Exception:
+            self.stats.record(self.stage, time.perf_counter() - started, error=True)
+            raise
+        self.stats.record(self.stage, time.perf_counter() - started)
+
+    def open(self, path):
+        self.measure(self.sink.open, path)
+
+    def section(self, name):
+        self.measure(self.sink.section, name)
+
+    def write(self, record):
+        self.measure(self.sink.write, record)
+
+    def close(self):
+        self.measure(self.sink.close)
+
+
+class XmlTimelineWriter(CachedRows, TimelineSink):
+    def __init__(self, filename, compress=False):
+        self.filename = filename
+        self.compress = compress
+        self._file = None
+        self._section = None
+        self._section_empty = True
+        self._duplicates = DuplicateGroups()
+
+    def open(self, path):
+        self._file = open_output(self.filename, self.compress)
+        self._duplicates = DuplicateGroups()
+        self.start_rows()
+        e_path = xee.Element("path")
+        e_path.text = path
+        self._file.write(b'<path>')
+        self._file.write(xee.tostring(e_path))
+
+    def end_section(self):
+        if self._section is None:
+            return
+        if self._section_empty:
+            self._file.write('<{} />'.format(self._section).encode('ascii'))
+        else:
+            self._file.write('</{}>'.format(self._section).encode('ascii'))
+        self._section = None
+
+    def section(self, name):
+        self.end_section()
+        self._section = name
+        self._section_empty = True
+
+    def write(self, document):
+        record = as_record(document)
+        if self._section_empty:
+            self._file.write('<{}>'.format(self._section).encode('ascii'))
+            self._section_empty = False
+        self._file.write(self.row(record, self.render))
+        self._duplicates.add(record)
+
+    def render(self, record):
+        return xee.tostring(record_to_xml(record))
+
+    def close(self):
+        self.end_section()
+        if self._duplicates:
+            self._file.write(xee.tostring(duplicates_to_xml(self._duplicates)))
+        self._file.write(b'</path>')
+        self._file.close()
+        self._file = None
+        self.end_rows()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            self.close()
+
+
+def html_value(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+class HtmlTimelineWriter(TimelineSink):
+    def __init__(self, filename):
+        self.filename = filename
+        self._document = None
+        self._section = None
+        self._container = None
+        self._duplicates = DuplicateGroups()
+
+    def open(self, path):
+        self._document = dominate.document(path)
+        self._duplicates = DuplicateGroups()
+        self._document.head.add(dominate.tags.link(rel='stylesheet', href='style.css'))
+        self._document.head.add(dominate.tags.script(type='text/javascript', src='script.js'))
+        self._document.add(dominate.tags.h1(path))
+
+    def section(self, name):
+        self._section = name
+        self._container = self._document.add(dominate.tags.div(_class=name))
+        if name == 'unprocessed':
+            self._container = self._container.add(dominate.tags.ul())
+
+    def processed_document(self, record):
+        return dominate.tags.div(
+            dominate.tags.div(
+                dominate.tags.a(record.name, href='%s' % record.path),
+                _class='header'
+            ),
+            dominate.tags.div(
+                dominate.tags.ul(
+                    dominate.tags.li('Author: %s' % record.author),
+                    dominate.tags.li('Create date: %s' % record.date_str('date_create')),
+                    dominate.tags.li('Last editor: %s' % record.author_last),
+                    dominate.tags.li('Modified date: %s' % record.date_str('date_modified')),
+                    dominate.tags.li('Pages: %s' % record.pages),
+                    dominate.tags.li('Size: %d' % record.size)
+                ),
+                _class='content'
+            ),
+            _class='document'
+        )
+
+    def unprocessed_file(self, record):
+        return dominate.tags.li(
+            dominate.tags.a(record.name, href='%s' % record.path)
+        )
+
+    def duplicate_group(self, content_hash, size, paths):
+        return dominate.tags.div(
+            dominate.tags.div('Hash: %s, Size: %d, Copies: %d' % (content_hash, size, len(paths)), _class='header'),
+            dominate.tags.ul(*[dominate.tags.li(dominate.tags.a(path, href='%s' % path)) for path in paths]),
+            _class='group'
+        )
+
+    def write(self, document):
+        record = as_record(document)
+        if self._section == 'processed':
+            self._container.add(self.processed_document(record))
+        else:
+            self._container.add(self.unprocessed_file(record))
+        self._duplicates.add(record)
+
+    def close(self):
+        if self._duplicates:
+            container = self._document.add(dominate.tags.div(_class='duplicates'))
+            for content_hash, size, paths in self._duplicates:
+                container.add(self.duplicate_group(content_hash, size, paths))
+        with open(self.filename, 'w') as f:
+            f.write(self._document.render())
+        self._document = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._document is not None:
+            self.close()
+
+
+class XlsTimelineWriter(TimelineSink):
+    def __init__(self, filename, max_rows=XLS_MAX_ROWS):
+        self.filename = filename
+        self.max_rows = max_rows
+        self._workbook = None
+        self._path = None
+        self._section = None
+        self._sheet = None
+        self._sheets = 0
+        self._row = 0
+        self._count = 0
+        self._duplicates = DuplicateGroups()
+
+    def open(self, path):
+        self._path = path
+        self._workbook = xlwt.Workbook()
+        self._duplicates = DuplicateGroups()
+        self._style_header = xlwt.easyxf('font: bold 1')
+        self._style_path = {
+            section: xlwt.easyxf('font: bold 1, color {};'.format(color))
+            for section, color in XLS_PATH_COLORS.items()
+        }
+        self._style_path['duplicates'] = self._style_header
+
+    def add_sheet(self, columns):
+        self._sheets += 1
+        name = self._section if self._sheets == 1 else '{}-{}'.format(self._section, self._sheets)
+        self._sheet = self._workbook.add_sheet(name)
+        self._sheet.write(0, 0, self._path, self._style_path[self._section])
+        for column, header in enumerate(columns):
+            self._sheet.write(1, column, header, self._style_header)
+        self._row = 2
+
+    def section(self, name):
+        self._section = name
+        self._sheets = 0
+        self._count = 0
+        self.add_sheet(XLS_COLUMNS[name])
+
+    def write(self, document):
+        if self._row >= self.max_rows:
+            self.add_sheet(XLS_COLUMNS[self._section])
+        self._count += 1
+        record = as_record(document)
+        sheet = self._sheet
+        cursor = self._row
+        sheet.write(cursor, 0, self._count)
+        sheet.write(cursor, 1, record.name)
+        sheet.write(cursor, 2, 'file:/{}'.format(record.path))
+        sheet.write(cursor, 3, record.date_text('date_create'))
+        if self._section == 'processed':
+            sheet.write(cursor, 4, record.author)
+            sheet.write(cursor, 5, record.date_text('date_modified'))
+            sheet.write(cursor, 6, record.author_last)
+            sheet.write(cursor, 7, record.pages)
+            sheet.write(cursor, 8, record.size)
+        else:
+            sheet.write(cursor, 4, record.size)
+        self._row += 1
+        self._duplicates.add(record)
+
+    def write_duplicates(self):
+        self._section = 'duplicates'
+        self._sheets = 0
+        self.add_sheet(XLS_DUPLICATE_COLUMNS)
+        for group, (content_hash, size, paths) in enumerate(self._duplicates, 1):
+            for path in paths:
+                if self._row >= self.max_rows:
+                    self.add_sheet(XLS_DUPLICATE_COLUMNS)
+                sheet = self._sheet
+                sheet.write(self._row, 0, group)
+                sheet.write(self._row, 1, content_hash)
+                sheet.write(self._row, 2, size)
+                sheet.write(self._row, 3, 'file:/{}'.format(path))
+                self._row += 1
+
+    def close(self):
+        if self._duplicates:
+            self.write_duplicates()
+        self._workbook.save(self.filename)
+        self._workbook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._workbook is not None:
+            self.close()
+
+
+class CsvTimelineWriter(CachedRows, TimelineSink):
+    def __init__(self, filename, compress=False):
+        self.filename = filename
+        self.compress = compress
+        self._file = None
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._section = None
+
+    def open(self, path):
+        self._file = open_output(self.filename, self.compress, 'wt')
+        csv.writer(self._file).writerow(RECORD_COLUMNS)
+        self.start_rows()
+
+    def section(self, name):
+        self._section = name
+
+    def write(self, document):
+        self._file.write(self.row(as_record(document), self.render))
+
+    def render(self, record):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow([
+            self._section, record.name, record.path, record.mime,
+            text_or_none(record.author), text_or_none(record.author_last),
+            record.date_iso('date_create'), record.date_iso('date_modified'),
+            record.pages, record.size, record.reason, record.content_hash
+        ])
+        return self._buffer.getvalue()
+
+    def close(self):
+        self._file.close()
+        self._file = None
+        self.end_rows()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            self.close()
+
+
+class JsonlTimelineWriter(CachedRows, TimelineSink):
+    def __init__(self, filename, compress=False):
+        self.filename = filename
+        self.compress = compress
+        self._file = None
+        self._section = None
+
+    def open(self, path):
+        self._file = open_output(self.filename, self.compress, 'wt')
+        self.start_rows()
+
+    def section(self, name):
+        self._section = name
+
+    def write(self, document):
+        self._file.write(self.row(as_record(document), self.render))
+
+    def render(self, record):
+        return json.dumps({
+            'section': self._section,
+            'name': record.name,
+            'path': record.path,
+            'mime': record.mime,
+            'author': text_or_none(record.author),
+            'author_last': text_or_none(record.author_last),
+            'date_create': record.date_iso('date_create'),
+            'date_modified': record.date_iso('date_modified'),
+            'pages': html_value(record.pages),
+            'size': record.size,
+            'reason': record.reason,
+            'content_hash': record.content_hash
+        }, ensure_ascii=False) + '\n'
+
+    def close(self):
+        self._file.close()
+        self._file = None
+        self.end_rows()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            self.close()
+
+
+class ShardedHtmlTimelineWriter(CachedRows, TimelineSink):
+    def __init__(self, directory, shard_size=HTML_SHARD_SIZE):
+        self.directory = directory
+        self.shard_size = shard_size
+        self.written = []
+        self._path = None
+        self._sections = {}
+        self._section = None
+        self._layouts = {}
+        self._layout = []
+        self._previous = []
+        self._known = {}
+        self._index = 0
+        self._names = {}
+        self._rows = []
+        self._open = False
+
+    def open(self, path):
+        self._path = path
+        self._open = True
+        self._sections = {}
+        self.written = []
+        self.start_rows()
+        os.makedirs(os.path.join(self.directory, 'shards'), exist_ok=True)
+
+    def next_name(self):
+        number = self._names.get(self._section, 0)
+        self._names[self._section] = number + 1
+        return 'shards/{}-{}.js'.format(self._section, number)
+
+    def add_shard(self, shard):
+        section = self._sections[self._section]
+        section['shards'].append(shard['name'])
+        section['counts'].append(len(shard['documents']))
+        if self.rows is not None:
+            self._layout.append(shard)
+
+    def write_shard(self, name, documents, rows):
+        content = 'herostratusShard({}, {}, {});\n'.format(json.dumps(self._section), json.dumps(name), json.dumps(rows))
+        write_if_changed(os.path.join(self.directory, name), content)
+        self.written.append(name)
+        self.add_shard({'name': name, 'documents': documents, 'rows': rows})
+
+    def flush(self):
+        if not self._rows:
+            return
+        documents = [document for document, row in self._rows]
+        rows = [row for document, row in self._rows]
+        self._rows = []
+        previous = self._previous[self._index] if self._previous else None
+        if previous is not None and len(previous['documents']) == len(documents):
+            if all(left is right for left, right in zip(previous['documents'], documents)):
+                self.add_shard(previous)
+                return
+        size = self.shard_size if len(documents) > 2 * self.shard_size else len(documents)
+        for start in range(0, len(documents), size):
+            name = previous['name'] if previous is not None and start == 0 else self.next_name()
+            self.write_shard(name, documents[start:start + size], rows[start:start + size])
+
+    def end_section(self):
+        if self._section is None:
+            return
+        self.flush()
+        if self.rows is not None:
+            self._layouts[self._section] = self._layout
+        self._layout = []
+        self._previous = []
+        self._known = {}
+
+    def section(self, name):
+        self.end_section()
+        self._section = name
+        self._sections[name] = {'count': 0, 'shards': [], 'counts': []}
+        self._previous = self._layouts.get(name, [])
+        self._known = {
+            id(document): index for index, shard in enumerate(self._previous) for document in shard['documents']
+        }
+        self._index = 0
+        if not self._previous:
+            self._names[name] = 0
+
+    def render(self, record):
+        return [
+            record.date_str(column) if column.startswith('date_') else html_value(getattr(record, column))
+            for column in HTML_COLUMNS
+        ]
+
+    def write(self, document):
+        record = as_record(document)
+        index = self._known.get(id(record.document))
+        if index is not None and index > self._index:
+            self.flush()
+            self._index = index
+        self._rows.append((record.document, self.row(record, self.render)))
+        self._sections[self._section]['count'] += 1
+        if not self._previous and len(self._rows) >= self.shard_size:
+            self.flush()
+
+    def close(self):
+        self.end_section()
+        self._section = None
+        self._layouts = {name: layout for name, layout in self._layouts.items() if name in self._sections}
+        manifest = {
+            'path': self._path,
+            'shard_size': self.shard_size,
+            'columns': HTML_COLUMNS,
+            'sections': self._sections
+        }
+        write_if_changed(os.path.join(self.directory, 'index.html'), HTML_INDEX_TEMPLATE.format(
+            title=html.escape(self._path),
+            manifest=json.dumps(manifest).replace('</', '<\\/')
+        ))
+        shards = set(shard for section in self._sections.values() for shard in section['shards'])
+        for name in os.listdir(os.path.join(self.directory, 'shards')):
+            if 'shards/' + name not in shards:
+                os.remove(os.path.join(self.directory, 'shards', name))
+        self.end_rows()
+        self._open = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._open:
+            self.close()
+
+
+class XlsxTimelineWriter(TimelineSink):
+    def __init__(self, filename, max_rows=XLSX_MAX_ROWS):
+        self.filename = filename
+        self.max_rows = max_rows
+        self._workbook = None
+        self._formats = {}
+        self._path = None
+        self._section = None
+        self._sheet = None
+        self._sheets = 0
+        self._row = 0
+        self._count = 0
+        self._duplicates = DuplicateGroups()
+
+    def open(self, path):
+        self._path = path
+        self._workbook = xlsxwriter.Workbook(
+            self.filename, {'constant_memory': True, 'remove_timezone': True}
+        )
+        self._duplicates = DuplicateGroups()
+        self._formats['header'] = self._workbook.add_format({'bold': True})
+        self._formats['date'] = self._workbook.add_format({'num_format': XLSX_DATE_FORMAT})
+        for section, color in XLS_PATH_COLORS.items():
+            self._formats[section] = self._workbook.add_format({'bold': True, 'font_color': color})
+
+    def add_sheet(self):
+        self._sheets += 1
+        name = self._section if self._sheets == 1 else '{}-{}'.format(self._section, self._sheets)
+        self._sheet = self._workbook.add_worksheet(name)
+        self._sheet.write_string(0, 0, self._path, self._formats[self._section])
+        for column, header in enumerate(XLS_COLUMNS[self._section]):
+            self._sheet.write_string(1, column, header, self._formats['header'])
+        self._row = 2
+
+    def section(self, name):
+        self._section = name
+        self._sheets = 0
+        self._count = 0
+        self.add_sheet()
+
+    def write_date(self, column, value):
+        if value is None:
+            self._sheet.write_blank(self._row, column, None)
+        else:
+            self._sheet.write_datetime(self._row, column, value, self._formats['date'])
+
+    def write_value(self, column, value):
+        if value is None:
+            self._sheet.write_blank(self._row, column, None)
+        elif isinstance(value, (int, float)):
+            self._sheet.write_number(self._row, column, value)
+        else:
+            self._sheet.write_string(self._row, column, str(value))
+
+    def write(self, document):
+        if self._row >= self.max_rows:
+            self.add_sheet()
+        self._count += 1
+        self._sheet.write_number(self._row, 0, self._count)
+        self._sheet.write_string(self._row, 1, document.name)
+        self._sheet.write_string(self._row, 2, 'file:/{}'.format(document.path))
+        self.write_date(3, document.date_create)
+        if self._section == 'processed':
+            self.write_value(4, document.author)
+            self.write_date(5, document.date_modified)
+            self.write_value(6, document.author_last)
+            self.write_value(7, document.pages)
+            self.write_value(8, document.size)
+        else:
+            self.write_value(4, document.size)
+        self._row += 1
+        self._duplicates.add(document)
+
+    def write_duplicates(self):
+        sheet = self._workbook.add_worksheet('duplicates')
+        sheet.write_string(0, 0, self._path, self._formats['header'])
+        for column, header in enumerate(XLS_DUPLICATE_COLUMNS):
+            sheet.write_string(1, column, header, self._formats['header'])
+        row = 2
+        for group, (content_hash, size, paths) in enumerate(self._duplicates, 1):
+            for path in paths:
+                sheet.write_number(row, 0, group)
+                sheet.write_string(row, 1, content_hash)
+                sheet.write_number(row, 2, size)
+                sheet.write_string(row, 3, 'file:/{}'.format(path))
+                row += 1
+
+    def close(self):
+        if self._duplicates:
+            self.write_duplicates()
+        self._workbook.close()
+        self._workbook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._workbook is not None:
+            self.close()
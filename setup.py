@@ -1,2 +1,6 @@
 from setuptools import setup
-setup(name='herostratus', packages=['Herostratus'])
\ No newline at end of file
+setup(
+    name='herostratus',
+    packages=['herostratus'],
+    entry_points={'console_scripts': ['herostratus=herostratus.cli:main']}
+)
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import tarfile
+import zipfile
+import io
+import os
+import warnings
+
+from herostratus import herostratus
+from herostratus.archives import ArchiveReader, ArchiveError
+
+warnings.filterwarnings("ignore")
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+MEMBERS = ['file_example_DOCX_1.docx', 'file_example_PDF_1.pdf', 'file_example_XLS_1.xls']
+
+
+class Test_archives(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.target = os.path.join(self.test_dir.name, 'data')
+        os.mkdir(self.target)
+        self.zip_path = os.path.join(self.target, 'project.zip')
+        with zipfile.ZipFile(self.zip_path, 'w') as archive:
+            for name in MEMBERS:
+                archive.write(os.path.join(DATA_DIR, name), 'docs/' + name)
+        nested = io.BytesIO()
+        with zipfile.ZipFile(nested, 'w') as archive:
+            archive.write(os.path.join(DATA_DIR, MEMBERS[0]), MEMBERS[0])
+        self.tar_path = os.path.join(self.target, 'bundle.tar.gz')
+        with tarfile.open(self.tar_path, 'w:gz') as archive:
+            archive.add(os.path.join(DATA_DIR, MEMBERS[1]), MEMBERS[1])
+            info = tarfile.TarInfo('inner.zip')
+            info.size = len(nested.getvalue())
+            archive.addfile(info, io.BytesIO(nested.getvalue()))
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def collect(self, archives, jobs=1):
+        app = herostratus.Crawler()
+        app.archives = archives
+        timeline = app.collect_timeline(self.target, jobs=jobs)
+        documents = {document.path: document for document in timeline.processed}
+        documents.update({document.path: document for document in timeline.unprocessed})
+        return documents
+
+    def test_reader_streams_members_with_archive_paths(self):
+        paths = [member.path for member in ArchiveReader().members(self.zip_path)]
+        self.assertEqual(paths, [self.zip_path + '!/docs/' + name for name in MEMBERS])
+
+    def test_reader_enforces_member_and_byte_limits(self):
+        with self.assertRaises(ArchiveError):
+            list(ArchiveReader(max_members=2).members(self.zip_path))
+        with self.assertRaises(ArchiveError):
+            list(ArchiveReader(max_bytes=1024).members(self.zip_path))
+
+    def test_reader_reports_broken_archives(self):
+        broken = os.path.join(self.target, 'broken.zip')
+        with open(broken, 'wb') as f:
+            f.write(b'PK not really a zip')
+        with self.assertRaises(ArchiveError):
+            list(ArchiveReader().members(broken))
+
+    def test_crawler_processes_archive_members(self):
+        documents = self.collect(ArchiveReader())
+        app = herostratus.Crawler()
+        for name in MEMBERS:
+            member = documents[self.zip_path + '!/docs/' + name]
+            expected = app.create_document_info_from_file(os.path.join(DATA_DIR, name))
+            self.assertEqual(member.processed, expected.processed)
+            self.assertEqual(member.author, expected.author)
+            self.assertEqual(member.pages, expected.pages)
+            self.assertEqual(member.size, expected.size)
+        self.assertIn(self.zip_path, documents)
+        self.assertIn(self.tar_path + '!/' + MEMBERS[1], documents)
+        self.assertTrue(documents[self.tar_path + '!/inner.zip!/' + MEMBERS[0]].processed)
+        self.assertEqual(sorted(os.listdir(self.target)), ['bundle.tar.gz', 'project.zip'])
+
+    def test_crawler_respects_archive_depth(self):
+        documents = self.collect(ArchiveReader(max_depth=1))
+        self.assertIn(self.tar_path + '!/inner.zip', documents)
+        self.assertNotIn(self.tar_path + '!/inner.zip!/' + MEMBERS[0], documents)
+
+    def test_crawler_reports_archive_limits(self):
+        documents = self.collect(ArchiveReader(max_members=1))
+        self.assertIn('archive limit exceeded', documents[self.zip_path].reason)
+        self.assertIn(self.zip_path + '!/docs/' + MEMBERS[0], documents)
+
+    def test_crawler_processes_archives_in_parallel(self):
+        self.assertEqual(
+            sorted(self.collect(ArchiveReader(), jobs=2)),
+            sorted(self.collect(ArchiveReader()))
+        )
+
+    def test_crawler_ignores_archives_by_default(self):
+        self.assertEqual(sorted(self.collect(None)), [self.tar_path, self.zip_path])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import os
+import warnings
+
+from herostratus import herostratus
+from herostratus import pdfmeta
+from benchmarks import corpus
+from benchmarks import run
+
+warnings.filterwarnings("ignore")
+
+
+class Test_corpus_generator(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def list_files(self, root):
+        return sorted(
+            os.path.relpath(os.path.join(directory, name), root)
+            for directory, _, names in os.walk(root) for name in names
+        )
+
+    def test_corpus_is_reproducible(self):
+        first = os.path.join(self.test_dir.name, 'first')
+        second = os.path.join(self.test_dir.name, 'second')
+        counts = corpus.generate_corpus(first, 40, seed=3)
+        corpus.generate_corpus(second, 40, seed=3)
+        self.assertEqual(sum(counts.values()), 40)
+        self.assertEqual(self.list_files(first), self.list_files(second))
+        for name in self.list_files(first):
+            with open(os.path.join(first, name), 'rb') as f, open(os.path.join(second, name), 'rb') as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_corpus_files_are_processed(self):
+        root = os.path.join(self.test_dir.name, 'corpus')
+        corpus.generate_corpus(root, 20, mix={'docx': 1, 'pptx': 1, 'xlsx': 1, 'pdf': 1, 'doc': 1}, seed=1)
+        timeline = herostratus.Crawler().collect_timeline(root)
+        self.assertEqual(len(timeline.processed), 20)
+        self.assertTrue(all(
+            document.author in corpus.AUTHORS for document in timeline.processed if not document.name.endswith('.doc')
+        ))
+
+    def test_pdf_document_metadata(self):
+        created = corpus.dt.datetime(2010, 5, 6, 7, 8, 9)
+        metadata = pdfmeta.parse_metadata(corpus.pdf_document('Alice Smith', created, created, 12))
+        self.assertEqual(metadata.author, 'Alice Smith')
+        self.assertEqual(metadata.created, created)
+        self.assertEqual(metadata.pages, 12)
+
+    def test_mix_parsing(self):
+        self.assertEqual(corpus.parse_mix('docx=3, pdf'), {'docx': 3, 'pdf': 1})
+        self.assertRaises(ValueError, corpus.parse_mix, 'odt=1')
+
+
+class Test_benchmark_runner(unittest.TestCase):
+
+    def test_run_reports_throughput(self):
+        results = run.run(files=30, seed=2, formats=['xml', 'csv'])
+        self.assertEqual(results['metrics']['discovery']['files'], 30)
+        self.assertEqual(results['metrics']['processing']['files'], 30)
+        self.assertIn('writer.xml', results['metrics'])
+        self.assertTrue(any(name.startswith('processor.') for name in results['metrics']))
+        self.assertGreater(results['peak_rss'], 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'metrics': {'discovery': {'files_per_second': 100.0}, 'writer.xml': {'files_per_second': 50.0}},
+                    'peak_rss': 1000}
+        current = {'metrics': {'discovery': {'files_per_second': 80.0}, 'writer.xml': {'files_per_second': 49.0}},
+                   'peak_rss': 1050}
+        rows = {row[0]: row[4] for row in run.compare(baseline, current, threshold=0.1)}
+        self.assertEqual(rows, {'discovery': True, 'writer.xml': False, 'peak_rss': False})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+
+import unittest
+import pickle
+import datetime as dt
+
+from herostratus import herostratus
+from herostratus.columns import ColumnStore
+
+
+def make_document(path, created, author='Jane', pages=3, processed=True):
+    document = herostratus.DocumentInfo(path, size=len(path))
+    document.author = author
+    document.author_last = 'John'
+    document.date_create = created
+    document.date_modified = created + dt.timedelta(days=1)
+    document.pages = pages
+    document.mime = 'application/pdf'
+    document.processed = processed
+    return document
+
+
+class Test_document_info(unittest.TestCase):
+
+    def test_document_info_stores_epoch_timestamps(self):
+        document = make_document('/data/a.pdf', dt.datetime(2020, 1, 2, 3, 4, 5, 6))
+        self.assertEqual(document.date_create_epoch, 1577934245000006)
+        self.assertEqual(document.date_create, dt.datetime(2020, 1, 2, 3, 4, 5, 6))
+        self.assertFalse(hasattr(document, '__dict__'))
+
+    def test_document_info_converts_aware_dates_to_utc(self):
+        offset = dt.timezone(dt.timedelta(hours=2))
+        document = make_document('/data/a.pdf', dt.datetime(2020, 1, 2, 3, 4, 5, tzinfo=offset))
+        self.assertEqual(document.date_create, dt.datetime(2020, 1, 2, 1, 4, 5))
+
+    def test_document_info_shares_directory_and_author_strings(self):
+        first = make_document('/data/' + 'a.pdf', dt.datetime(2020, 1, 1), author=''.join(['Ja', 'ne']))
+        second = make_document('/data/' + 'b.pdf', dt.datetime(2020, 1, 1), author=''.join(['Ja', 'ne']))
+        self.assertIs(first.directory, second.directory)
+        self.assertIs(first.author, second.author)
+        self.assertEqual(second.path, '/data/b.pdf')
+        self.assertEqual(second.name, 'b.pdf')
+
+    def test_document_info_can_be_pickled(self):
+        document = make_document('/data/a.pdf', dt.datetime(2020, 1, 1))
+        self.assertEqual(pickle.loads(pickle.dumps(document)).to_dict(), document.to_dict())
+
+
+class Test_column_store(unittest.TestCase):
+
+    def setUp(self):
+        self.documents = [
+            make_document('/data/c.pdf', dt.datetime(2022, 1, 1), author='Carol'),
+            make_document('/data/a.pdf', dt.datetime(2020, 1, 1), author=None, pages='12'),
+            make_document('/other/b.pdf', dt.datetime(2021, 1, 1), author='Bob', pages=None)
+        ]
+        self.store = ColumnStore(herostratus.DocumentInfo)
+        for document in self.documents:
+            self.store.append(document)
+
+    def test_store_round_trips_documents(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(
+            [document.to_dict() for document in self.store],
+            [document.to_dict() for document in self.documents]
+        )
+
+    def test_store_sorts_on_columns(self):
+        self.store.sort('date_create_epoch')
+        self.assertEqual([document.name for document in self.store], ['a.pdf', 'b.pdf', 'c.pdf'])
+        self.assertEqual(self.store[0].pages, '12')
+        self.store.sort('author')
+        self.assertEqual([document.name for document in self.store], ['a.pdf', 'b.pdf', 'c.pdf'])
+        self.store.sort(lambda document: document.size)
+        self.assertEqual([document.name for document in self.store], ['a.pdf', 'c.pdf', 'b.pdf'])
+
+    def test_store_filters_on_columns(self):
+        store = self.store.filter('directory', lambda directory: directory == '/data/')
+        self.assertEqual([document.name for document in store], ['c.pdf', 'a.pdf'])
+
+    def test_timeline_sorts_and_filters_columnar_store(self):
+        timeline = herostratus.Timeline(columnar=True)
+        for document in self.documents:
+            timeline.add(document)
+        timeline.sort()
+        self.assertEqual([document.name for document in timeline.processed], ['a.pdf', 'b.pdf', 'c.pdf'])
+        limit = herostratus.datetime_to_epoch(dt.datetime(2021, 6, 1))
+        timeline = timeline.filter('date_create_epoch', lambda value: value < limit)
+        self.assertEqual([document.name for document in timeline.processed], ['a.pdf', 'b.pdf'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import os
+
+from herostratus.discovery import Discovery, SHARD_MODES, parse_shard
+
+
+class Test_discovery(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        for relative in [
+            'a.docx', 'b.pdf', 'c.mp4', '.hidden.doc',
+            'sub/d.xlsx', 'sub/deeper/e.ppt', '.git/objects/f.pdf'
+        ]:
+            filename = os.path.join(self.test_dir.name, relative)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, 'wb') as f:
+                f.write(relative.encode())
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def scan(self, discovery):
+        return sorted(
+            os.path.relpath(entry.path, self.test_dir.name)
+            for entry in discovery.scan(self.test_dir.name)
+        )
+
+    def test_discovery_finds_every_file_by_default(self):
+        self.assertEqual(len(self.scan(Discovery())), 7)
+
+    def test_discovery_reuses_entry_stat(self):
+        for entry in Discovery().scan(self.test_dir.name):
+            self.assertEqual(entry.stat.st_size, os.path.getsize(entry.path))
+
+    def test_discovery_can_skip_hidden_files_and_limit_depth(self):
+        discovery = Discovery()
+        discovery.hidden = False
+        discovery.max_depth = 1
+        self.assertEqual(self.scan(discovery), ['a.docx', 'b.pdf', 'c.mp4', 'sub/d.xlsx'])
+
+    def test_discovery_applies_include_and_exclude_globs(self):
+        discovery = Discovery()
+        discovery.include = ['*.pdf', '*.docx']
+        discovery.exclude = ['.git']
+        self.assertEqual(self.scan(discovery), ['a.docx', 'b.pdf'])
+
+    def test_discovery_prefilters_extensions(self):
+        discovery = Discovery()
+        discovery.extensions = {'.doc', '.ppt'}
+        self.assertEqual(self.scan(discovery), ['.hidden.doc', 'sub/deeper/e.ppt'])
+
+    def test_discovery_can_skip_hardlinked_copies(self):
+        os.link(
+            os.path.join(self.test_dir.name, 'a.docx'),
+            os.path.join(self.test_dir.name, 'sub', 'a.docx')
+        )
+        discovery = Discovery()
+        self.assertEqual(len(self.scan(discovery)), 8)
+        discovery.hardlinks = False
+        self.assertEqual(len(self.scan(discovery)), 7)
+
+    def test_discovery_shards_partition_files(self):
+        for shard_by in SHARD_MODES:
+            shards = []
+            for index in range(3):
+                discovery = Discovery()
+                discovery.shard = (index, 3)
+                discovery.shard_by = shard_by
+                shards.append(self.scan(discovery))
+            self.assertEqual(sorted(sum(shards, [])), self.scan(Discovery()))
+            if shard_by == 'subtree':
+                self.assertEqual(len([shard for shard in shards if 'sub/d.xlsx' in shard]), 1)
+                self.assertTrue(any('sub/d.xlsx' in shard and 'sub/deeper/e.ppt' in shard for shard in shards))
+
+    def test_parse_shard_rejects_invalid_shards(self):
+        self.assertEqual(parse_shard('1/4'), (1, 4))
+        for text in ('4/4', '-1/2', '1/0', '1'):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import shutil
+import hashlib
+import os
+import warnings
+import xml.etree.ElementTree as xee
+import xlrd
+
+from herostratus import herostratus, cli
+from herostratus.discovery import Discovery
+from herostratus.duplicates import DuplicateFinder
+
+warnings.filterwarnings("ignore")
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+class Test_duplicate_finder(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def write(self, name, content):
+        filename = os.path.join(self.test_dir.name, name)
+        with open(filename, 'wb') as f:
+            f.write(content)
+        return filename
+
+    def find(self, finder):
+        return finder.find(list(Discovery().scan(self.test_dir.name)))
+
+    def test_finder_groups_identical_files(self):
+        first = self.write('a.bin', b'x' * 1000)
+        second = self.write('b.bin', b'x' * 1000)
+        self.write('c.bin', b'y' * 1000)
+        self.write('d.bin', b'x' * 999)
+        groups = self.find(DuplicateFinder())
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0].paths, [first, second])
+        self.assertEqual(groups[0].size, 1000)
+
+    def test_finder_hashes_only_same_size_files(self):
+        self.write('a.bin', b'x' * 10)
+        self.write('b.bin', b'x' * 20)
+        finder = DuplicateFinder()
+        self.assertEqual(self.find(finder), [])
+        self.assertEqual(finder.partial_hashes, 0)
+        self.assertEqual(finder.bytes_read, 0)
+
+    def test_finder_uses_full_hash_when_partial_hashes_collide(self):
+        head, tail = b'h' * 16, b't' * 16
+        first = self.write('a.bin', head + b'1' * 64 + tail)
+        second = self.write('b.bin', head + b'1' * 64 + tail)
+        self.write('c.bin', head + b'2' * 64 + tail)
+        finder = DuplicateFinder(block_size=16)
+        groups = self.find(finder)
+        self.assertEqual(finder.partial_hashes, 3)
+        self.assertEqual(finder.full_hashes, 3)
+        self.assertEqual([group.paths for group in groups], [[first, second]])
+
+    def test_content_hash_is_a_full_content_digest(self):
+        small = b's' * 40
+        large = b'h' * 16 + b'l' * 64 + b't' * 16
+        for name, content in (('a.bin', small), ('b.bin', small), ('c.bin', large), ('d.bin', large)):
+            self.write(name, content)
+        groups = self.find(DuplicateFinder(block_size=16))
+        self.assertEqual(
+            [group.content_hash for group in groups],
+            [hashlib.blake2b(content, digest_size=16).hexdigest() for content in (small, large)]
+        )
+
+
+class Test_crawler_duplicates(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.target = os.path.join(self.test_dir.name, 'data')
+        for directory in ('a', 'b', 'c'):
+            os.makedirs(os.path.join(self.target, directory))
+            for name in ('file_example_DOCX_1.docx', 'file_example_PDF_1.pdf'):
+                shutil.copy(os.path.join(DATA_DIR, name), os.path.join(self.target, directory, name))
+        shutil.copy(
+            os.path.join(DATA_DIR, 'file_example_XLSX_50.xlsx'),
+            os.path.join(self.target, 'a', 'file_example_XLSX_50.xlsx')
+        )
+        self.processed = []
+        self.create_document_info_from_file = herostratus.Crawler.create_document_info_from_file
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def collect(self, run_size=None):
+        app = herostratus.Crawler()
+        app.duplicates = True
+        app.run_size = run_size
+        processed = self.processed
+        create = self.create_document_info_from_file
+
+        def create_document_info_from_file(filename, stat=None, source=None):
+            processed.append(filename)
+            return create(app, filename, stat, source)
+        app.create_document_info_from_file = create_document_info_from_file
+        return app, app.collect_timeline(self.target)
+
+    def test_crawler_processes_each_content_once(self):
+        app, timeline = self.collect()
+        self.assertEqual(timeline.total(), 7)
+        self.assertEqual(len(self.processed), 3)
+        documents = {document.path: document for document in timeline.processed}
+        documents.update({document.path: document for document in timeline.unprocessed})
+        original = documents[os.path.join(self.target, 'a', 'file_example_DOCX_1.docx')]
+        copy = documents[os.path.join(self.target, 'c', 'file_example_DOCX_1.docx')]
+        self.assertIsNotNone(original.content_hash)
+        self.assertEqual(copy.content_hash, original.content_hash)
+        self.assertEqual(copy.author, original.author)
+        self.assertEqual(copy.pages, original.pages)
+        self.assertIsNone(documents[os.path.join(self.target, 'a', 'file_example_XLSX_50.xlsx')].content_hash)
+
+    def test_spilled_duplicate_pass_keeps_discovery_order(self):
+        app, timeline = self.collect()
+        app_spilled, timeline_spilled = self.collect(run_size=2)
+        self.assertEqual(self.processed[3:], self.processed[:3])
+        self.assertEqual(self.processed[:3], sorted(self.processed[:3]))
+        self.assertEqual(
+            sorted(document.path for document in timeline_spilled.processed),
+            sorted(document.path for document in timeline.processed)
+        )
+
+    def test_duplicate_groups_are_written_to_outputs(self):
+        app, timeline = self.collect()
+        filename = os.path.join(self.test_dir.name, 'timeline')
+        cli.write_outputs(app, self.target, timeline, [
+            ('xml', filename + '.xml'), ('html', filename + '.html'), ('xls', filename + '.xls')
+        ])
+        groups = xee.parse(filename + '.xml').getroot().findall('duplicates/group')
+        self.assertEqual(len(groups), 2)
+        for group in groups:
+            self.assertEqual(len(group.findall('path')), 3)
+        with open(filename + '.html') as f:
+            self.assertIn('class="duplicates"', f.read())
+        sheet = xlrd.open_workbook(filename + '.xls').sheet_by_name('duplicates')
+        self.assertEqual(sheet.nrows, 2 + 6)
+        self.assertEqual(sheet.cell_value(1, 1), 'hash')
+
+
+if __name__ == '__main__':
+    unittest.main()
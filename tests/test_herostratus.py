@@ -3,6 +3,7 @@
 import unittest 
 import tempfile
 import os
+import collections
 import warnings
 from distutils.dir_util import copy_tree
 import xlrd
@@ -50,6 +51,177 @@ class Test_files_discovery(unittest.TestCase):
         timeline = app.collect_timeline(self.test_dir.name)
         self.assertEqual(timeline.total(), self.file_count)
 
+    def test_crawler_can_collect_file_information_in_parallel(self):
+        app = herostratus.Crawler()
+        timeline_serial = app.collect_timeline(self.test_dir.name)
+        timeline_parallel = app.collect_timeline(self.test_dir.name, jobs=2)
+        self.assertEqual(timeline_parallel.total(), self.file_count)
+        self.assertEqual(
+            [doc.path for doc in timeline_parallel.processed],
+            [doc.path for doc in timeline_serial.processed]
+        )
+        self.assertEqual(
+            [doc.path for doc in timeline_parallel.unprocessed],
+            [doc.path for doc in timeline_serial.unprocessed]
+        )
+
+    def test_crawler_can_collect_file_information_in_batches(self):
+        timeline = herostratus.Crawler().collect_timeline(self.test_dir.name)
+        app = herostratus.Crawler()
+        app.batch_size = 4
+        for jobs in (1, 2):
+            timeline_batched = app.collect_timeline(self.test_dir.name, jobs=jobs)
+            for section in ('processed', 'unprocessed'):
+                self.assertEqual(
+                    [doc.to_dict() for doc in getattr(timeline_batched, section)],
+                    [doc.to_dict() for doc in getattr(timeline, section)]
+                )
+
+    def test_processor_factory_reuses_processor_instances(self):
+        factory = herostratus.DocumentProcessorFactory(None)
+        factory.register_mime('application/pdf', herostratus.PdfProcessor)
+        processor = factory.get_processor('application/pdf')
+        self.assertIs(factory.get_processor('application/pdf'), processor)
+        self.assertIs(factory.get_processor('text/plain'), factory.get_processor('text/html'))
+
+    def test_crawler_calls_process_many_with_batches_grouped_by_mime(self):
+        batches = []
+
+        class BatchPdfProcessor(herostratus.PdfProcessor):
+            def process_many(self, paths, file_types):
+                batches.append(list(paths))
+                return [self.process(path, file_type) for path, file_type in zip(paths, file_types)]
+
+        factory = herostratus.processor_factory
+        factory.register_mime('application/pdf', BatchPdfProcessor)
+        try:
+            app = herostratus.Crawler()
+            app.batch_size = 100
+            timeline = app.collect_timeline(self.test_dir.name)
+        finally:
+            factory.register_mime('application/pdf', herostratus.PdfProcessor)
+        pdfs = [doc.path for doc in timeline.processed if doc.mime == 'application/pdf']
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(sorted(batches[0]), sorted(pdfs))
+
+    def test_built_in_processors_set_up_once_for_all_batches(self):
+        setups = collections.Counter()
+        files = collections.Counter()
+        readers = collections.defaultdict(set)
+
+        def counting(processor):
+            class CountingProcessor(processor):
+                def __init__(self):
+                    super().__init__()
+                    setups[processor.__name__] += 1
+
+                def process(self, filename, file_type=None):
+                    files[processor.__name__] += 1
+                    readers[processor.__name__].add(id(self.reader))
+                    return super().process(filename, file_type)
+            return CountingProcessor
+
+        mimes = {
+            herostratus.Ole2Processor: [
+                'application/msword', 'application/vnd.ms-excel', 'application/vnd.ms-powerpoint'
+            ],
+            herostratus.OoxmlProcessor: [herostratus.MIME_DOCX, herostratus.MIME_XLSX, herostratus.MIME_PPTX],
+            herostratus.PdfProcessor: ['application/pdf']
+        }
+        timeline = herostratus.Crawler().collect_timeline(self.test_dir.name)
+        factory = herostratus.processor_factory
+        for processor, processor_mimes in mimes.items():
+            counting_processor = counting(processor)
+            for mime in processor_mimes:
+                factory.register_mime(mime, counting_processor)
+        try:
+            app = herostratus.Crawler()
+            app.batch_size = 8
+            timeline_batched = app.collect_timeline(self.test_dir.name)
+        finally:
+            for processor, processor_mimes in mimes.items():
+                for mime in processor_mimes:
+                    factory.register_mime(mime, processor)
+        for processor in ('Ole2Processor', 'OoxmlProcessor', 'PdfProcessor'):
+            self.assertEqual(setups[processor], 1)
+            self.assertEqual(len(readers[processor]), 1)
+        self.assertGreater(files['Ole2Processor'], app.batch_size)
+        self.assertGreater(files['OoxmlProcessor'], app.batch_size)
+        for section in ('processed', 'unprocessed'):
+            self.assertEqual(
+                [doc.to_dict() for doc in getattr(timeline_batched, section)],
+                [doc.to_dict() for doc in getattr(timeline, section)]
+            )
+
+    def test_crawler_can_collect_file_information_in_bounded_runs(self):
+        app = herostratus.Crawler()
+        timeline = app.collect_timeline(self.test_dir.name)
+        app.run_size = 4
+        timeline_bounded = app.collect_timeline(self.test_dir.name)
+        self.assertEqual(timeline_bounded.total(), self.file_count)
+        self.assertEqual(
+            [doc.path for doc in timeline_bounded.processed],
+            [doc.path for doc in timeline.processed]
+        )
+
+    def test_crawler_can_collect_columnar_timeline(self):
+        app = herostratus.Crawler()
+        timeline = app.collect_timeline(self.test_dir.name)
+        app.columnar = True
+        timeline_columnar = app.collect_timeline(self.test_dir.name)
+        self.assertEqual(timeline_columnar.total(), self.file_count)
+        self.assertEqual(
+            [doc.to_dict() for doc in timeline_columnar.processed],
+            [doc.to_dict() for doc in timeline.processed]
+        )
+
+    def test_crawler_streams_document_information(self):
+        app = herostratus.Crawler()
+        documents = app.iter_document_infos(self.test_dir.name)
+        self.assertIsNotNone(next(documents).path)
+
+    def test_crawler_can_reuse_cached_file_information(self):
+        app = herostratus.Crawler()
+        cache_filename = os.path.join(self.test_dir.name, 'scan.cache')
+        cache_dir = os.path.join(self.test_dir.name, 'data')
+        os.mkdir(cache_dir)
+        for file in os.listdir(self.test_dir.name):
+            if file.endswith('.docx'):
+                os.rename(os.path.join(self.test_dir.name, file), os.path.join(cache_dir, file))
+        file_count = len(os.listdir(cache_dir))
+        with herostratus.ScanCache(cache_filename) as cache:
+            timeline = app.collect_timeline(cache_dir, cache=cache)
+            self.assertEqual(cache.misses, file_count)
+        with herostratus.ScanCache(cache_filename) as cache:
+            timeline_cached = app.collect_timeline(cache_dir, cache=cache)
+            self.assertEqual(cache.hits, file_count)
+            self.assertEqual(cache.misses, 0)
+        self.assertEqual(
+            [str(doc) for doc in timeline_cached.processed],
+            [str(doc) for doc in timeline.processed]
+        )
+        os.remove(os.path.join(cache_dir, os.listdir(cache_dir)[0]))
+        with herostratus.ScanCache(cache_filename) as cache:
+            timeline_cached = app.collect_timeline(cache_dir, cache=cache)
+            self.assertEqual(cache.hits, file_count - 1)
+            self.assertEqual(timeline_cached.total(), file_count - 1)
+
+    def test_filtered_scans_keep_cache_entries_of_skipped_files(self):
+        cache_filename = os.path.join(self.test_dir.name, 'scan.cache')
+        app = herostratus.Crawler()
+        app.discovery.exclude = ['*.cache*']
+        with herostratus.ScanCache(cache_filename) as cache:
+            app.collect_timeline(self.test_dir.name, cache=cache)
+        filtered = herostratus.Crawler()
+        filtered.discovery.exclude = ['*.cache*', '*.docx']
+        filtered.discovery.max_depth = 0
+        with herostratus.ScanCache(cache_filename) as cache:
+            filtered.collect_timeline(self.test_dir.name, cache=cache)
+        with herostratus.ScanCache(cache_filename) as cache:
+            app.collect_timeline(self.test_dir.name, cache=cache)
+            self.assertEqual(cache.misses, 0)
+            self.assertEqual(cache.hits, self.file_count)
+
     # DOC
     def test_crawler_can_get_information_from_DOC_file(self):
         app = herostratus.Crawler()
@@ -62,6 +234,18 @@ class Test_files_discovery(unittest.TestCase):
             file_docu_info = app.create_document_info_from_file(file_path)
             self.assert_document_has_data(file_docu_info)
 
+    def test_magic_detector_reads_mime_and_description_once(self):
+        file_path = os.path.join(self.test_dir.name, 'file_example_DOC_1.doc')
+        file_type = herostratus.get_magic_detector().detect(file_path)
+        self.assertEqual(file_type.mime, 'application/msword')
+        self.assertIn('Create Time/Date:', file_type.description)
+        self.assertIs(herostratus.get_magic_detector(), herostratus.get_magic_detector())
+        processor = herostratus.processor_factory.get_processor(file_type.mime)
+        self.assertEqual(
+            str(processor.process(file_path, file_type)),
+            str(processor.process(file_path))
+        )
+
     # DOCX
     def test_crawler_can_get_information_from_DOCX_file(self):
         app = herostratus.Crawler()
@@ -0,0 +1,151 @@
+#!/usr/bin/python3
+
+import unittest
+import random
+import datetime as dt
+
+from herostratus import herostratus
+from herostratus.index import SortedIndex
+
+AUTHORS = ['Alice', 'Bob', 'Carol', None]
+MIMES = ['application/pdf', 'application/msword']
+
+
+def make_documents(count, seed=1):
+    generator = random.Random(seed)
+    documents = []
+    for index in range(count):
+        document = herostratus.DocumentInfo('/data/{}.pdf'.format(index), size=index)
+        document.author = generator.choice(AUTHORS)
+        document.mime = generator.choice(MIMES)
+        document.date_create = dt.datetime(2020, 1, 1) + dt.timedelta(hours=generator.randint(0, 5000))
+        document.date_modified = document.date_create + dt.timedelta(hours=generator.randint(0, 5000))
+        document.processed = True
+        documents.append(document)
+    return documents
+
+
+class Test_sorted_index(unittest.TestCase):
+
+    def test_index_ranges_are_inclusive(self):
+        index = SortedIndex.build([5, None, 1, 3, 3])
+        self.assertEqual(index.range(3, 5), [3, 4, 0])
+        self.assertEqual(index.range(None, 2), [2])
+        self.assertEqual(index.range(6, None), [])
+
+
+class Test_timeline_index(unittest.TestCase):
+
+    def setUp(self):
+        self.documents = make_documents(500)
+        self.timeline = herostratus.Timeline()
+        for document in self.documents:
+            self.timeline.add(document)
+        self.timeline.sort()
+
+    def expected(self, low, high, author=None, mime=None):
+        return sorted(
+            [
+                document.path for document in self.documents
+                if low <= document.date_create <= high
+                and (author is None or document.author == author)
+                and (mime is None or document.mime == mime)
+            ]
+        )
+
+    def test_timeline_answers_range_queries(self):
+        low, high = dt.datetime(2020, 2, 1), dt.datetime(2020, 4, 1)
+        documents = list(self.timeline.query(created=(low, high)))
+        self.assertEqual(sorted(document.path for document in documents), self.expected(low, high))
+        self.assertEqual(
+            [document.date_create for document in documents],
+            sorted(document.date_create for document in documents)
+        )
+
+    def test_timeline_answers_author_and_type_queries(self):
+        low, high = dt.datetime(2020, 2, 1), dt.datetime(2020, 6, 1)
+        documents = self.timeline.query(created=(low, high), author='Bob', mime='application/pdf')
+        self.assertEqual(
+            sorted(document.path for document in documents),
+            self.expected(low, high, 'Bob', 'application/pdf')
+        )
+        self.assertEqual(list(self.timeline.query(author='Nobody')), [])
+
+    def test_timeline_answers_modification_date_queries(self):
+        low = dt.datetime(2020, 6, 1)
+        documents = list(self.timeline.query(modified=(low, None), author='Alice'))
+        self.assertEqual(
+            sorted(document.path for document in documents),
+            sorted(
+                document.path for document in self.documents
+                if document.date_modified >= low and document.author == 'Alice'
+            )
+        )
+
+    def test_index_is_rebuilt_after_add(self):
+        document = make_documents(1, seed=7)[0]
+        document.author = 'Dave'
+        self.timeline.add(document)
+        self.assertEqual([doc.author for doc in self.timeline.query(author='Dave')], ['Dave'])
+
+    def test_columnar_timeline_answers_queries(self):
+        timeline = herostratus.Timeline(columnar=True)
+        for document in self.documents:
+            timeline.add(document)
+        timeline.sort()
+        low, high = dt.datetime(2020, 2, 1), dt.datetime(2020, 6, 1)
+        documents = timeline.query(created=(low, high), author='Carol')
+        self.assertEqual(sorted(document.path for document in documents), self.expected(low, high, 'Carol'))
+
+    def test_bounded_timeline_answers_queries_while_streaming(self):
+        timeline = herostratus.Timeline(run_size=32)
+        for document in self.documents:
+            timeline.add(document)
+        timeline.sort()
+        self.assertIsInstance(timeline.processed, herostratus.ExternalSorter)
+        low, high = dt.datetime(2020, 2, 1), dt.datetime(2020, 6, 1)
+        for query in (
+            {'created': (low, high)}, {'modified': (low, None), 'author': 'Alice'},
+            {'author': 'Bob', 'mime': 'application/pdf'}, {'created': (low, high), 'author': 'Carol'}
+        ):
+            self.assertEqual(
+                [document.path for document in timeline.query(**query)],
+                [document.path for document in self.timeline.query(**query)]
+            )
+        self.assertNotIn('processed', timeline._indexes)
+
+    def test_timeline_sorts_by_modification_date(self):
+        self.timeline.sort(key=herostratus.document_info_sort_date_modified)
+        dates = [document.date_modified for document in self.timeline.processed]
+        self.assertEqual(dates, sorted(dates))
+
+
+class Test_timeline_merge(unittest.TestCase):
+
+    def test_timeline_merges_sorted_timelines(self):
+        documents = make_documents(300)
+        parts = [herostratus.Timeline() for _ in range(3)]
+        for index, document in enumerate(documents):
+            parts[index % 3].add(document)
+        for part in parts:
+            part.sort()
+        merged = herostratus.Timeline.merge(parts)
+        self.assertEqual(merged.total(), 300)
+        dates = [document.date_create for document in merged.processed]
+        self.assertEqual(dates, sorted(dates))
+
+    def test_timeline_merges_into_bounded_runs(self):
+        documents = make_documents(100)
+        parts = [herostratus.Timeline(), herostratus.Timeline()]
+        for index, document in enumerate(documents):
+            parts[index % 2].add(document)
+        for part in parts:
+            part.sort()
+        merged = herostratus.Timeline.merge(parts, run_size=16)
+        self.assertEqual(
+            [document.path for document in merged.processed],
+            [document.path for document in herostratus.Timeline.merge(parts).processed]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import os
+import time
+import datetime as dt
+
+from herostratus import herostratus
+from herostratus.isolation import IsolatedPool, Quarantine
+from herostratus.discovery import Discovery, DiscoveredFile
+
+
+def square(value):
+    return value * value
+
+
+def sleep(value):
+    time.sleep(value)
+    return value
+
+
+def fail(value):
+    raise ValueError('bad value {}'.format(value))
+
+
+def crash(value):
+    os._exit(3)
+
+
+def allocate(size):
+    return len(bytearray(size))
+
+
+def failed(args, reason, elapsed=0.0, isolated=True):
+    return reason
+
+
+def vanish(filename, stat=None, measure=False, archives=None):
+    raise FileNotFoundError(2, 'No such file or directory', filename)
+
+
+class SleepingProcessor():
+    def __init__(self):
+        self._data = None
+
+    def process(self, filename, file_type=None):
+        time.sleep(30)
+
+
+class BrokenProcessor():
+    def __init__(self):
+        self._data = None
+
+    def process(self, filename, file_type=None):
+        raise KeyError('broken')
+
+
+class Test_isolated_pool(unittest.TestCase):
+
+    def test_pool_returns_results_in_submission_order(self):
+        with IsolatedPool(square, failed, jobs=2) as pool:
+            futures = [pool.submit(value) for value in range(10)]
+            self.assertEqual([future.result() for future in futures], [value * value for value in range(10)])
+
+    def test_pool_kills_tasks_after_timeout(self):
+        with IsolatedPool(sleep, failed, jobs=1, timeout=0.2) as pool:
+            started = time.monotonic()
+            slow = pool.submit(30)
+            fast = pool.submit(0)
+            self.assertIn('timed out', slow.result())
+            self.assertEqual(fast.result(), 0)
+            self.assertLess(time.monotonic() - started, 10)
+
+    def test_pool_records_errors_and_crashes(self):
+        with IsolatedPool(fail, failed) as pool:
+            self.assertEqual(pool.submit(1).result(), 'ValueError: bad value 1')
+        with IsolatedPool(crash, failed) as pool:
+            self.assertEqual(pool.submit(1).result(), 'worker crashed (exit code 3)')
+
+    def test_pool_caps_memory(self):
+        with IsolatedPool(allocate, failed, memory_limit=64 * 1024 * 1024) as pool:
+            self.assertEqual(pool.submit(1024).result(), 1024)
+            self.assertEqual(pool.submit(1024 * 1024 * 1024).result(), 'memory limit exceeded')
+
+
+class Test_processor_isolation(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.test_dir.name, 'slow.txt'), 'w') as f:
+            f.write('plain text')
+        self.processors = dict(herostratus.processor_factory._processors)
+
+    def tearDown(self):
+        herostratus.processor_factory._processors = self.processors
+        self.test_dir.cleanup()
+
+    def test_crawler_records_processor_errors(self):
+        herostratus.processor_factory.register_mime('text/plain', BrokenProcessor)
+        timeline = herostratus.Crawler().collect_timeline(self.test_dir.name)
+        self.assertEqual(len(timeline.processed), 0)
+        self.assertEqual(timeline.unprocessed[0].reason, "KeyError: 'broken'")
+
+    def test_crawler_quarantines_timed_out_files(self):
+        herostratus.processor_factory.register_mime('text/plain', SleepingProcessor)
+        quarantine = Quarantine(os.path.join(self.test_dir.name, 'scan.quarantine'))
+        app = herostratus.Crawler()
+        app.discovery.exclude = ['*.quarantine']
+        app.timeout = 0.2
+        app.quarantine = quarantine
+        timeline = app.collect_timeline(self.test_dir.name)
+        self.assertEqual(timeline.unprocessed[0].reason, 'timed out after 0.2s')
+        self.assertEqual(quarantine.paths(), [os.path.join(self.test_dir.name, 'slow.txt')])
+        app.timeout = None
+        timeline = app.collect_timeline(self.test_dir.name)
+        self.assertEqual(timeline.unprocessed[0].reason, 'quarantined: timed out after 0.2s')
+        self.assertEqual(quarantine.skipped, 1)
+        quarantine.close()
+
+    def test_crawler_quarantines_only_isolation_failures(self):
+        quarantine = Quarantine(os.path.join(self.test_dir.name, 'scan.quarantine'))
+        app = herostratus.Crawler()
+        app.quarantine = quarantine
+        app.stats = herostratus.Stats()
+        filename = os.path.join(self.test_dir.name, 'slow.txt')
+        stat = os.stat(filename)
+        with IsolatedPool(vanish, app.isolation_failed, timeout=5) as pool:
+            document = pool.submit(filename, stat).result()
+        self.assertEqual(document.reason, 'FileNotFoundError: [Errno 2] No such file or directory: {!r}'.format(filename))
+        self.assertEqual(quarantine.paths(), [])
+        self.assertLess(app.stats.stages['file'].time, 5)
+        quarantine.close()
+
+    def test_crawler_records_files_that_vanish_after_discovery(self):
+        entries = list(Discovery().scan(self.test_dir.name))
+        os.remove(os.path.join(self.test_dir.name, 'slow.txt'))
+        for batch_size, jobs in ((1, 1), (4, 1), (1, 2), (4, 2)):
+            app = herostratus.Crawler()
+            app.batch_size = batch_size
+            documents = list(app.collect_document_infos(entries, jobs))
+            self.assertEqual(len(documents), 1)
+            self.assertTrue(documents[0].reason.startswith('FileNotFoundError'))
+
+    def test_vanished_files_without_stat_keep_the_timeline_sortable(self):
+        filename = os.path.join(self.test_dir.name, 'slow.txt')
+        os.remove(filename)
+        app = herostratus.Crawler()
+        documents = list(app.collect_document_infos([DiscoveredFile(filename, None)]))
+        self.assertEqual(documents[0].date_create, herostratus.EPOCH)
+        timeline = herostratus.Timeline()
+        timeline.add(herostratus.DocumentInfo('/data/a.txt', size=1))
+        timeline.unprocessed[0].date_create = dt.datetime(2020, 1, 1)
+        timeline.add(documents[0])
+        timeline.sort()
+        timeline.insert(documents[0])
+        self.assertEqual([doc.path for doc in timeline.unprocessed], [filename, filename, '/data/a.txt'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import shutil
+import zipfile
+import os
+import warnings
+
+from herostratus import herostratus
+from herostratus.archives import ArchiveReader
+from herostratus.journal import Journal, JournalError
+from herostratus.stats import Stats
+
+warnings.filterwarnings("ignore")
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+class Test_journal(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.target = os.path.join(self.test_dir.name, 'data')
+        shutil.copytree(DATA_DIR, self.target)
+        with zipfile.ZipFile(os.path.join(self.target, 'documents.zip'), 'w') as archive:
+            for name in ('file_example_DOCX_1.docx', 'file_example_PDF_1.pdf'):
+                archive.write(os.path.join(DATA_DIR, name), name)
+        self.filename = os.path.join(self.test_dir.name, 'timeline.journal')
+        self.processed = []
+        self.create_document_infos = herostratus.Crawler.create_document_infos
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def crawler(self, resume=False):
+        app = herostratus.Crawler()
+        app.archives = ArchiveReader()
+        app.journal = Journal(self.filename, herostratus.DocumentInfo)
+        app.journal.open(self.target, resume)
+        processed = self.processed
+        create = self.create_document_infos
+
+        def create_document_infos(filename, stat, source=None):
+            processed.append(filename)
+            return create(app, filename, stat, source)
+        app.create_document_infos = create_document_infos
+        return app
+
+    def interrupt(self, count):
+        app = self.crawler()
+        documents = app.iter_document_infos(self.target)
+        for _ in range(count):
+            next(documents)
+        documents.close()
+        app.journal.close()
+        return app.journal
+
+    def resume(self, cache=None):
+        app = self.crawler(resume=True)
+        timeline = app.collect_timeline(self.target, cache=cache)
+        app.journal.close()
+        return app.journal, timeline
+
+    def assertSameTimeline(self, timeline, expected):
+        for section in ('processed', 'unprocessed'):
+            self.assertEqual(
+                [document.to_dict() for document in getattr(timeline, section)],
+                [document.to_dict() for document in getattr(expected, section)]
+            )
+
+    def expected(self):
+        app = herostratus.Crawler()
+        app.archives = ArchiveReader()
+        return app.collect_timeline(self.target)
+
+    def test_resumed_scan_matches_uninterrupted_scan(self):
+        recorded = self.interrupt(8).recorded
+        self.assertGreater(recorded, 0)
+        journal, timeline = self.resume()
+        self.assertEqual(journal.replayed, recorded)
+        self.assertSameTimeline(timeline, self.expected())
+
+    def test_resume_skips_journaled_files(self):
+        self.interrupt(8)
+        journaled = set(self.processed[:-1])
+        del self.processed[:]
+        self.resume()
+        self.assertFalse(journaled.intersection(self.processed))
+
+    def test_archive_members_are_journaled_with_their_archive(self):
+        archive = os.path.join(self.target, 'documents.zip')
+        app = self.crawler()
+        for document in app.iter_document_infos(self.target):
+            if document.path == archive:
+                break
+        app.journal.close()
+        del self.processed[:]
+        journal, timeline = self.resume()
+        self.assertIn(archive, self.processed)
+        self.assertSameTimeline(timeline, self.expected())
+
+    def test_changed_files_after_the_checkpoint_are_processed_again(self):
+        self.interrupt(8)
+        with open(self.filename) as f:
+            lines = [line for line in f if not line.startswith('{"checkpoint"')]
+        with open(self.filename, 'w') as f:
+            f.writelines(lines)
+        journaled = self.processed[0]
+        os.utime(journaled, ns=(0, 0))
+        del self.processed[:]
+        self.resume()
+        self.assertIn(journaled, self.processed)
+
+    def test_journaled_subtrees_are_not_scanned_again(self):
+        self.target = os.path.join(self.test_dir.name, 'tree')
+        for directory in ('a', 'b'):
+            os.makedirs(os.path.join(self.target, directory))
+            for name in ('file_example_DOCX_1.docx', 'file_example_PDF_1.pdf'):
+                shutil.copy(os.path.join(DATA_DIR, name), os.path.join(self.target, directory, name))
+        journal = self.interrupt(3)
+        self.assertEqual(journal.checkpoint, os.path.join(self.target, 'a', 'file_example_PDF_1.pdf'))
+        expected = self.expected()
+        shutil.rmtree(os.path.join(self.target, 'a'))
+        del self.processed[:]
+        app = self.crawler(resume=True)
+        app.stats = Stats()
+        timeline = app.collect_timeline(self.target)
+        app.journal.close()
+        self.assertEqual(app.stats.to_dict()['stages']['discovery']['count'], 2)
+        self.assertFalse([path for path in self.processed if os.sep + 'a' + os.sep in path])
+        self.assertSameTimeline(timeline, expected)
+
+    def test_torn_last_line_is_ignored(self):
+        self.interrupt(8)
+        with open(self.filename, 'ab') as f:
+            f.write(b'{"source": "/torn')
+        journal, timeline = self.resume()
+        self.assertGreater(journal.replayed, 0)
+        self.assertSameTimeline(timeline, self.expected())
+
+    def test_resume_keeps_cache_entries_of_journaled_files(self):
+        cache_filename = os.path.join(self.test_dir.name, 'scan.cache')
+        self.interrupt(8)
+        with herostratus.ScanCache(cache_filename) as cache:
+            journal, timeline = self.resume(cache)
+            self.assertGreater(journal.replayed, 0)
+        del self.processed[:]
+        with herostratus.ScanCache(cache_filename) as cache:
+            self.expected_with_cache(cache)
+            self.assertEqual(cache.misses, 0)
+        self.assertSameTimeline(timeline, self.expected())
+
+    def expected_with_cache(self, cache):
+        app = herostratus.Crawler()
+        app.archives = ArchiveReader()
+        return app.collect_timeline(self.target, cache=cache)
+
+    def test_journal_of_another_path_is_rejected(self):
+        self.interrupt(4)
+        journal = Journal(self.filename, herostratus.DocumentInfo)
+        with self.assertRaises(JournalError):
+            journal.open(DATA_DIR, resume=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import importlib
+import subprocess
+import sys
+import os
+
+from herostratus import herostratus
+from herostratus.lazy import lazy_import, load_object, LazyImportError
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PLUGIN_MODULE = '''
+from herostratus.herostratus import DefaultProcessor
+
+class PlainProcessor(DefaultProcessor):
+    pass
+'''
+
+
+class Test_lazy_import(unittest.TestCase):
+
+    def test_heavy_dependencies_are_not_imported_up_front(self):
+        modules = ['docx.api', 'pptx.api', 'PyPDF2.pdf', 'dominate.document', 'xlwt.Workbook', 'xlsxwriter.workbook', 'tqdm.std']
+        output = subprocess.run(
+            [sys.executable, '-c', 'import sys, herostratus.herostratus; print(" ".join(sorted(sys.modules)))'],
+            cwd=ROOT_DIR, check=True, stdout=subprocess.PIPE, universal_newlines=True
+        ).stdout.split()
+        for module in modules:
+            self.assertNotIn(module, output)
+
+    def test_optional_features_are_not_imported_up_front(self):
+        modules = [
+            'herostratus.cache', 'herostratus.watch', 'herostratus.archives', 'herostratus.partial',
+            'herostratus.journal', 'herostratus.prefetch', 'herostratus.duplicates', 'cProfile',
+            'sqlite3', 'multiprocessing', 'concurrent.futures', 'tarfile', 'zipfile', 'tempfile',
+            'ctypes', 'pathlib'
+        ]
+        output = subprocess.run(
+            [sys.executable, '-c', 'import sys, herostratus.herostratus; print(" ".join(sorted(sys.modules)))'],
+            cwd=ROOT_DIR, check=True, stdout=subprocess.PIPE, universal_newlines=True
+        ).stdout.split()
+        for module in modules:
+            self.assertNotIn(module, output)
+
+    def test_lazy_module_loads_on_first_attribute(self):
+        module = lazy_import('xml.dom.minidom')
+        self.assertTrue(hasattr(module, 'parseString'))
+        self.assertIs(lazy_import('xml.dom.minidom'), module)
+        with self.assertRaises(LazyImportError):
+            lazy_import('herostratus_missing_module')
+
+    def test_load_object(self):
+        self.assertIs(load_object('herostratus.herostratus:PdfProcessor'), herostratus.PdfProcessor)
+        self.assertIs(load_object('os.path:join'), os.path.join)
+        with self.assertRaises(ImportError):
+            load_object('os.path:missing')
+
+
+class Test_processor_entry_points(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        dist_info = os.path.join(self.test_dir.name, 'herostratus_plain-1.0.dist-info')
+        os.makedirs(dist_info)
+        with open(os.path.join(dist_info, 'METADATA'), 'w') as f:
+            f.write('Metadata-Version: 2.1\nName: herostratus-plain\nVersion: 1.0\n')
+        with open(os.path.join(dist_info, 'entry_points.txt'), 'w') as f:
+            f.write('[herostratus.processors]\ntext/plain = herostratus_plain:PlainProcessor\n')
+        with open(os.path.join(self.test_dir.name, 'herostratus_plain.py'), 'w') as f:
+            f.write(PLUGIN_MODULE)
+        sys.path.insert(0, self.test_dir.name)
+        importlib.invalidate_caches()
+
+    def tearDown(self):
+        sys.path.remove(self.test_dir.name)
+        sys.modules.pop('herostratus_plain', None)
+        self.test_dir.cleanup()
+
+    def test_plugins_are_imported_on_first_matching_mime(self):
+        factory = herostratus.DocumentProcessorFactory()
+        self.assertEqual(type(factory.get_processor('application/pdf')).__name__, 'DefaultProcessor')
+        self.assertNotIn('herostratus_plain', sys.modules)
+        processor = factory.get_processor('text/plain')
+        self.assertEqual(type(processor).__name__, 'PlainProcessor')
+        self.assertIn('herostratus_plain', sys.modules)
+
+    def test_unloadable_plugins_fall_back_to_default(self):
+        factory = herostratus.DocumentProcessorFactory(None)
+        factory.register_mime('text/plain', 'herostratus_missing_module:Processor')
+        self.assertIsInstance(factory.get_processor('text/plain'), herostratus.DefaultProcessor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+import unittest
+import os
+import io
+import struct
+import datetime as dt
+
+from herostratus import ole2
+
+DATA_DIR = os.path.join(os.getcwd(), "tests/data")
+
+
+class Test_ole2_summary(unittest.TestCase):
+
+    def read_summary(self, file):
+        with open(os.path.join(DATA_DIR, file), 'rb') as f:
+            return ole2.read_summary(f)
+
+    def test_reader_decodes_doc_summary(self):
+        properties = self.read_summary('file_example_DOC_1.doc')
+        self.assertEqual(properties.author, '1')
+        self.assertEqual(properties.last_saved_by, 'Ширяев Иван')
+        self.assertEqual(properties.created, dt.datetime(2007, 4, 24, 6, 7))
+        self.assertEqual(properties.last_saved, dt.datetime(2014, 4, 28, 11, 12))
+        self.assertEqual(properties.pages, 33)
+        self.assertEqual(properties.words, 6946)
+
+    def test_reader_decodes_xls_summary(self):
+        properties = self.read_summary('file_example_XLS_1.xls')
+        self.assertEqual(properties.author, 'nomuralieva')
+        self.assertEqual(properties.last_saved_by, 'Your User Name')
+        self.assertEqual(properties.created, dt.datetime(2005, 9, 28, 9, 24, 15))
+        self.assertEqual(properties.last_saved, dt.datetime(2015, 10, 30, 5, 44, 6))
+
+    def test_reader_decodes_ppt_document_summary(self):
+        properties = self.read_summary('file_example_PPT_1.ppt')
+        self.assertEqual(properties.author, 'user')
+        self.assertEqual(properties.last_saved_by, 'Ryan McKenzie')
+        self.assertEqual(properties.created.replace(microsecond=0), dt.datetime(2005, 2, 10, 21, 18, 44))
+        self.assertIsNotNone(properties.slides)
+
+    def test_reader_rejects_other_files(self):
+        with self.assertRaises(ole2.Ole2Error):
+            ole2.read_summary(io.BytesIO(b'%PDF-1.4' + b'\x00' * 1024))
+        with open(os.path.join(DATA_DIR, 'file_example_DOC_1.doc'), 'rb') as f:
+            truncated = io.BytesIO(f.read(1024))
+        with self.assertRaises(ole2.Ole2Error):
+            ole2.read_summary(truncated)
+
+    def test_mistyped_dates_are_ignored(self):
+        with open(os.path.join(DATA_DIR, 'file_example_DOC_1.doc'), 'rb') as f:
+            data = bytearray(f.read())
+        stream = ole2.CompoundFile(io.BytesIO(bytes(data))).read_streams(
+            (ole2.SUMMARY_INFORMATION,)
+        )[ole2.SUMMARY_INFORMATION]
+        section = struct.unpack_from('<I', stream, 44)[0]
+        for index in range(struct.unpack_from('<I', stream, section + 4)[0]):
+            property_id, offset = struct.unpack_from('<II', stream, section + 8 + index * 8)
+            if property_id == ole2.PIDSI_CREATE_DTM:
+                value = stream[section + offset - 4:section + offset + 12]
+        position = data.find(value) + 4
+        data[position:position + 4] = struct.pack('<I', ole2.VT_LPSTR)
+        properties = ole2.read_summary(io.BytesIO(bytes(data)))
+        self.assertIsNone(properties.created)
+        self.assertEqual(properties.last_saved, dt.datetime(2014, 4, 28, 11, 12))
+        self.assertIsNone(ole2.filetime_to_datetime('2014'))
+
+if __name__ == '__main__':
+    unittest.main()
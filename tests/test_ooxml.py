@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+
+import unittest
+import os
+import io
+import zipfile
+import datetime as dt
+
+from docx import Document
+from pptx import Presentation
+
+from herostratus import ooxml
+
+DATA_DIR = os.path.join(os.getcwd(), "tests/data")
+
+
+class Test_ooxml_properties(unittest.TestCase):
+
+    def assert_same_core_properties(self, properties, core_props):
+        self.assertEqual(properties.author, core_props.author)
+        self.assertEqual(properties.last_modified_by, core_props.last_modified_by)
+        self.assertEqual(properties.created, core_props.created)
+        self.assertEqual(properties.modified, core_props.modified)
+
+    def test_reader_matches_python_docx(self):
+        for file in ['file_example_DOCX_1.docx', 'file_example_DOCX_3.docx', 'file_example_DOCX_100kB.docx']:
+            filename = os.path.join(DATA_DIR, file)
+            properties = ooxml.read_properties(filename)
+            self.assert_same_core_properties(properties, Document(filename).core_properties)
+        self.assertEqual(ooxml.read_properties(os.path.join(DATA_DIR, 'file_example_DOCX_1.docx')).pages, 5)
+
+    def test_reader_matches_python_pptx(self):
+        filename = os.path.join(DATA_DIR, 'file_example_PPTX_2.pptx')
+        properties = ooxml.read_properties(filename)
+        self.assert_same_core_properties(properties, Presentation(filename).core_properties)
+        self.assertEqual(properties.slides, 2)
+
+    def test_reader_reads_xlsx_properties(self):
+        properties = ooxml.read_properties(os.path.join(DATA_DIR, 'file_example_XLSX_50.xlsx'))
+        self.assertEqual(properties.created, dt.datetime(2017, 8, 3, 11, 50, 33))
+        self.assertEqual(properties.modified, dt.datetime(2017, 8, 4, 11, 26, 19))
+
+    def test_reader_converts_w3cdtf_offsets_to_utc(self):
+        self.assertEqual(ooxml.parse_w3cdtf('2020-01-02T03:04:05+02:00'), dt.datetime(2020, 1, 2, 1, 4, 5))
+        self.assertEqual(ooxml.parse_w3cdtf('2020-01-02'), dt.datetime(2020, 1, 2))
+        self.assertIsNone(ooxml.parse_w3cdtf('yesterday'))
+
+    def test_reader_keeps_its_buffer_size_for_large_parts(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as package:
+            package.writestr(
+                'docProps/core.xml',
+                '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+                'xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:creator>Jane</dc:creator><!--{}--></cp:coreProperties>'
+                .format('x' * 200000)
+            )
+        reader = ooxml.OoxmlReader()
+        self.assertEqual(reader.read_properties(buffer).author, 'Jane')
+        self.assertEqual(len(reader._buffer), ooxml.READ_BUFFER_SIZE)
+
+    def test_reader_rejects_packages_without_core_properties(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as package:
+            package.writestr('word/document.xml', '<document/>')
+        buffer.seek(0)
+        with self.assertRaises(ooxml.OoxmlError):
+            ooxml.read_properties(buffer)
+        with self.assertRaises(ooxml.OoxmlError):
+            ooxml.read_properties(io.BytesIO(b'not a zip'))
+
+if __name__ == '__main__':
+    unittest.main()
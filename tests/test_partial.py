@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import subprocess
+import sys
+import gzip
+import os
+import warnings
+
+from herostratus import herostratus, cli
+from herostratus.partial import PartialTimelineWriter, PartialTimeline, PartialError
+
+warnings.filterwarnings("ignore")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, 'tests', 'data')
+
+
+class Test_partial_timeline(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.timeline = herostratus.Crawler().collect_timeline(DATA_DIR)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_partial_timeline_round_trips_documents(self):
+        filename = os.path.join(self.test_dir.name, 'scan.partial')
+        herostratus.Crawler().write_timeline(DATA_DIR, self.timeline, [PartialTimelineWriter(filename)])
+        partial = PartialTimeline(filename, herostratus.DocumentInfo)
+        self.assertEqual(partial.path, DATA_DIR)
+        for section in ('processed', 'unprocessed'):
+            self.assertEqual(
+                [document.to_dict() for document in getattr(partial, section)],
+                [document.to_dict() for document in getattr(self.timeline, section)]
+            )
+
+    def test_partial_timeline_rejects_other_files(self):
+        filename = os.path.join(self.test_dir.name, 'other.partial')
+        with gzip.open(filename, 'wt') as f:
+            f.write('{"format": "something-else"}\n')
+        with self.assertRaises(PartialError):
+            PartialTimeline(filename, herostratus.DocumentInfo)
+
+    def test_partial_timelines_of_different_paths_are_not_merged(self):
+        filenames = []
+        for index, path in enumerate((DATA_DIR, os.path.join(DATA_DIR, 'other'))):
+            filename = os.path.join(self.test_dir.name, 'shard{}.partial'.format(index))
+            herostratus.Crawler().write_timeline(path, self.timeline, [PartialTimelineWriter(filename)])
+            filenames.append(filename)
+        with self.assertRaises(PartialError):
+            cli.merge_partials(filenames)
+        process = subprocess.run(
+            [sys.executable, '-m', 'herostratus.herostratus', 'merge', os.path.join(self.test_dir.name, 'merged')]
+            + filenames + ['--format', 'xml'],
+            cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.assertEqual(process.returncode, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir.name, 'merged.xml')))
+
+    def run_cli(self, *args):
+        subprocess.run(
+            [sys.executable, '-m', 'herostratus'] + list(args),
+            cwd=ROOT_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+    def test_sharded_scans_merge_into_one_timeline(self):
+        shards = 3
+        processes = []
+        for index in range(shards):
+            filename = os.path.join(self.test_dir.name, 'shard{}'.format(index))
+            processes.append(subprocess.Popen(
+                [sys.executable, '-m', 'herostratus.herostratus', DATA_DIR, filename,
+                 '--shard', '{}/{}'.format(index, shards), '--format', 'partial'],
+                cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            ))
+        for process in processes:
+            self.assertEqual(process.wait(), 0)
+        partials = [os.path.join(self.test_dir.name, 'shard{}.partial'.format(index)) for index in range(shards)]
+        path, timeline = cli.merge_partials(partials)
+        self.assertEqual(path, DATA_DIR)
+        for section in ('processed', 'unprocessed'):
+            self.assertEqual(
+                [document.to_dict() for document in getattr(timeline, section)],
+                [document.to_dict() for document in getattr(self.timeline, section)]
+            )
+        output = os.path.join(self.test_dir.name, 'merged')
+        self.run_cli('merge', output, *partials, '--format', 'xml,xls')
+        self.assertTrue(os.path.isfile(output + '.xml'))
+        self.assertTrue(os.path.isfile(output + '.xls'))
+
+
+if __name__ == '__main__':
+    unittest.main()
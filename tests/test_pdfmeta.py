@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+
+import unittest
+import os
+import zlib
+import struct
+import datetime as dt
+
+from herostratus import pdfmeta
+
+DATA_DIR = os.path.join(os.getcwd(), "tests/data")
+
+
+def build_xref_stream_pdf():
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [] /Count 7 >>',
+        b'<< /Author (Jane \\(J\\) Doe) /CreationDate (D:20200102030405+01\'00\') >>',
+    ]
+    data = bytearray(b'%PDF-1.5\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref_offset = len(data)
+    rows = b''.join(struct.pack('>BIH', 1, offset, 0) for offset in [0] + offsets)
+    rows = b'\x00' * 7 + rows[7:]
+    stream = zlib.compress(rows)
+    data += (
+        b'4 0 obj\n<< /Type /XRef /Size 5 /W [1 4 2] /Root 1 0 R /Info 3 0 R /Length %d '
+        b'/Filter /FlateDecode >>\nstream\n' % len(stream)
+    )
+    data += stream + b'\nendstream\nendobj\n'
+    data += b'startxref\n%d\n%%%%EOF\n' % xref_offset
+    return bytes(data)
+
+
+class Test_pdf_metadata(unittest.TestCase):
+
+    def test_reader_reads_info_and_page_count(self):
+        metadata = pdfmeta.read_metadata(os.path.join(DATA_DIR, 'file_example_PDF_3.pdf'))
+        self.assertEqual(metadata.author, 'c8clark')
+        self.assertEqual(metadata.created, dt.datetime(2012, 3, 30, 7, 25, 26))
+        self.assertEqual(metadata.pages, 1)
+        metadata = pdfmeta.read_metadata(os.path.join(DATA_DIR, 'file_example_PDF_500_kB.pdf'))
+        self.assertEqual(metadata.pages, 5)
+
+    def test_reader_follows_previous_xref_sections(self):
+        metadata = pdfmeta.read_metadata(os.path.join(DATA_DIR, 'file_example_PDF_2.pdf'))
+        self.assertEqual(metadata.author, 'ngeanetta')
+        self.assertEqual(metadata.modified, dt.datetime(2008, 6, 13, 14, 7, 20))
+
+    def test_reader_reads_xref_streams(self):
+        metadata = pdfmeta.parse_metadata(build_xref_stream_pdf())
+        self.assertEqual(metadata.author, 'Jane (J) Doe')
+        self.assertEqual(metadata.created, dt.datetime(2020, 1, 2, 2, 4, 5))
+        self.assertIsNone(metadata.modified)
+        self.assertEqual(metadata.pages, 7)
+
+    def test_reader_rejects_malformed_files(self):
+        with self.assertRaises(pdfmeta.PdfMetaError):
+            pdfmeta.parse_metadata(b'%PDF-1.4\nno trailer here\n')
+        with self.assertRaises(pdfmeta.PdfMetaError):
+            pdfmeta.parse_metadata(b'%PDF-1.4\nstartxref\n99999\n%%EOF\n')
+
+    def test_pdf_dates_are_converted_to_utc(self):
+        self.assertEqual(pdfmeta.parse_pdf_date(b"D:20170816144228+02'00'"), dt.datetime(2017, 8, 16, 12, 42, 28))
+        self.assertEqual(pdfmeta.parse_pdf_date(b'D:2008'), dt.datetime(2008, 1, 1))
+        self.assertIsNone(pdfmeta.parse_pdf_date(b'garbage'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import threading
+import collections
+import time
+import os
+import warnings
+
+from herostratus import herostratus
+from herostratus.prefetch import Prefetcher, PrefetchedSource
+
+warnings.filterwarnings("ignore")
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def build_large_pdf(padding):
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [] /Count 3 >>',
+        b'<< /Length %d >>\nstream\n' % padding + bytes(padding) + b'\nendstream',
+        b'<< /Author (Jane Doe) /CreationDate (D:20200102030405) >>',
+    ]
+    data = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref_offset = len(data)
+    data += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    data += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    data += b'trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\n' % (len(objects) + 1)
+    data += b'startxref\n%d\n%%%%EOF\n' % xref_offset
+    return bytes(data)
+
+
+class LatencyFile():
+    def __init__(self, file, filesystem):
+        self.file = file
+        self.filesystem = filesystem
+
+    def read(self, size=-1):
+        self.filesystem.round_trip()
+        return self.file.read(size)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self.file.seek(offset, whence)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LatencyFilesystem():
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.main = threading.get_ident()
+        self.round_trips = collections.Counter()
+        self._lock = threading.Lock()
+
+    def round_trip(self):
+        time.sleep(self.latency)
+        with self._lock:
+            self.round_trips['main' if threading.get_ident() == self.main else 'prefetch'] += 1
+
+    def open(self, path, mode='rb'):
+        self.round_trip()
+        return LatencyFile(open(path, mode), self)
+
+    def stat(self, path):
+        self.round_trip()
+        return os.stat(path)
+
+
+class Test_prefetched_source(unittest.TestCase):
+
+    def test_source_reads_head_tail_and_middle(self):
+        data = bytes(range(256)) * 40
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            filesystem = LatencyFilesystem()
+            entry = Prefetcher(head_size=1000, tail_size=1000, opener=filesystem.open).load(f.name)
+            source = entry.source
+            self.assertEqual(filesystem.round_trips['main'], 3)
+            with source.open() as file:
+                self.assertEqual(file.read(100), data[:100])
+                file.seek(-50, os.SEEK_END)
+                self.assertEqual(file.read(), data[-50:])
+                self.assertEqual(source.fallback_reads, 0)
+                file.seek(990)
+                self.assertEqual(file.read(30), data[990:1020])
+                file.seek(0)
+                self.assertEqual(file.read(), data)
+            self.assertEqual(source.fallback_reads, filesystem.round_trips['main'] - 3)
+            source.close()
+
+    def test_pdf_processor_closes_prefetched_streams(self):
+        filename = os.path.join(DATA_DIR, 'file_example_PDF_500_kB.pdf')
+        streams = []
+        entry = Prefetcher().load(filename)
+        source_open = entry.source.open
+        entry.source.open = lambda: streams.append(source_open()) or streams[-1]
+        file_type = herostratus.get_magic_detector().detect(filename, entry.stat, entry.source)
+        document = herostratus.PdfProcessor().process(filename, file_type)
+        self.assertTrue(document.processed)
+        self.assertEqual(len(streams), 2)
+        self.assertTrue(all(stream.closed for stream in streams))
+
+    def test_small_files_are_read_in_one_round_trip(self):
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(b'small')
+            f.flush()
+            filesystem = LatencyFilesystem()
+            entry = Prefetcher(opener=filesystem.open).load(f.name)
+            self.assertIsInstance(entry.source, PrefetchedSource)
+            self.assertEqual(entry.source.head, b'small')
+            self.assertEqual(filesystem.round_trips['main'], 2)
+
+
+class Test_crawler_prefetch(unittest.TestCase):
+
+    def collect(self, prefetch):
+        app = herostratus.Crawler()
+        app.prefetch = prefetch
+        return app.collect_timeline(DATA_DIR)
+
+    def test_prefetched_timeline_matches_direct_reads(self):
+        timeline = self.collect(None)
+        timeline_prefetched = self.collect(Prefetcher(window=4, threads=2))
+        for section in ('processed', 'unprocessed'):
+            self.assertEqual(
+                [document.to_dict() for document in getattr(timeline_prefetched, section)],
+                [document.to_dict() for document in getattr(timeline, section)]
+            )
+
+    def test_prefetched_pdfs_are_read_from_head_and_tail(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'large.pdf'), 'wb') as f:
+                f.write(build_large_pdf(4 * 1024 * 1024))
+            app = herostratus.Crawler()
+            app.stats = herostratus.Stats()
+            app.prefetch = Prefetcher(window=0)
+            timeline = app.collect_timeline(directory)
+        self.assertEqual(timeline.processed[0].author, 'Jane Doe')
+        self.assertEqual(timeline.processed[0].pages, 3)
+        self.assertLess(app.stats.stages['processor.PdfProcessor'].bytes, 64 * 1024)
+        self.assertEqual(app.prefetch.fallback_reads, 0)
+
+    def test_prefetch_moves_round_trips_off_the_processing_thread(self):
+        serial = LatencyFilesystem(0.001)
+        self.collect(Prefetcher(window=0, opener=serial.open, stat=serial.stat))
+        ahead = LatencyFilesystem(0.001)
+        prefetcher = Prefetcher(window=8, threads=4, opener=ahead.open, stat=ahead.stat)
+        self.collect(prefetcher)
+        self.assertEqual(serial.round_trips['prefetch'], 0)
+        self.assertGreater(ahead.round_trips['prefetch'], 0)
+        self.assertEqual(ahead.round_trips['main'], prefetcher.fallback_reads)
+        self.assertLess(ahead.round_trips['main'], serial.round_trips['main'])
+
+
+if __name__ == '__main__':
+    unittest.main()
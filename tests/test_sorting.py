@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+
+import unittest
+import random
+
+from herostratus.sorting import ExternalSorter
+
+
+class Test_external_sorter(unittest.TestCase):
+
+    def test_sorter_merges_spilled_runs(self):
+        values = [random.randint(0, 1000) for _ in range(1000)]
+        sorter = ExternalSorter(key=lambda value: value, run_size=64)
+        for value in values:
+            sorter.append(value)
+        self.assertEqual(len(sorter), len(values))
+        self.assertEqual(list(sorter), sorted(values))
+        self.assertEqual(list(sorter), sorted(values))
+
+    def test_sorter_is_stable_across_runs(self):
+        values = [(value % 7, index) for index, value in enumerate(range(500))]
+        sorter = ExternalSorter(key=lambda value: value[0], run_size=50)
+        for value in values:
+            sorter.append(value)
+        self.assertEqual(list(sorter), sorted(values, key=lambda value: value[0]))
+
+    def test_sorter_can_change_key(self):
+        values = list(range(300))
+        sorter = ExternalSorter(key=lambda value: value, run_size=32)
+        for value in values:
+            sorter.append(value)
+        sorter.sort(key=lambda value: -value)
+        self.assertEqual(list(sorter), list(reversed(values)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import os
+import json
+import time
+import warnings
+from distutils.dir_util import copy_tree
+
+from herostratus import herostratus
+from herostratus.stats import Stats, SAMPLE_SIZE
+
+warnings.filterwarnings("ignore")
+
+
+class Test_stats(unittest.TestCase):
+
+    def test_stats_record_percentiles_and_slowest_files(self):
+        stats = Stats(slowest=3)
+        for index in range(100):
+            stats.record('file', index / 100.0, size=10, error=index % 10 == 0, path='/data/{}'.format(index))
+        stage = stats.to_dict()['stages']['file']
+        self.assertEqual(stage['count'], 100)
+        self.assertEqual(stage['bytes'], 1000)
+        self.assertEqual(stage['errors'], 10)
+        self.assertEqual(stage['p50'], 0.5)
+        self.assertEqual(stage['p99'], 0.99)
+        self.assertEqual([item['path'] for item in stats.to_dict()['slowest']], ['/data/99', '/data/98', '/data/97'])
+
+    def test_stats_samples_are_bounded(self):
+        stats = Stats()
+        for index in range(SAMPLE_SIZE * 2):
+            stats.record('detect', 0.001)
+        self.assertEqual(len(stats.stages['detect'].samples), SAMPLE_SIZE)
+        self.assertEqual(stats.stages['detect'].count, SAMPLE_SIZE * 2)
+
+    def test_stats_merge(self):
+        first = Stats(slowest=2)
+        second = Stats(slowest=2)
+        first.record('file', 1.0, path='/a')
+        second.record('file', 3.0, path='/b')
+        second.record('processor.PdfProcessor', 2.0, size=5, error=True)
+        first.merge(second)
+        result = first.to_dict()
+        self.assertEqual(result['stages']['file']['count'], 2)
+        self.assertEqual(result['stages']['file']['time'], 4.0)
+        self.assertEqual(result['stages']['processor.PdfProcessor']['errors'], 1)
+        self.assertEqual([item['path'] for item in result['slowest']], ['/b', '/a'])
+
+
+class Test_crawler_stats(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        copy_tree(os.path.join(os.getcwd(), "tests/data"), self.test_dir.name)
+        self.file_count = len(os.listdir(self.test_dir.name))
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def collect_stats(self, jobs):
+        app = herostratus.Crawler()
+        app.stats = Stats()
+        timeline = app.collect_timeline(self.test_dir.name, jobs=jobs)
+        app.write_timeline_xml(self.test_dir.name, os.path.join(self.test_dir.name, 'out.xml'), timeline)
+        return app.stats.to_dict()
+
+    def test_crawler_records_stage_stats(self):
+        stats = self.collect_stats(1)
+        self.assertEqual(stats['stages']['discovery']['count'], self.file_count)
+        self.assertEqual(stats['stages']['detect']['count'], self.file_count)
+        self.assertEqual(stats['stages']['file']['count'], self.file_count)
+        self.assertEqual(
+            sum(stage['count'] for name, stage in stats['stages'].items() if name.startswith('processor.')),
+            self.file_count
+        )
+        self.assertIn('processor.PdfProcessor', stats['stages'])
+        self.assertEqual(stats['stages']['writer.XmlTimelineWriter']['count'], self.file_count + 4)
+        self.assertEqual(len(stats['slowest']), 10)
+        json.dumps(stats)
+
+    def test_processor_bytes_count_bytes_read(self):
+        stats = self.collect_stats(1)
+        pdf_size = sum(
+            os.path.getsize(os.path.join(self.test_dir.name, name))
+            for name in os.listdir(self.test_dir.name) if name.endswith('.pdf')
+        )
+        for name in ('processor.PdfProcessor', 'processor.OoxmlProcessor', 'processor.Ole2Processor'):
+            self.assertGreater(stats['stages'][name]['bytes'], 0)
+        self.assertLess(stats['stages']['processor.PdfProcessor']['bytes'], pdf_size)
+        self.assertEqual(stats['stages']['processor.MagicProcessor']['bytes'], 0)
+
+    def test_batched_files_are_timed_one_by_one(self):
+        class SlowPdfProcessor(herostratus.PdfProcessor):
+            def process_many(self, paths, file_types):
+                for path, file_type in zip(paths, file_types):
+                    if path.endswith('file_example_PDF_2.pdf'):
+                        time.sleep(0.2)
+                    yield self.process(path, file_type)
+
+        herostratus.processor_factory.register_mime('application/pdf', SlowPdfProcessor)
+        try:
+            app = herostratus.Crawler()
+            app.stats = Stats(slowest=2)
+            app.batch_size = 100
+            app.collect_timeline(self.test_dir.name)
+        finally:
+            herostratus.processor_factory.register_mime('application/pdf', herostratus.PdfProcessor)
+        slowest = app.stats.to_dict()['slowest']
+        self.assertEqual(slowest[0]['path'], os.path.join(self.test_dir.name, 'file_example_PDF_2.pdf'))
+        self.assertLess(slowest[1]['time'], 0.1)
+
+    def test_crawler_collects_stats_from_workers(self):
+        stats = self.collect_stats(2)
+        self.assertEqual(stats['stages']['file']['count'], self.file_count)
+        self.assertEqual(stats['stages']['detect']['count'], self.file_count)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import os
+import shutil
+import time
+import warnings
+
+from herostratus import herostratus
+from herostratus.watch import Watcher
+
+warnings.filterwarnings("ignore")
+
+DATA_DIR = os.path.join(os.getcwd(), "tests/data")
+
+
+class Test_watcher(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.root = self.test_dir.name
+        shutil.copy(os.path.join(DATA_DIR, 'file_example_DOCX_1.docx'), self.root)
+        os.mkdir(os.path.join(self.root, 'sub'))
+        shutil.copy(os.path.join(DATA_DIR, 'file_example_PDF_3.pdf'), os.path.join(self.root, 'sub'))
+        self.crawler = herostratus.Crawler()
+        self.timeline = self.crawler.collect_timeline(self.root)
+        self.changes = []
+        self.watcher = Watcher(self.crawler, self.root, self.timeline, self.changes.append, debounce=0)
+
+    def tearDown(self):
+        self.watcher.close()
+        self.test_dir.cleanup()
+
+    def settle(self):
+        deadline = time.monotonic() + 5
+        seen = 0
+        while time.monotonic() < deadline:
+            events = self.watcher.poll(0.2)
+            seen += events
+            if seen and not events:
+                break
+        return self.watcher.flush()
+
+    def paths(self):
+        return sorted(
+            os.path.relpath(document.path, self.root)
+            for section in (self.timeline.processed, self.timeline.unprocessed) for document in section
+        )
+
+    def test_watcher_adds_created_files(self):
+        shutil.copy(os.path.join(DATA_DIR, 'file_example_XLS_100.xls'), os.path.join(self.root, 'sub'))
+        changes = self.settle()
+        self.assertEqual(changes, {os.path.join(self.root, 'sub', 'file_example_XLS_100.xls'): 'created'})
+        self.assertIn(os.path.join('sub', 'file_example_XLS_100.xls'), self.paths())
+        self.assertEqual(self.changes, [changes])
+        dates = [document.date_create for document in self.timeline.processed]
+        self.assertEqual(dates, sorted(dates))
+
+    def test_watcher_adds_hard_links(self):
+        link = os.path.join(self.root, 'sub', 'linked.docx')
+        os.link(os.path.join(self.root, 'file_example_DOCX_1.docx'), link)
+        changes = self.settle()
+        self.assertEqual(changes, {link: 'created'})
+        self.assertIn(os.path.join('sub', 'linked.docx'), self.paths())
+
+    def test_watcher_removes_deleted_and_moved_files(self):
+        os.remove(os.path.join(self.root, 'file_example_DOCX_1.docx'))
+        os.rename(os.path.join(self.root, 'sub'), os.path.join(self.root, 'moved'))
+        changes = self.settle()
+        self.assertEqual(changes[os.path.join(self.root, 'file_example_DOCX_1.docx')], 'deleted')
+        self.assertEqual(self.paths(), [os.path.join('moved', 'file_example_PDF_3.pdf')])
+
+    def test_watcher_reprocesses_modified_files(self):
+        path = os.path.join(self.root, 'file_example_DOCX_1.docx')
+        shutil.copy(os.path.join(DATA_DIR, 'file_example_DOCX_3.docx'), path)
+        changes = self.settle()
+        self.assertEqual(changes, {path: 'modified'})
+        self.assertEqual(len(self.timeline.processed), 2)
+
+    def test_watcher_watches_new_directories(self):
+        directory = os.path.join(self.root, 'new')
+        os.mkdir(directory)
+        self.settle()
+        shutil.copy(os.path.join(DATA_DIR, 'file_example_PPT_250kB.ppt'), directory)
+        self.settle()
+        self.assertIn(os.path.join('new', 'file_example_PPT_250kB.ppt'), self.paths())
+
+    def test_watcher_ignores_outputs(self):
+        self.watcher.ignore.add(os.path.join(self.root, 'out.xml'))
+        with open(os.path.join(self.root, 'out.xml'), 'w') as f:
+            f.write('<path />')
+        self.assertEqual(self.settle(), {})
+
+if __name__ == '__main__':
+    unittest.main()
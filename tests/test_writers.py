@@ -0,0 +1,313 @@
+#!/usr/bin/python3
+
+import unittest
+import tempfile
+import os
+import gzip
+import csv
+import json
+import re
+import zipfile
+import xlrd
+import datetime as dt
+import xml.etree.ElementTree as xee
+
+from herostratus import herostratus
+from herostratus.writers import XmlTimelineWriter, ShardedHtmlTimelineWriter, XlsxTimelineWriter, XlsTimelineWriter
+from herostratus.writers import TimelineSink, CsvTimelineWriter, JsonlTimelineWriter
+
+
+def make_document(name, processed=True, author='Jane <J> & Co', size=10):
+    document = herostratus.DocumentInfo('/data/' + name, size=size)
+    document.author = author
+    document.author_last = 'Jérôme'
+    document.date_create = dt.datetime(2020, 1, 2, 3, 4, 5)
+    document.date_modified = dt.datetime(2021, 1, 2, 3, 4, 5)
+    document.pages = 3
+    document.processed = processed
+    return document
+
+
+def make_timeline():
+    timeline = herostratus.Timeline()
+    timeline.add(make_document('a.docx'))
+    timeline.add(make_document('b.pdf'))
+    timeline.add(make_document('c.bin', processed=False))
+    return timeline
+
+
+def reference_xml(path, timeline):
+    root = xee.Element("path")
+    e_path = xee.SubElement(root, "path")
+    e_path.text = path
+    processed = xee.SubElement(root, "processed")
+    for doc in timeline.processed:
+        processed.append(doc.to_xml())
+    unprocessed = xee.SubElement(root, "unprocessed")
+    for doc in timeline.unprocessed:
+        unprocessed.append(doc.to_xml())
+    return xee.tostring(root)
+
+
+class Test_xml_writer(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_streaming_xml_matches_element_tree_output(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.xml')
+        timeline = make_timeline()
+        herostratus.Crawler().write_timeline_xml('/data', filename, timeline)
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), reference_xml('/data', timeline))
+
+    def test_streaming_xml_writes_empty_sections(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.xml')
+        timeline = herostratus.Timeline()
+        herostratus.Crawler().write_timeline_xml('/data', filename, timeline)
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), reference_xml('/data', timeline))
+
+    def test_streaming_xml_can_be_compressed(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.xml.gz')
+        timeline = make_timeline()
+        with XmlTimelineWriter(filename, compress=True) as writer:
+            writer.open('/data')
+            writer.section('processed')
+            for doc in timeline.processed:
+                writer.write(doc)
+            writer.section('unprocessed')
+            for doc in timeline.unprocessed:
+                writer.write(doc)
+        with gzip.open(filename, 'rb') as f:
+            self.assertEqual(f.read(), reference_xml('/data', timeline))
+
+    def test_cached_rows_are_rendered_once(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.xml')
+        timeline = make_timeline()
+        writer = XmlTimelineWriter(filename)
+        writer.cache_rows()
+        herostratus.Crawler().write_timeline('/data', timeline, [writer])
+        rows = dict(writer.rows)
+        timeline.processed[1] = make_document('d.pdf')
+        herostratus.Crawler().write_timeline('/data', timeline, [writer])
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), reference_xml('/data', timeline))
+        self.assertIs(writer.rows[id(timeline.processed[0])][2], rows[id(timeline.processed[0])][2])
+        self.assertEqual(len(writer.rows), 3)
+
+class Test_html_writer(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def read_shard(self, directory, shard):
+        with open(os.path.join(directory, shard)) as f:
+            content = f.read()
+        return json.loads(content[content.index('['):content.rindex(']') + 1])
+
+    def test_html_timeline_content_is_in_body(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.html')
+        herostratus.Crawler().write_timeline_html('/data', filename, make_timeline())
+        with open(filename) as f:
+            content = f.read()
+        self.assertLess(content.index('</head>'), content.index('<h1>'))
+        self.assertLess(content.index('<div class="document">'), content.index('a.docx'))
+
+    def test_sharded_html_writes_index_and_shards(self):
+        directory = os.path.join(self.test_dir.name, 'timeline')
+        timeline = herostratus.Timeline()
+        for index in range(5):
+            timeline.add(make_document('{}.docx'.format(index)))
+        timeline.add(make_document('x.bin', processed=False))
+        herostratus.Crawler().write_timeline_html_sharded('/data', directory, timeline, shard_size=2)
+        with open(os.path.join(directory, 'index.html')) as f:
+            index = f.read()
+        manifest = json.loads(index[index.index('var MANIFEST = ') + 15:index.index(';\nvar ROW_HEIGHT')])
+        self.assertEqual(manifest['sections']['processed']['count'], 5)
+        self.assertEqual(len(manifest['sections']['processed']['shards']), 3)
+        self.assertEqual(manifest['sections']['unprocessed']['count'], 1)
+        rows = []
+        for shard in manifest['sections']['processed']['shards']:
+            rows.extend(self.read_shard(directory, shard))
+        self.assertEqual([row[0] for row in rows], ['{}.docx'.format(index) for index in range(5)])
+        self.assertEqual(rows[0][2], 'Jane <J> & Co')
+        self.assertEqual(rows[0][3], '2020-01-02 03:04:05')
+
+    def read_manifest(self, directory):
+        with open(os.path.join(directory, 'index.html')) as f:
+            index = f.read()
+        return json.loads(index[index.index('var MANIFEST = ') + 15:index.index(';\nvar ROW_HEIGHT')])
+
+    def test_sharded_html_rewrites_only_changed_shards(self):
+        directory = os.path.join(self.test_dir.name, 'timeline')
+        timeline = herostratus.Timeline()
+        for index in range(6):
+            document = make_document('{}.docx'.format(index))
+            document.date_create = dt.datetime(2020, 1, 1 + index)
+            timeline.add(document)
+        writer = ShardedHtmlTimelineWriter(directory, shard_size=2)
+        writer.cache_rows()
+        herostratus.Crawler().write_timeline('/data', timeline, [writer])
+        self.assertEqual(len(writer.written), 3)
+        inserted = make_document('new.docx')
+        inserted.date_create = dt.datetime(2020, 1, 2, 12)
+        timeline.insert(inserted)
+        timeline.remove(timeline.processed[-1])
+        herostratus.Crawler().write_timeline('/data', timeline, [writer])
+        manifest = self.read_manifest(directory)
+        self.assertEqual(writer.written, ['shards/processed-0.js', 'shards/processed-2.js'])
+        self.assertEqual(manifest['sections']['processed']['counts'], [3, 2, 1])
+        rows = []
+        for shard in manifest['sections']['processed']['shards']:
+            rows.extend(self.read_shard(directory, shard))
+        self.assertEqual([row[0] for row in rows], ['0.docx', '1.docx', 'new.docx', '2.docx', '3.docx', '4.docx'])
+        self.assertEqual(sorted(os.listdir(os.path.join(directory, 'shards'))), [
+            'processed-0.js', 'processed-1.js', 'processed-2.js'
+        ])
+        herostratus.Crawler().write_timeline('/data', timeline, [writer])
+        self.assertEqual(writer.written, [])
+
+class Test_xlsx_writer(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def read_workbook(self, filename):
+        with zipfile.ZipFile(filename) as package:
+            workbook = package.read('xl/workbook.xml').decode('utf-8')
+            sheets = re.findall(r'<sheet name="([^"]+)"', workbook)
+            rows = [
+                len(re.findall(r'<row ', package.read('xl/worksheets/sheet{}.xml'.format(index + 1)).decode('utf-8')))
+                for index in range(len(sheets))
+            ]
+            sheet = package.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        return sheets, rows, sheet
+
+    def test_xlsx_timeline_writes_native_dates(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.xlsx')
+        herostratus.Crawler().write_timeline_xlsx('/data', filename, make_timeline())
+        sheets, rows, sheet = self.read_workbook(filename)
+        self.assertEqual(sheets, ['processed', 'unprocessed'])
+        self.assertEqual(rows, [4, 3])
+        self.assertIn('<v>43832.12783564815</v>', sheet)
+
+    def test_xlsx_timeline_rolls_over_to_new_sheets(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.xlsx')
+        timeline = make_timeline()
+        with XlsxTimelineWriter(filename, max_rows=3) as writer:
+            writer.open('/data')
+            writer.section('processed')
+            for doc in timeline.processed:
+                writer.write(doc)
+            writer.section('unprocessed')
+            for doc in timeline.unprocessed:
+                writer.write(doc)
+        sheets, rows, sheet = self.read_workbook(filename)
+        self.assertEqual(sheets, ['processed', 'processed-2', 'unprocessed'])
+        self.assertEqual(rows, [3, 3, 3])
+
+    def test_xls_timeline_rolls_over_to_new_sheets(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.xls')
+        timeline = make_timeline()
+        with XlsTimelineWriter(filename, max_rows=3) as writer:
+            writer.open('/data')
+            writer.section('processed')
+            for doc in timeline.processed:
+                writer.write(doc)
+            writer.section('unprocessed')
+            for doc in timeline.unprocessed:
+                writer.write(doc)
+        workbook = xlrd.open_workbook(filename)
+        self.assertEqual(workbook.sheet_names(), ['processed', 'processed-2', 'unprocessed'])
+        self.assertEqual([sheet.nrows for sheet in workbook.sheets()], [3, 3, 3])
+        self.assertEqual(workbook.sheet_by_index(1).cell_value(2, 0), 2)
+
+class RecordingSink(TimelineSink):
+    def __init__(self):
+        self.calls = []
+        self.records = []
+
+    def open(self, path):
+        self.calls.append(('open', path))
+
+    def section(self, name):
+        self.calls.append(('section', name))
+
+    def write(self, record):
+        self.calls.append(('write', record.name))
+        self.records.append(record)
+
+    def close(self):
+        self.calls.append(('close', None))
+
+
+class Test_timeline_sinks(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_write_timeline_fans_out_single_records(self):
+        first = RecordingSink()
+        second = RecordingSink()
+        herostratus.Crawler().write_timeline('/data', make_timeline(), [first, second])
+        self.assertEqual(first.calls, [
+            ('open', '/data'),
+            ('section', 'processed'), ('write', 'a.docx'), ('write', 'b.pdf'),
+            ('section', 'unprocessed'), ('write', 'c.bin'),
+            ('close', None)
+        ])
+        self.assertEqual(first.calls, second.calls)
+        for left, right in zip(first.records, second.records):
+            self.assertIs(left, right)
+
+    def test_write_timeline_matches_single_format_writers(self):
+        timeline = make_timeline()
+        filename = os.path.join(self.test_dir.name, 'fanout.xml')
+        directory = os.path.join(self.test_dir.name, 'fanout_html')
+        herostratus.Crawler().write_timeline('/data', timeline, [
+            XmlTimelineWriter(filename),
+            ShardedHtmlTimelineWriter(directory),
+            CsvTimelineWriter(os.path.join(self.test_dir.name, 'fanout.csv'))
+        ])
+        with open(filename, 'rb') as f:
+            self.assertEqual(f.read(), reference_xml('/data', timeline))
+        self.assertTrue(os.path.isfile(os.path.join(directory, 'index.html')))
+
+    def test_csv_timeline_uses_iso_dates(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.csv')
+        herostratus.Crawler().write_timeline_csv('/data', filename, make_timeline())
+        with open(filename, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0][:3], ['section', 'name', 'path'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][:3], ['processed', 'a.docx', '/data/a.docx'])
+        self.assertEqual(rows[1][4:8], ['Jane <J> & Co', 'Jérôme', '2020-01-02T03:04:05', '2021-01-02T03:04:05'])
+        self.assertEqual(rows[3][:2], ['unprocessed', 'c.bin'])
+
+    def test_jsonl_timeline_can_be_compressed(self):
+        filename = os.path.join(self.test_dir.name, 'timeline.jsonl.gz')
+        herostratus.Crawler().write_timeline_jsonl('/data', filename, make_timeline())
+        with gzip.open(filename, 'rt', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([row['name'] for row in rows], ['a.docx', 'b.pdf', 'c.bin'])
+        self.assertEqual(rows[0]['section'], 'processed')
+        self.assertEqual(rows[0]['author_last'], 'Jérôme')
+        self.assertEqual(rows[0]['date_create'], '2020-01-02T03:04:05')
+        self.assertEqual(rows[0]['pages'], 3)
+        self.assertEqual(rows[2]['section'], 'unprocessed')
+
+if __name__ == '__main__':
+    unittest.main()